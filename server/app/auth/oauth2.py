@@ -1,11 +1,13 @@
 from jose import jwt, JWTError
 from fastapi import status, HTTPException, Depends
 from fastapi.security.oauth2 import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
+from typing import Any, List, Optional
 from ..database.connection import get_db
 from ..schemas import auth_schema, user_schema, tower_schema
-from ..models import user_model, user_team_model, user_organization_model, tower_model
-# from datetime import datetime, timedelta
+from ..models import user_model, user_team_model, user_organization_model, team_model, organization_model
+from ..utils.ttl_cache import TTLCache
+from datetime import datetime, timedelta, timezone
 from ..configs.env_vars import settings
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='api/login')
@@ -16,6 +18,9 @@ SECRET_KEY = settings.secret_key
 ALGORITHM = settings.algorithm
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.access_token_expire_minutes
 
+principal_cache = TTLCache(settings.principal_cache_ttl)
+admin_cache = TTLCache(settings.admin_cache_ttl)
+
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -36,156 +41,220 @@ def verify_access_token(token: str, credentials_exception):
         if id is None:
             raise credentials_exception
 
-        token_data = auth_schema.TokenData(user_id=id)
+        token_data = auth_schema.TokenData(
+            user_id=id, inventory_id=payload.get('inventory_id'))
     except JWTError:
         raise credentials_exception
 
     return token_data
 
 
-def check_if_user_is_administrator(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> bool:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"}
-    )
+def create_inventory_token(user_id: int, inventory_id: int) -> str:
+    return create_access_token(dict(
+        user_id=user_id,
+        inventory_id=inventory_id,
+        exp=datetime.now(timezone.utc) + timedelta(
+            minutes=settings.inventory_token_expire_minutes)
+    ))
 
-    token_data = verify_access_token(token, credentials_exception)
 
-    user_query = db.query(
+def get_token_user_id(token: str) -> Optional[int]:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        return int(payload.get('user_id'))
+    except (JWTError, TypeError, ValueError):
+        return None
+
+
+def load_principal(db: Session, user_id: int) -> dict[str, Any] | None:
+    user = db.query(
         user_model.User
+    ).join(
+        user_model.User.tower
+    ).options(
+        contains_eager(user_model.User.tower)
     ).filter(
-        user_model.User.id == token_data.user_id
-    )
-    user = user_query.first()
+        user_model.User.id == user_id
+    ).first()
 
-    if user.user_type == user_schema.UserType.admin or user.user_type == user_schema.UserType.system_administrator:
-        return True
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    if not user:
+        return None
 
+    my_teams = db.query(
+        team_model.Team
+    ).join(
+        user_team_model.UserTeam, user_team_model.UserTeam.team_id == team_model.Team.id
+    ).filter(
+        user_team_model.UserTeam.user_id == user_id
+    ).distinct(
+    ).order_by(
+        team_model.Team.id
+    ).all()
+
+    my_organizations = db.query(
+        organization_model.Organization
+    ).join(
+        user_organization_model.UserOrganization, user_organization_model.UserOrganization.organization_id == organization_model.Organization.id
+    ).filter(
+        user_organization_model.UserOrganization.user_id == user_id
+    ).distinct(
+    ).order_by(
+        organization_model.Organization.id
+    ).all()
 
-def check_if_user_is_at_least_auditor(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> bool:
-    credentials_exception = HTTPException(
+    principal = {
+        "user": user,
+        "tower": user.tower,
+        "teams": my_teams,
+        "organizations": my_organizations
+    }
+
+    for instance in [user, user.tower, *my_teams, *my_organizations]:
+        db.expunge(instance)
+
+    return principal
+
+
+def get_credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"}
     )
 
+
+def get_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> dict[str, Any]:
+    credentials_exception = get_credentials_exception()
+
     token_data = verify_access_token(token, credentials_exception)
 
-    user_query = db.query(
-        user_model.User
-    ).filter(
-        user_model.User.id == token_data.user_id
-    )
-    user = user_query.first()
+    if token_data.inventory_id is not None:
+        raise credentials_exception
 
-    if user.user_type == user_schema.UserType.admin or user.user_type == user_schema.UserType.system_administrator or user.user_type == user_schema.UserType.system_auditor:
-        return True
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+    return get_token_principal(db, token_data, credentials_exception)
 
 
-def get_current_user(
+def get_inventory_principal(
+    id: int,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
-) -> user_schema.CurrentUserResponse:
-    my_teams: list = []
-    my_organizations: list = []
-
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"}
-    )
+) -> dict[str, Any]:
+    credentials_exception = get_credentials_exception()
 
     token_data = verify_access_token(token, credentials_exception)
 
-    user_query = db.query(
-        user_model.User
-    ).filter(
-        user_model.User.id == token_data.user_id
-    )
-    user = user_query.first()
+    if token_data.inventory_id is not None and token_data.inventory_id != id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail="Can't find user information")
+    return get_token_principal(db, token_data, credentials_exception)
 
-    current_user_team_query = db.query(
-        user_team_model.UserTeam
-    ).join(
-        user_model.User, user_model.User.id == user_team_model.UserTeam.user_id
-    ).filter(
-        user_model.User.tower_id == user.tower.id,
-        user_team_model.UserTeam.user_id == user.id
-    )
-    current_user_team = current_user_team_query.all()
 
-    if current_user_team:
-        for user_team in current_user_team:
-            my_teams.append(user_team.team)
+def get_token_principal(db: Session, token_data: auth_schema.TokenData, credentials_exception: HTTPException) -> dict[str, Any]:
+    try:
+        user_id = int(token_data.user_id)
+    except ValueError:
+        raise credentials_exception
 
-    current_user_organization_query = db.query(
-        user_organization_model.UserOrganization
-    ).join(
-        user_model.User, user_model.User.id == user_organization_model.UserOrganization.user_id
-    ).filter(
-        user_model.User.tower_id == user.tower.id,
-        user_organization_model.UserOrganization.user_id == user.id
-    )
-    current_user_organization = current_user_organization_query.all()
+    principal = principal_cache.get(user_id)
+
+    if principal is None:
+        principal = load_principal(db, user_id)
+
+        if not principal:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                                detail="Can't find user information")
+
+        principal_cache.set(user_id, principal)
+
+    return principal
+
+
+def invalidate_principals(user_ids: List[int]) -> None:
+    for user_id in user_ids:
+        principal_cache.invalidate(user_id)
+
+
+def invalidate_tower_principals(tower_id: int) -> None:
+    principal_cache.invalidate_where(
+        lambda user_id, principal: principal["tower"].id == tower_id)
+
+
+def get_tower_admin_id(db: Session, tower_id: int) -> Optional[int]:
+    admin_id = admin_cache.get(tower_id)
+
+    if admin_id is None:
+        admin_id = db.query(
+            user_model.User.id
+        ).filter(
+            user_model.User.tower_id == tower_id,
+            user_model.User.user_type == user_schema.UserType.admin
+        ).limit(1).scalar()
+
+        if admin_id is not None:
+            admin_cache.set(tower_id, admin_id)
 
-    if current_user_organization:
-        for user_organization in current_user_organization:
-            my_organizations.append(user_organization.organization)
+    return admin_id
+
+
+def get_owners_ids(db: Session, user: Any) -> Optional[List[int]]:
+    if user.user_type == user_schema.UserType.admin:
+        return [user.id]
+
+    admin_id = get_tower_admin_id(db, user.tower_id)
+
+    if admin_id is None:
+        return None
+
+    return [user.id, admin_id]
+
+
+def invalidate_tower_admin(tower_id: int) -> None:
+    admin_cache.invalidate(tower_id)
+
+
+def check_if_user_is_administrator(
+    principal: dict[str, Any] = Depends(get_principal)
+) -> bool:
+    user = principal["user"]
+
+    if user.user_type == user_schema.UserType.admin or user.user_type == user_schema.UserType.system_administrator:
+        return True
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
+
+def check_if_user_is_at_least_auditor(
+    principal: dict[str, Any] = Depends(get_principal)
+) -> bool:
+    user = principal["user"]
+
+    if user.user_type == user_schema.UserType.admin or user.user_type == user_schema.UserType.system_administrator or user.user_type == user_schema.UserType.system_auditor:
+        return True
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
+
+
+def get_current_user(
+    principal: dict[str, Any] = Depends(get_principal)
+) -> user_schema.CurrentUserResponse:
     return {
-        "user": user,
-        "teams": my_teams,
-        "organizations": my_organizations
+        "user": principal["user"],
+        "teams": principal["teams"],
+        "organizations": principal["organizations"]
     }
 
 
 def get_tower(
-    token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    principal: dict[str, Any] = Depends(get_principal)
 ) -> tower_schema.TowerResponse:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"}
-    )
-
-    token_data = verify_access_token(token, credentials_exception)
-
-    user_query = db.query(
-        user_model.User
-    ).filter(
-        user_model.User.id == token_data.user_id
-    )
-    user = user_query.first()
-    if not user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                            detail="Can't find user information")
-
-    tower_query = db.query(
-        tower_model.Tower
-    ).filter(
-        tower_model.Tower.id == user.tower_id
-    )
-    tower = tower_query.first()
-    if not tower:
+    if not principal["tower"]:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Can't find tower information")
 
-    return tower
+    return principal["tower"]
@@ -1,3 +1,4 @@
+from typing import Optional
 from pydantic import BaseSettings
 
 
@@ -7,9 +8,35 @@ class Settings(BaseSettings):
     database_password: str
     database_name: str
     database_username: str
+    database_pool_size: int = 20
+    database_max_overflow: int = 30
+    database_pool_timeout: int = 30
+    database_pool_pre_ping: bool = True
+    database_pool_recycle: int = 1800
+    database_replica_url: Optional[str] = None
+    database_replica_write_position_ttl: int = 30
+    threadpool_max_workers: int = 40
     secret_key: str
     algorithm: str
     access_token_expire_minutes: int
+    ssh_keepalive_interval: int = 30
+    ssh_idle_timeout: int = 300
+    ssh_max_channels_per_transport: int = 8
+    job_max_workers: int = 8
+    job_max_concurrency_per_tower: int = 2
+    job_heartbeat_interval: int = 30
+    job_stale_after: int = 120
+    principal_cache_ttl: int = 30
+    dashboard_cache_ttl: int = 15
+    admin_cache_ttl: int = 300
+    scheduler_enabled: bool = True
+    scheduler_poll_interval: int = 15
+    scheduler_max_launches_per_minute: int = 0
+    dynamic_inventory_url: Optional[str] = None
+    inventory_token_expire_minutes: int = 10
+    inventory_resync_enabled: bool = True
+    inventory_resync_poll_interval: int = 10
+    inventory_resync_window: int = 60
 
     class Config:
         env_file = ".env"
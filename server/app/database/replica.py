@@ -0,0 +1,130 @@
+import re
+from typing import Any, Iterator, Optional
+from fastapi import Depends, Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .connection import SessionLocal, engine
+from ..auth import oauth2
+from ..configs.env_vars import settings
+from ..utils.ttl_cache import TTLCache
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+WRITE_POSITION_HEADER = "X-Write-Position"
+WRITE_POSITION_COOKIE = "write_position"
+WRITE_POSITION_PATTERN = re.compile(r"^[0-9A-F]{1,8}/[0-9A-F]{1,8}$")
+
+replica_engine = create_engine(
+    settings.database_replica_url,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    pool_timeout=settings.database_pool_timeout,
+    pool_pre_ping=settings.database_pool_pre_ping,
+    pool_recycle=settings.database_pool_recycle
+) if settings.database_replica_url else None
+
+ReplicaSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=replica_engine) if replica_engine is not None else None
+
+write_positions = TTLCache(settings.database_replica_write_position_ttl)
+
+
+def record_write_position(user_id: int) -> str:
+    with engine.connect() as connection:
+        write_position = connection.execute(
+            text("SELECT pg_current_wal_lsn()::text")
+        ).scalar()
+
+    write_positions.set(user_id, write_position)
+
+    return write_position
+
+
+def get_client_write_position(request: Request) -> Optional[str]:
+    write_position = request.headers.get(
+        WRITE_POSITION_HEADER) or request.cookies.get(WRITE_POSITION_COOKIE)
+
+    if write_position and WRITE_POSITION_PATTERN.match(write_position.upper()):
+        return write_position.upper()
+
+    return None
+
+
+def replica_has_caught_up(user_id: int, client_write_position: Optional[str] = None) -> bool:
+    write_position = client_write_position or write_positions.get(user_id)
+
+    if write_position is None:
+        return True
+
+    try:
+        with replica_engine.connect() as connection:
+            caught_up = connection.execute(
+                text(
+                    "SELECT pg_last_wal_replay_lsn() >= CAST(:write_position AS pg_lsn)"),
+                dict(write_position=write_position)
+            ).scalar()
+    except SQLAlchemyError:
+        return False
+
+    if caught_up:
+        write_positions.invalidate(user_id)
+
+    return bool(caught_up)
+
+
+def get_read_db(
+    request: Request,
+    principal: dict[str, Any] = Depends(oauth2.get_principal)
+) -> Iterator[Session]:
+    if ReplicaSessionLocal is not None and replica_has_caught_up(principal["user"].id, get_client_write_position(request)):
+        db = ReplicaSessionLocal()
+    else:
+        db = SessionLocal()
+
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+class WritePositionMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        user_id = self._get_user_id(scope)
+
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_after_write_position(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                write_position = await run_in_threadpool(record_write_position, user_id)
+
+                headers = MutableHeaders(scope=message)
+                headers[WRITE_POSITION_HEADER] = write_position
+                headers.append(
+                    "Set-Cookie",
+                    f"{WRITE_POSITION_COOKIE}={write_position}; Max-Age={settings.database_replica_write_position_ttl}; Path=/; HttpOnly; SameSite=Lax"
+                )
+
+            await send(message)
+
+        await self.app(scope, receive, send_after_write_position)
+
+    def _get_user_id(self, scope: Scope) -> Optional[int]:
+        for (name, value) in scope["headers"]:
+            if name == b"authorization":
+                (scheme, _, token) = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    return oauth2.get_token_user_id(token)
+
+        return None
@@ -1,9 +1,17 @@
+from anyio import to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from starlette.responses import RedirectResponse
 from .routes import group_route, credential_route, host_route, inventory_route, job_route, organization_route, project_route, team_route, user_route, auth_route, template_route, schedule_route, tower_route, user_team_route, user_organization_route, team_organization_route, user_credential_route, team_credential_route, user_inventory_route, team_inventory_route, user_group_route, user_host_route, team_group_route, team_host_route, group_host_route, inventory_group_route, user_project_route, team_project_route, user_template_route, team_template_route, template_schedule_route, project_schedule_route, inventory_schedule_route, dashboard_route
+from .database.replica import WritePositionMiddleware, replica_engine
+from .services.tower.connection_pool import ssh_pool
+from .services.jobs.job_runner import job_runner
+from .services.jobs.scheduler import scheduler
+from .services.jobs.inventory_coalescer import inventory_coalescer
+from .configs.env_vars import settings
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 origins = [
     "*"
@@ -14,9 +22,13 @@ app.add_middleware(
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "X-Write-Position"]
 )
 
+if replica_engine is not None:
+    app.add_middleware(WritePositionMiddleware)
+
 app.include_router(dashboard_route.router)
 app.include_router(host_route.router)
 app.include_router(tower_route.router)
@@ -53,6 +65,27 @@ app.include_router(team_template_route.router)
 app.include_router(organization_route.router)
 
 
+@app.on_event("startup")
+def start_job_runner():
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_max_workers
+
+    job_runner.start()
+
+    if settings.scheduler_enabled:
+        scheduler.start()
+
+    if settings.inventory_resync_enabled:
+        inventory_coalescer.start()
+
+
+@app.on_event("shutdown")
+def close_tower_connections():
+    scheduler.stop()
+    inventory_coalescer.stop()
+    job_runner.shutdown()
+    ssh_pool.close_all()
+
+
 @app.get("/")
 async def root():
     return RedirectResponse(url="/docs/")
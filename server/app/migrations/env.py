@@ -1,4 +1,4 @@
-from app.models import credential_model, group_host_model, group_model, host_model, inventory_group_model, inventory_model, job_model, organization_model, project_model, schedule_model, team_credential_model, team_group_model, team_host_model, team_inventory_model, team_model, team_organization_model, team_project_model, team_template_model, template_model, template_schedule_model, tower_model, user_credential_model, user_group_model, user_host_model, user_inventory_model, user_model, user_organization_model, user_project_model, user_team_model, user_template_model, project_schedule_model, inventory_schedule_model
+from app.models import credential_model, group_host_model, group_model, host_model, inventory_group_model, inventory_model, job_model, organization_model, project_model, schedule_model, team_credential_model, team_group_model, team_host_model, team_inventory_model, team_model, team_organization_model, team_project_model, team_template_model, template_model, template_schedule_model, tower_model, job_output_chunk_model, user_credential_model, user_group_model, user_host_model, user_inventory_model, user_model, user_organization_model, user_project_model, user_team_model, user_template_model, project_schedule_model, inventory_schedule_model, inventory_change_model
 from logging.config import fileConfig
 
 from sqlalchemy import engine_from_config
@@ -0,0 +1,28 @@
+"""schedules spread window
+
+Revision ID: 0f7a4c2e9b86
+Revises: e6b2d9a4c153
+Create Date: 2026-10-18 16:41:55.902613
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0f7a4c2e9b86'
+down_revision: Union[str, None] = 'e6b2d9a4c153'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('schedules', sa.Column('spread_window', sa.Integer(), nullable=True))
+    op.add_column('organizations', sa.Column('schedule_spread_window', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('organizations', 'schedule_spread_window')
+    op.drop_column('schedules', 'spread_window')
@@ -0,0 +1,31 @@
+"""jobs finished_at nullable
+
+Revision ID: 2b1f6d7c9e04
+Revises: 73ef11f6f9a5
+Create Date: 2026-10-18 09:12:41.508233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b1f6d7c9e04'
+down_revision: Union[str, None] = '73ef11f6f9a5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column('jobs', 'finished_at',
+                    existing_type=sa.TIMESTAMP(timezone=True),
+                    nullable=True)
+
+
+def downgrade() -> None:
+    op.execute("UPDATE jobs SET finished_at = started_at WHERE finished_at IS NULL")
+    op.alter_column('jobs', 'finished_at',
+                    existing_type=sa.TIMESTAMP(timezone=True),
+                    nullable=False)
@@ -0,0 +1,26 @@
+"""inventories content hash
+
+Revision ID: 4d8b1e7f3a29
+Revises: 0f7a4c2e9b86
+Create Date: 2026-10-18 18:04:37.660129
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d8b1e7f3a29'
+down_revision: Union[str, None] = '0f7a4c2e9b86'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('inventories', sa.Column('content_hash', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('inventories', 'content_hash')
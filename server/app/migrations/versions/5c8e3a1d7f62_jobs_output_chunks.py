@@ -0,0 +1,46 @@
+"""jobs output chunks
+
+Revision ID: 5c8e3a1d7f62
+Revises: 2b1f6d7c9e04
+Create Date: 2026-10-18 10:03:17.214596
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c8e3a1d7f62'
+down_revision: Union[str, None] = '2b1f6d7c9e04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('jobs_output_chunks',
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('start_offset', sa.BigInteger(), nullable=False),
+    sa.Column('content_length', sa.Integer(), nullable=False),
+    sa.Column('content', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['job_id'], ['jobs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('job_id', 'seq')
+    )
+    op.execute(
+        "INSERT INTO jobs_output_chunks (job_id, seq, start_offset, content_length, content) "
+        "SELECT id, 0, 0, char_length(output), output FROM jobs WHERE output <> ''"
+    )
+    op.drop_column('jobs', 'output')
+
+
+def downgrade() -> None:
+    op.add_column('jobs', sa.Column('output', sa.String(), server_default='', nullable=False))
+    op.execute(
+        "UPDATE jobs SET output = chunks.output FROM ("
+        "SELECT job_id, string_agg(content, '' ORDER BY seq) AS output FROM jobs_output_chunks GROUP BY job_id"
+        ") AS chunks WHERE chunks.job_id = jobs.id"
+    )
+    op.alter_column('jobs', 'output', server_default=None)
+    op.drop_table('jobs_output_chunks')
@@ -0,0 +1,174 @@
+"""tenant and foreign key indexes
+
+Revision ID: 8d4f2b6a1c37
+Revises: 5c8e3a1d7f62
+Create Date: 2026-10-18 11:42:08.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f2b6a1c37'
+down_revision: Union[str, None] = '5c8e3a1d7f62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(op.f('ix_organizations_name_trgm'), 'organizations', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_organizations_tower_id'), 'organizations', ['tower_id'], unique=False)
+    op.create_index(op.f('ix_teams_name_trgm'), 'teams', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_teams_tower_id'), 'teams', ['tower_id'], unique=False)
+    op.create_index(op.f('ix_users_first_name_trgm'), 'users', ['first_name'], unique=False, postgresql_using='gin', postgresql_ops={'first_name': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_users_last_name_trgm'), 'users', ['last_name'], unique=False, postgresql_using='gin', postgresql_ops={'last_name': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_users_tower_id_username'), 'users', ['tower_id', 'username'], unique=False)
+    op.create_index(op.f('ix_credentials_created_by_organization_id'), 'credentials', ['created_by', 'organization_id'], unique=False)
+    op.create_index(op.f('ix_credentials_name_trgm'), 'credentials', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_credentials_organization_id'), 'credentials', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_groups_created_by_organization_id'), 'groups', ['created_by', 'organization_id'], unique=False)
+    op.create_index(op.f('ix_groups_name_trgm'), 'groups', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_groups_organization_id'), 'groups', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_hosts_created_by_organization_id'), 'hosts', ['created_by', 'organization_id'], unique=False)
+    op.create_index(op.f('ix_hosts_hostname_trgm'), 'hosts', ['hostname'], unique=False, postgresql_using='gin', postgresql_ops={'hostname': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_hosts_ipv4_trgm'), 'hosts', ['ipv4'], unique=False, postgresql_using='gin', postgresql_ops={'ipv4': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_hosts_organization_id'), 'hosts', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_inventories_created_by_organization_id'), 'inventories', ['created_by', 'organization_id'], unique=False)
+    op.create_index(op.f('ix_inventories_name_trgm'), 'inventories', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_inventories_organization_id'), 'inventories', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_projects_created_by_organization_id'), 'projects', ['created_by', 'organization_id'], unique=False)
+    op.create_index(op.f('ix_projects_name_trgm'), 'projects', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_projects_organization_id'), 'projects', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_schedules_created_by_organization_id'), 'schedules', ['created_by', 'organization_id'], unique=False)
+    op.create_index(op.f('ix_schedules_name_trgm'), 'schedules', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_schedules_organization_id'), 'schedules', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_teams_organizations_organization_id'), 'teams_organizations', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_teams_organizations_team_organization_id'), 'teams_organizations', ['team_organization_id'], unique=False)
+    op.create_index(op.f('ix_users_organizations_organization_id'), 'users_organizations', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_users_organizations_user_organization_id'), 'users_organizations', ['user_organization_id'], unique=False)
+    op.create_index(op.f('ix_users_teams_team_id'), 'users_teams', ['team_id'], unique=False)
+    op.create_index(op.f('ix_users_teams_user_team_id'), 'users_teams', ['user_team_id'], unique=False)
+    op.create_index(op.f('ix_groups_hosts_group_host_id'), 'groups_hosts', ['group_host_id'], unique=False)
+    op.create_index(op.f('ix_groups_hosts_host_id'), 'groups_hosts', ['host_id'], unique=False)
+    op.create_index(op.f('ix_inventories_groups_group_id'), 'inventories_groups', ['group_id'], unique=False)
+    op.create_index(op.f('ix_inventories_groups_inventory_group_id'), 'inventories_groups', ['inventory_group_id'], unique=False)
+    op.create_index(op.f('ix_inventories_schedules_inventory_schedule_id'), 'inventories_schedules', ['inventory_schedule_id'], unique=False)
+    op.create_index(op.f('ix_inventories_schedules_schedule_id'), 'inventories_schedules', ['schedule_id'], unique=False)
+    op.create_index(op.f('ix_projects_schedules_project_schedule_id'), 'projects_schedules', ['project_schedule_id'], unique=False)
+    op.create_index(op.f('ix_projects_schedules_schedule_id'), 'projects_schedules', ['schedule_id'], unique=False)
+    op.create_index(op.f('ix_teams_credentials_credential_id'), 'teams_credentials', ['credential_id'], unique=False)
+    op.create_index(op.f('ix_teams_credentials_team_credential_id'), 'teams_credentials', ['team_credential_id'], unique=False)
+    op.create_index(op.f('ix_teams_groups_group_id'), 'teams_groups', ['group_id'], unique=False)
+    op.create_index(op.f('ix_teams_groups_team_group_id'), 'teams_groups', ['team_group_id'], unique=False)
+    op.create_index(op.f('ix_teams_hosts_host_id'), 'teams_hosts', ['host_id'], unique=False)
+    op.create_index(op.f('ix_teams_hosts_team_host_id'), 'teams_hosts', ['team_host_id'], unique=False)
+    op.create_index(op.f('ix_teams_inventories_inventory_id'), 'teams_inventories', ['inventory_id'], unique=False)
+    op.create_index(op.f('ix_teams_inventories_team_inventory_id'), 'teams_inventories', ['team_inventory_id'], unique=False)
+    op.create_index(op.f('ix_teams_projects_project_id'), 'teams_projects', ['project_id'], unique=False)
+    op.create_index(op.f('ix_teams_projects_team_project_id'), 'teams_projects', ['team_project_id'], unique=False)
+    op.create_index(op.f('ix_templates_created_by_organization_id'), 'templates', ['created_by', 'organization_id'], unique=False)
+    op.create_index(op.f('ix_templates_credential_id'), 'templates', ['credential_id'], unique=False)
+    op.create_index(op.f('ix_templates_inventory_id'), 'templates', ['inventory_id'], unique=False)
+    op.create_index(op.f('ix_templates_name_trgm'), 'templates', ['name'], unique=False, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+    op.create_index(op.f('ix_templates_organization_id'), 'templates', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_templates_project_id'), 'templates', ['project_id'], unique=False)
+    op.create_index(op.f('ix_users_credentials_credential_id'), 'users_credentials', ['credential_id'], unique=False)
+    op.create_index(op.f('ix_users_credentials_user_credential_id'), 'users_credentials', ['user_credential_id'], unique=False)
+    op.create_index(op.f('ix_users_groups_group_id'), 'users_groups', ['group_id'], unique=False)
+    op.create_index(op.f('ix_users_groups_user_group_id'), 'users_groups', ['user_group_id'], unique=False)
+    op.create_index(op.f('ix_users_hosts_host_id'), 'users_hosts', ['host_id'], unique=False)
+    op.create_index(op.f('ix_users_hosts_user_host_id'), 'users_hosts', ['user_host_id'], unique=False)
+    op.create_index(op.f('ix_users_inventories_inventory_id'), 'users_inventories', ['inventory_id'], unique=False)
+    op.create_index(op.f('ix_users_inventories_user_inventory_id'), 'users_inventories', ['user_inventory_id'], unique=False)
+    op.create_index(op.f('ix_users_projects_project_id'), 'users_projects', ['project_id'], unique=False)
+    op.create_index(op.f('ix_users_projects_user_project_id'), 'users_projects', ['user_project_id'], unique=False)
+    op.create_index(op.f('ix_jobs_launched_by_organization_id'), 'jobs', ['launched_by', 'organization_id'], unique=False)
+    op.create_index(op.f('ix_jobs_organization_id'), 'jobs', ['organization_id'], unique=False)
+    op.create_index(op.f('ix_jobs_template_id'), 'jobs', ['template_id'], unique=False)
+    op.create_index(op.f('ix_teams_templates_team_template_id'), 'teams_templates', ['team_template_id'], unique=False)
+    op.create_index(op.f('ix_teams_templates_template_id'), 'teams_templates', ['template_id'], unique=False)
+    op.create_index(op.f('ix_templates_schedules_schedule_id'), 'templates_schedules', ['schedule_id'], unique=False)
+    op.create_index(op.f('ix_templates_schedules_template_schedule_id'), 'templates_schedules', ['template_schedule_id'], unique=False)
+    op.create_index(op.f('ix_users_templates_template_id'), 'users_templates', ['template_id'], unique=False)
+    op.create_index(op.f('ix_users_templates_user_template_id'), 'users_templates', ['user_template_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_users_templates_user_template_id'), table_name='users_templates')
+    op.drop_index(op.f('ix_users_templates_template_id'), table_name='users_templates')
+    op.drop_index(op.f('ix_templates_schedules_template_schedule_id'), table_name='templates_schedules')
+    op.drop_index(op.f('ix_templates_schedules_schedule_id'), table_name='templates_schedules')
+    op.drop_index(op.f('ix_teams_templates_template_id'), table_name='teams_templates')
+    op.drop_index(op.f('ix_teams_templates_team_template_id'), table_name='teams_templates')
+    op.drop_index(op.f('ix_jobs_template_id'), table_name='jobs')
+    op.drop_index(op.f('ix_jobs_organization_id'), table_name='jobs')
+    op.drop_index(op.f('ix_jobs_launched_by_organization_id'), table_name='jobs')
+    op.drop_index(op.f('ix_users_projects_user_project_id'), table_name='users_projects')
+    op.drop_index(op.f('ix_users_projects_project_id'), table_name='users_projects')
+    op.drop_index(op.f('ix_users_inventories_user_inventory_id'), table_name='users_inventories')
+    op.drop_index(op.f('ix_users_inventories_inventory_id'), table_name='users_inventories')
+    op.drop_index(op.f('ix_users_hosts_user_host_id'), table_name='users_hosts')
+    op.drop_index(op.f('ix_users_hosts_host_id'), table_name='users_hosts')
+    op.drop_index(op.f('ix_users_groups_user_group_id'), table_name='users_groups')
+    op.drop_index(op.f('ix_users_groups_group_id'), table_name='users_groups')
+    op.drop_index(op.f('ix_users_credentials_user_credential_id'), table_name='users_credentials')
+    op.drop_index(op.f('ix_users_credentials_credential_id'), table_name='users_credentials')
+    op.drop_index(op.f('ix_templates_project_id'), table_name='templates')
+    op.drop_index(op.f('ix_templates_organization_id'), table_name='templates')
+    op.drop_index(op.f('ix_templates_name_trgm'), table_name='templates', postgresql_using='gin')
+    op.drop_index(op.f('ix_templates_inventory_id'), table_name='templates')
+    op.drop_index(op.f('ix_templates_credential_id'), table_name='templates')
+    op.drop_index(op.f('ix_templates_created_by_organization_id'), table_name='templates')
+    op.drop_index(op.f('ix_teams_projects_team_project_id'), table_name='teams_projects')
+    op.drop_index(op.f('ix_teams_projects_project_id'), table_name='teams_projects')
+    op.drop_index(op.f('ix_teams_inventories_team_inventory_id'), table_name='teams_inventories')
+    op.drop_index(op.f('ix_teams_inventories_inventory_id'), table_name='teams_inventories')
+    op.drop_index(op.f('ix_teams_hosts_team_host_id'), table_name='teams_hosts')
+    op.drop_index(op.f('ix_teams_hosts_host_id'), table_name='teams_hosts')
+    op.drop_index(op.f('ix_teams_groups_team_group_id'), table_name='teams_groups')
+    op.drop_index(op.f('ix_teams_groups_group_id'), table_name='teams_groups')
+    op.drop_index(op.f('ix_teams_credentials_team_credential_id'), table_name='teams_credentials')
+    op.drop_index(op.f('ix_teams_credentials_credential_id'), table_name='teams_credentials')
+    op.drop_index(op.f('ix_projects_schedules_schedule_id'), table_name='projects_schedules')
+    op.drop_index(op.f('ix_projects_schedules_project_schedule_id'), table_name='projects_schedules')
+    op.drop_index(op.f('ix_inventories_schedules_schedule_id'), table_name='inventories_schedules')
+    op.drop_index(op.f('ix_inventories_schedules_inventory_schedule_id'), table_name='inventories_schedules')
+    op.drop_index(op.f('ix_inventories_groups_inventory_group_id'), table_name='inventories_groups')
+    op.drop_index(op.f('ix_inventories_groups_group_id'), table_name='inventories_groups')
+    op.drop_index(op.f('ix_groups_hosts_host_id'), table_name='groups_hosts')
+    op.drop_index(op.f('ix_groups_hosts_group_host_id'), table_name='groups_hosts')
+    op.drop_index(op.f('ix_users_teams_user_team_id'), table_name='users_teams')
+    op.drop_index(op.f('ix_users_teams_team_id'), table_name='users_teams')
+    op.drop_index(op.f('ix_users_organizations_user_organization_id'), table_name='users_organizations')
+    op.drop_index(op.f('ix_users_organizations_organization_id'), table_name='users_organizations')
+    op.drop_index(op.f('ix_teams_organizations_team_organization_id'), table_name='teams_organizations')
+    op.drop_index(op.f('ix_teams_organizations_organization_id'), table_name='teams_organizations')
+    op.drop_index(op.f('ix_schedules_organization_id'), table_name='schedules')
+    op.drop_index(op.f('ix_schedules_name_trgm'), table_name='schedules', postgresql_using='gin')
+    op.drop_index(op.f('ix_schedules_created_by_organization_id'), table_name='schedules')
+    op.drop_index(op.f('ix_projects_organization_id'), table_name='projects')
+    op.drop_index(op.f('ix_projects_name_trgm'), table_name='projects', postgresql_using='gin')
+    op.drop_index(op.f('ix_projects_created_by_organization_id'), table_name='projects')
+    op.drop_index(op.f('ix_inventories_organization_id'), table_name='inventories')
+    op.drop_index(op.f('ix_inventories_name_trgm'), table_name='inventories', postgresql_using='gin')
+    op.drop_index(op.f('ix_inventories_created_by_organization_id'), table_name='inventories')
+    op.drop_index(op.f('ix_hosts_organization_id'), table_name='hosts')
+    op.drop_index(op.f('ix_hosts_ipv4_trgm'), table_name='hosts', postgresql_using='gin')
+    op.drop_index(op.f('ix_hosts_hostname_trgm'), table_name='hosts', postgresql_using='gin')
+    op.drop_index(op.f('ix_hosts_created_by_organization_id'), table_name='hosts')
+    op.drop_index(op.f('ix_groups_organization_id'), table_name='groups')
+    op.drop_index(op.f('ix_groups_name_trgm'), table_name='groups', postgresql_using='gin')
+    op.drop_index(op.f('ix_groups_created_by_organization_id'), table_name='groups')
+    op.drop_index(op.f('ix_credentials_organization_id'), table_name='credentials')
+    op.drop_index(op.f('ix_credentials_name_trgm'), table_name='credentials', postgresql_using='gin')
+    op.drop_index(op.f('ix_credentials_created_by_organization_id'), table_name='credentials')
+    op.drop_index(op.f('ix_users_tower_id_username'), table_name='users')
+    op.drop_index(op.f('ix_users_last_name_trgm'), table_name='users', postgresql_using='gin')
+    op.drop_index(op.f('ix_users_first_name_trgm'), table_name='users', postgresql_using='gin')
+    op.drop_index(op.f('ix_teams_tower_id'), table_name='teams')
+    op.drop_index(op.f('ix_teams_name_trgm'), table_name='teams', postgresql_using='gin')
+    op.drop_index(op.f('ix_organizations_tower_id'), table_name='organizations')
+    op.drop_index(op.f('ix_organizations_name_trgm'), table_name='organizations', postgresql_using='gin')
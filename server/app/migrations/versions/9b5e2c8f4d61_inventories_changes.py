@@ -0,0 +1,34 @@
+"""inventories changes
+
+Revision ID: 9b5e2c8f4d61
+Revises: 4d8b1e7f3a29
+Create Date: 2026-10-18 19:21:08.314752
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b5e2c8f4d61'
+down_revision: Union[str, None] = '4d8b1e7f3a29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('inventories_changes',
+    sa.Column('inventory_id', sa.Integer(), nullable=False),
+    sa.Column('changed_by', sa.String(), nullable=False),
+    sa.Column('changed_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['inventory_id'], ['inventories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('inventory_id')
+    )
+    op.create_index(op.f('ix_inventories_changes_changed_at'), 'inventories_changes', ['changed_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_inventories_changes_changed_at'), table_name='inventories_changes')
+    op.drop_table('inventories_changes')
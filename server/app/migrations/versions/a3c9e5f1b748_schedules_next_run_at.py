@@ -0,0 +1,36 @@
+"""schedules next run at
+
+Revision ID: a3c9e5f1b748
+Revises: 8d4f2b6a1c37
+Create Date: 2026-10-18 14:12:41.503918
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e5f1b748'
+down_revision: Union[str, None] = '8d4f2b6a1c37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('templates_schedules', sa.Column('next_run_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.create_index(op.f('ix_templates_schedules_next_run_at'), 'templates_schedules', ['next_run_at'], unique=False)
+    op.add_column('projects_schedules', sa.Column('next_run_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.create_index(op.f('ix_projects_schedules_next_run_at'), 'projects_schedules', ['next_run_at'], unique=False)
+    op.add_column('inventories_schedules', sa.Column('next_run_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.create_index(op.f('ix_inventories_schedules_next_run_at'), 'inventories_schedules', ['next_run_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_inventories_schedules_next_run_at'), table_name='inventories_schedules')
+    op.drop_column('inventories_schedules', 'next_run_at')
+    op.drop_index(op.f('ix_projects_schedules_next_run_at'), table_name='projects_schedules')
+    op.drop_column('projects_schedules', 'next_run_at')
+    op.drop_index(op.f('ix_templates_schedules_next_run_at'), table_name='templates_schedules')
+    op.drop_column('templates_schedules', 'next_run_at')
@@ -0,0 +1,33 @@
+"""schedules in crontab
+
+Revision ID: b5d2f7e9a314
+Revises: e1a7c4b9d268
+Create Date: 2026-10-19 09:41:27.205613
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d2f7e9a314'
+down_revision: Union[str, None] = 'e1a7c4b9d268'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('templates_schedules', sa.Column('in_crontab', sa.Boolean(), server_default='TRUE', nullable=False))
+    op.alter_column('templates_schedules', 'in_crontab', server_default='FALSE')
+    op.add_column('projects_schedules', sa.Column('in_crontab', sa.Boolean(), server_default='TRUE', nullable=False))
+    op.alter_column('projects_schedules', 'in_crontab', server_default='FALSE')
+    op.add_column('inventories_schedules', sa.Column('in_crontab', sa.Boolean(), server_default='TRUE', nullable=False))
+    op.alter_column('inventories_schedules', 'in_crontab', server_default='FALSE')
+
+
+def downgrade() -> None:
+    op.drop_column('inventories_schedules', 'in_crontab')
+    op.drop_column('projects_schedules', 'in_crontab')
+    op.drop_column('templates_schedules', 'in_crontab')
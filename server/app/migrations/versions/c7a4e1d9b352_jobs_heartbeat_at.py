@@ -0,0 +1,26 @@
+"""jobs heartbeat at
+
+Revision ID: c7a4e1d9b352
+Revises: 9b5e2c8f4d61
+Create Date: 2026-10-18 21:04:37.518226
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7a4e1d9b352'
+down_revision: Union[str, None] = '9b5e2c8f4d61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('heartbeat_at', sa.TIMESTAMP(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'heartbeat_at')
@@ -0,0 +1,28 @@
+"""inventories changes queued at
+
+Revision ID: e1a7c4b9d268
+Revises: c7a4e1d9b352
+Create Date: 2026-10-18 22:12:49.630184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1a7c4b9d268'
+down_revision: Union[str, None] = 'c7a4e1d9b352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('inventories_changes', sa.Column('queued_at', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.create_index(op.f('ix_inventories_changes_queued_at'), 'inventories_changes', ['queued_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_inventories_changes_queued_at'), table_name='inventories_changes')
+    op.drop_column('inventories_changes', 'queued_at')
@@ -0,0 +1,36 @@
+"""schedules last run at
+
+Revision ID: e6b2d9a4c153
+Revises: a3c9e5f1b748
+Create Date: 2026-10-18 15:26:08.117342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6b2d9a4c153'
+down_revision: Union[str, None] = 'a3c9e5f1b748'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('templates_schedules', sa.Column('last_run_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.create_index(op.f('ix_templates_schedules_last_run_at'), 'templates_schedules', ['last_run_at'], unique=False)
+    op.add_column('projects_schedules', sa.Column('last_run_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.create_index(op.f('ix_projects_schedules_last_run_at'), 'projects_schedules', ['last_run_at'], unique=False)
+    op.add_column('inventories_schedules', sa.Column('last_run_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.create_index(op.f('ix_inventories_schedules_last_run_at'), 'inventories_schedules', ['last_run_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_inventories_schedules_last_run_at'), table_name='inventories_schedules')
+    op.drop_column('inventories_schedules', 'last_run_at')
+    op.drop_index(op.f('ix_projects_schedules_last_run_at'), table_name='projects_schedules')
+    op.drop_column('projects_schedules', 'last_run_at')
+    op.drop_index(op.f('ix_templates_schedules_last_run_at'), table_name='templates_schedules')
+    op.drop_column('templates_schedules', 'last_run_at')
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Enum, Integer, String, ForeignKey
+from sqlalchemy import Column, Enum, Integer, String, ForeignKey, Index
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
 from sqlalchemy.orm import relationship
@@ -8,6 +8,20 @@ from ..database.connection import Base
 class Credential(Base):
     __tablename__ = "credentials"
 
+    __table_args__ = (
+        Index(
+            "ix_credentials_created_by_organization_id",
+            "created_by",
+            "organization_id"
+        ),
+        Index(
+            "ix_credentials_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"}
+        )
+    )
+
     id = Column(
         Integer,
         primary_key=True,
@@ -66,7 +80,8 @@ class Credential(Base):
         ForeignKey(
             "organizations.id",
             ondelete="CASCADE"
-        )
+        ),
+        index=True
     )
 
     organization = relationship("Organization")
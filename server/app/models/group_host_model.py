@@ -13,7 +13,8 @@ class GroupHost(Base):
             increment=1,
             minvalue=1,
             cycle=True
-        )
+        ),
+        index=True
     )
     group_id = Column(
         Integer,
@@ -29,7 +30,8 @@ class GroupHost(Base):
             "hosts.id",
             ondelete="CASCADE"
         ),
-        primary_key=True
+        primary_key=True,
+        index=True
     )
 
     group = relationship("Group")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
 from sqlalchemy.orm import relationship
@@ -8,6 +8,20 @@ from ..database.connection import Base
 class Group(Base):
     __tablename__ = "groups"
 
+    __table_args__ = (
+        Index(
+            "ix_groups_created_by_organization_id",
+            "created_by",
+            "organization_id"
+        ),
+        Index(
+            "ix_groups_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"}
+        )
+    )
+
     id = Column(
         Integer,
         primary_key=True,
@@ -45,7 +59,8 @@ class Group(Base):
         ForeignKey(
             "organizations.id",
             ondelete="CASCADE"
-        )
+        ),
+        index=True
     )
 
     organization = relationship("Organization")
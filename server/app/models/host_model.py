@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Index
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
 from sqlalchemy.orm import relationship
@@ -8,6 +8,26 @@ from ..database.connection import Base
 class Host(Base):
     __tablename__ = "hosts"
 
+    __table_args__ = (
+        Index(
+            "ix_hosts_created_by_organization_id",
+            "created_by",
+            "organization_id"
+        ),
+        Index(
+            "ix_hosts_hostname_trgm",
+            "hostname",
+            postgresql_using="gin",
+            postgresql_ops={"hostname": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_hosts_ipv4_trgm",
+            "ipv4",
+            postgresql_using="gin",
+            postgresql_ops={"ipv4": "gin_trgm_ops"}
+        )
+    )
+
     id = Column(
         Integer,
         primary_key=True,
@@ -56,7 +76,8 @@ class Host(Base):
         ForeignKey(
             "organizations.id",
             ondelete="CASCADE"
-        )
+        ),
+        index=True
     )
 
     organization = relationship("Organization")
@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.sql.sqltypes import TIMESTAMP
+from sqlalchemy.sql.expression import text
+from ..database.connection import Base
+
+
+class InventoryChange(Base):
+    __tablename__ = "inventories_changes"
+
+    inventory_id = Column(
+        Integer,
+        ForeignKey(
+            "inventories.id",
+            ondelete="CASCADE"
+        ),
+        primary_key=True
+    )
+    changed_by = Column(
+        String,
+        nullable=False
+    )
+    changed_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text('now()'),
+        index=True
+    )
+    queued_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        server_default=text('now()'),
+        index=True
+    )
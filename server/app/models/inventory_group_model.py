@@ -13,7 +13,8 @@ class InventoryGroup(Base):
             increment=1,
             minvalue=1,
             cycle=True
-        )
+        ),
+        index=True
     )
     inventory_id = Column(
         Integer,
@@ -29,7 +30,8 @@ class InventoryGroup(Base):
             "groups.id",
             ondelete="CASCADE"
         ),
-        primary_key=True
+        primary_key=True,
+        index=True
     )
 
     inventory = relationship("Inventory")
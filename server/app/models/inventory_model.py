@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Enum, Integer, String, ForeignKey
+from sqlalchemy import Column, Enum, Integer, String, ForeignKey, Index
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
 from sqlalchemy.orm import relationship
@@ -8,6 +8,20 @@ from ..database.connection import Base
 class Inventory(Base):
     __tablename__ = "inventories"
 
+    __table_args__ = (
+        Index(
+            "ix_inventories_created_by_organization_id",
+            "created_by",
+            "organization_id"
+        ),
+        Index(
+            "ix_inventories_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"}
+        )
+    )
+
     id = Column(
         Integer,
         primary_key=True,
@@ -31,6 +45,10 @@ class Inventory(Base):
         String,
         nullable=False
     )
+    content_hash = Column(
+        String,
+        nullable=True
+    )
     created_at = Column(
         TIMESTAMP(timezone=True),
         nullable=False,
@@ -55,7 +73,8 @@ class Inventory(Base):
         ForeignKey(
             "organizations.id",
             ondelete="CASCADE"
-        )
+        ),
+        index=True
     )
 
     organization = relationship("Organization")
@@ -1,13 +1,23 @@
-from sqlalchemy import Column, Integer, String, Enum, ForeignKey
+from sqlalchemy import Column, Integer, String, Enum, ForeignKey, func, literal, select, Index
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, column_property
 from ..database.connection import Base
+from .job_output_chunk_model import JobOutputChunk
 
 
 class Job(Base):
     __tablename__ = "jobs"
 
+    __table_args__ = (
+        Index(
+            "ix_jobs_launched_by_organization_id",
+            "launched_by",
+            "organization_id"
+        ),
+    )
+
     id = Column(
         Integer,
         primary_key=True,
@@ -26,13 +36,13 @@ class Job(Base):
     )
     finished_at = Column(
         TIMESTAMP(timezone=True),
-        nullable=False
+        nullable=True
     )
-    launched_by = Column(
-        String,
-        nullable=False
+    heartbeat_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=True
     )
-    output = Column(
+    launched_by = Column(
         String,
         nullable=False
     )
@@ -42,7 +52,8 @@ class Job(Base):
             "templates.id",
             ondelete="CASCADE"
         ),
-        nullable=False
+        nullable=False,
+        index=True
     )
     organization_id = Column(
         Integer,
@@ -50,7 +61,23 @@ class Job(Base):
             "organizations.id",
             ondelete="CASCADE"
         ),
-        nullable=False
+        nullable=False,
+        index=True
+    )
+
+    output = column_property(
+        select(
+            func.coalesce(
+                func.string_agg(
+                    JobOutputChunk.content,
+                    aggregate_order_by(literal(''), JobOutputChunk.seq)
+                ),
+                ''
+            )
+        ).where(
+            JobOutputChunk.job_id == id
+        ).scalar_subquery(),
+        deferred=True
     )
 
     template = relationship("Template")
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, BigInteger, String, ForeignKey
+from ..database.connection import Base
+
+
+class JobOutputChunk(Base):
+    __tablename__ = "jobs_output_chunks"
+
+    job_id = Column(
+        Integer,
+        ForeignKey(
+            "jobs.id",
+            ondelete="CASCADE"
+        ),
+        primary_key=True
+    )
+    seq = Column(
+        Integer,
+        primary_key=True
+    )
+    start_offset = Column(
+        BigInteger,
+        nullable=False
+    )
+    content_length = Column(
+        Integer,
+        nullable=False
+    )
+    content = Column(
+        String,
+        nullable=False
+    )
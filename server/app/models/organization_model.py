@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Integer, String, Index
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
 from ..database.connection import Base
@@ -8,6 +8,15 @@ from sqlalchemy.orm import relationship
 class Organization(Base):
     __tablename__ = "organizations"
 
+    __table_args__ = (
+        Index(
+            "ix_organizations_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"}
+        ),
+    )
+
     id = Column(
         Integer,
         primary_key=True,
@@ -21,6 +30,10 @@ class Organization(Base):
         String,
         nullable=True
     )
+    schedule_spread_window = Column(
+        Integer,
+        nullable=True
+    )
     created_at = Column(
         TIMESTAMP(timezone=True),
         nullable=False,
@@ -46,7 +59,8 @@ class Organization(Base):
             "towers.id",
             ondelete="CASCADE"
         ),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     tower = relationship("Tower")
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Identity, Integer, ForeignKey, String
+from sqlalchemy import Boolean, Column, Identity, Integer, ForeignKey, String
+from sqlalchemy.sql.sqltypes import TIMESTAMP
 from ..database.connection import Base
 from sqlalchemy.orm import relationship
 
@@ -13,7 +14,8 @@ class ProjectSchedule(Base):
             increment=1,
             minvalue=1,
             cycle=True
-        )
+        ),
+        index=True
     )
     cron_job_id = Column(
         String,
@@ -34,7 +36,23 @@ class ProjectSchedule(Base):
             "schedules.id",
             ondelete="CASCADE"
         ),
-        primary_key=True
+        primary_key=True,
+        index=True
+    )
+    next_run_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=True,
+        index=True
+    )
+    last_run_at = Column(
+        TIMESTAMP(timezone=True),
+        nullable=True,
+        index=True
+    )
+    in_crontab = Column(
+        Boolean,
+        nullable=False,
+        server_default='FALSE'
     )
 
     project = relationship("Project")
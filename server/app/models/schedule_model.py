@@ -1,4 +1,4 @@
-from sqlalchemy import ARRAY, Column, Enum, Integer, String, ForeignKey, CheckConstraint
+from sqlalchemy import ARRAY, Column, Enum, Integer, String, ForeignKey, CheckConstraint, Index
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
 from sqlalchemy.orm import relationship
@@ -8,6 +8,20 @@ from ..database.connection import Base
 class Schedule(Base):
     __tablename__ = "schedules"
 
+    __table_args__ = (
+        Index(
+            "ix_schedules_created_by_organization_id",
+            "created_by",
+            "organization_id"
+        ),
+        Index(
+            "ix_schedules_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"}
+        )
+    )
+
     id = Column(
         Integer,
         primary_key=True,
@@ -44,6 +58,10 @@ class Schedule(Base):
         ARRAY(Integer),
         nullable=True
     )
+    spread_window = Column(
+        Integer,
+        nullable=True
+    )
     created_at = Column(
         TIMESTAMP(timezone=True),
         nullable=False,
@@ -68,7 +86,8 @@ class Schedule(Base):
         ForeignKey(
             "organizations.id",
             ondelete="CASCADE"
-        )
+        ),
+        index=True
     )
 
     organization = relationship("Organization")
@@ -13,7 +13,8 @@ class TeamCredential(Base):
             increment=1,
             minvalue=1,
             cycle=True
-        )
+        ),
+        index=True
     )
     team_id = Column(
         Integer,
@@ -29,7 +30,8 @@ class TeamCredential(Base):
             "credentials.id",
             ondelete="CASCADE"
         ),
-        primary_key=True
+        primary_key=True,
+        index=True
     )
 
     team = relationship("Team")
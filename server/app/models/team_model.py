@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
 from ..database.connection import Base
@@ -8,6 +8,15 @@ from sqlalchemy.orm import relationship
 class Team(Base):
     __tablename__ = "teams"
 
+    __table_args__ = (
+        Index(
+            "ix_teams_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"}
+        ),
+    )
+
     id = Column(
         Integer,
         primary_key=True,
@@ -46,7 +55,8 @@ class Team(Base):
             "towers.id",
             ondelete="CASCADE"
         ),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     tower = relationship("Tower")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Enum, Boolean, ForeignKey, Index
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
 from ..database.connection import Base
@@ -8,6 +8,20 @@ from sqlalchemy.orm import relationship
 class Template(Base):
     __tablename__ = "templates"
 
+    __table_args__ = (
+        Index(
+            "ix_templates_created_by_organization_id",
+            "created_by",
+            "organization_id"
+        ),
+        Index(
+            "ix_templates_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"}
+        )
+    )
+
     id = Column(
         Integer,
         primary_key=True,
@@ -81,7 +95,8 @@ class Template(Base):
             "inventories.id",
             ondelete="CASCADE"
         ),
-        nullable=False
+        nullable=False,
+        index=True
     )
     project_id = Column(
         Integer,
@@ -89,7 +104,8 @@ class Template(Base):
             "projects.id",
             ondelete="CASCADE"
         ),
-        nullable=False
+        nullable=False,
+        index=True
     )
     credential_id = Column(
         Integer,
@@ -97,7 +113,8 @@ class Template(Base):
             "credentials.id",
             ondelete="CASCADE"
         ),
-        nullable=False
+        nullable=False,
+        index=True
     )
     organization_id = Column(
         Integer,
@@ -105,7 +122,8 @@ class Template(Base):
             "organizations.id",
             ondelete="CASCADE"
         ),
-        nullable=False
+        nullable=False,
+        index=True
     )
 
     inventory = relationship("Inventory")
@@ -13,7 +13,8 @@ class UserInventory(Base):
             increment=1,
             minvalue=1,
             cycle=True
-        )
+        ),
+        index=True
     )
     user_id = Column(
         Integer,
@@ -29,7 +30,8 @@ class UserInventory(Base):
             "inventories.id",
             ondelete="CASCADE"
         ),
-        primary_key=True
+        primary_key=True,
+        index=True
     )
 
     user = relationship("User")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum, ARRAY, ForeignKey
+from sqlalchemy import Column, Integer, String, Enum, ARRAY, ForeignKey, Index
 from sqlalchemy.sql.sqltypes import TIMESTAMP
 from sqlalchemy.sql.expression import text
 from ..database.connection import Base
@@ -8,6 +8,26 @@ from sqlalchemy.orm import relationship
 class User(Base):
     __tablename__ = "users"
 
+    __table_args__ = (
+        Index(
+            "ix_users_tower_id_username",
+            "tower_id",
+            "username"
+        ),
+        Index(
+            "ix_users_first_name_trgm",
+            "first_name",
+            postgresql_using="gin",
+            postgresql_ops={"first_name": "gin_trgm_ops"}
+        ),
+        Index(
+            "ix_users_last_name_trgm",
+            "last_name",
+            postgresql_using="gin",
+            postgresql_ops={"last_name": "gin_trgm_ops"}
+        )
+    )
+
     id = Column(
         Integer,
         primary_key=True,
@@ -16,7 +16,7 @@ router = APIRouter(
 
 
 @router.post("/register", response_model=auth_schema.RegisterAccountResponse)
-async def register_account(
+def register_account(
     payload: auth_schema.RegisterAccountRequest,
     db: Session = Depends(get_db)
 ):
@@ -170,7 +170,7 @@ async def register_account(
 
 
 @router.post("/login", response_model=auth_schema.TokenResponse)
-async def login(
+def login(
     payload: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
@@ -1,12 +1,15 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..models import credential_model, organization_model, user_credential_model, user_model
-from ..schemas import credential_schema, user_schema, common_schema
-from ..database.connection import get_db
+from ..schemas import credential_schema, user_schema
+from ..database.connection import get_db, transaction
+from ..database.replica import get_read_db
 from app.utils.check_value_exists import check_if_in_list_of_dict
 from app.utils.get_ids import get_ids_list
+from app.utils.assignments import insert_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -16,18 +19,18 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[credential_schema.CredentialResponse])
-async def get_credentials(
-    db: Session = Depends(get_db),
+def get_credentials(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     credentials_query = db.query(
         credential_model.Credential
+    ).options(
+        *get_loader_options(credential_model.Credential, credential_schema.CredentialResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == credential_model.Credential.organization_id
     ).filter(
@@ -41,25 +44,12 @@ async def get_credentials(
             credential_model.Credential.name.contains(search_by_name)
         )
 
-    if skip:
-        credentials_query = credentials_query.offset(skip)
-
-    if limit:
-        credentials_query = credentials_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            credentials_query = credentials_query.order_by(desc(sort))
-        else:
-            credentials_query = credentials_query.order_by(sort)
-    else:
-        credentials_query = credentials_query.order_by(
-            credential_model.Credential.id)
-
-    if limit == 1:
-        credentials = credentials_query.first()
-    else:
-        credentials = credentials_query.all()
+    credentials = paginate(
+        credentials_query,
+        response,
+        credential_model.Credential.id,
+        pagination
+    )
 
     if not credentials:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -69,25 +59,23 @@ async def get_credentials(
 
 
 @router.get("/owner", response_model=List[credential_schema.CredentialResponse])
-async def get_my_credentials(
-    db: Session = Depends(get_db),
+def get_my_credentials(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     my_credentials_query = db.query(
         credential_model.Credential
+    ).options(
+        *get_loader_options(credential_model.Credential, credential_schema.CredentialResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == credential_model.Credential.organization_id
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id,
         credential_model.Credential.created_by == current_user['user'].username
-    ).distinct(
-        credential_model.Credential.id
     )
 
     if search_by_name:
@@ -95,25 +83,12 @@ async def get_my_credentials(
             credential_model.Credential.name.contains(search_by_name)
         )
 
-    if skip:
-        my_credentials_query = my_credentials_query.offset(skip)
-
-    if limit:
-        my_credentials_query = my_credentials_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            my_credentials_query = my_credentials_query.order_by(desc(sort))
-        else:
-            my_credentials_query = my_credentials_query.order_by(sort)
-    else:
-        my_credentials_query = my_credentials_query.order_by(
-            credential_model.Credential.id)
-
-    if limit == 1:
-        my_credentials = my_credentials_query.first()
-    else:
-        my_credentials = my_credentials_query.all()
+    my_credentials = paginate(
+        my_credentials_query,
+        response,
+        credential_model.Credential.id,
+        pagination
+    )
 
     if not my_credentials:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -123,7 +98,7 @@ async def get_my_credentials(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=credential_schema.CredentialResponse)
-async def create_credentials(
+def create_credentials(
     payload: credential_schema.CredentialRequest,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -191,68 +166,39 @@ async def create_credentials(
 
     new_credential = credential_model.Credential(**updated_payload)
 
-    db.add(new_credential)
-    db.commit()
-    db.refresh(new_credential)
-
-    if not new_credential:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't create credential! Something went wrong")
-    else:
-        if current_user["user"].user_type != user_schema.UserType.admin:
-            user_query = db.query(
-                user_model.User
-            ).filter(
-                user_model.User.tower_id == current_user["user"].tower.id,
-                user_model.User.user_type == user_schema.UserType.admin
-            )
-            user = user_query.first()
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Can't assign user to credential! Provide a valid user")
-
-            admin_credential_payload = dict(
-                user_id=user.id,
-                credential_id=new_credential.id
-            )
-            new_admin_credential = user_credential_model.UserCredential(
-                **admin_credential_payload)
-
-            db.add(new_admin_credential)
-            db.commit()
-            db.refresh(new_admin_credential)
-
-            if not new_admin_credential:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign user to credential! Something went wrong")
-
-        user_credential_payload = dict(
-            user_id=current_user["user"].id,
-            credential_id=new_credential.id
+    owners_ids = oauth2.get_owners_ids(db, current_user["user"])
+    if not owners_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign user to credential! Provide a valid user")
+
+    with transaction(db):
+        db.add(new_credential)
+        db.flush()
+
+        insert_assignments(
+            db,
+            user_credential_model.UserCredential.credential_id,
+            new_credential.id,
+            user_credential_model.UserCredential.user_id,
+            owners_ids
         )
-        new_user_credential = user_credential_model.UserCredential(
-            **user_credential_payload)
-
-        db.add(new_user_credential)
-        db.commit()
-        db.refresh(new_user_credential)
 
-        if not new_user_credential:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Can't assign user to credential! Something went wrong")
+    db.refresh(new_credential)
 
     return new_credential
 
 
 @router.get("/{id}", response_model=credential_schema.CredentialResponse)
-async def get_credential(
+def get_credential(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
     credential_query = db.query(
         credential_model.Credential
+    ).options(
+        *get_loader_options(credential_model.Credential, credential_schema.CredentialResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == credential_model.Credential.organization_id
     ).filter(
@@ -272,7 +218,7 @@ async def get_credential(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_credential(
+def delete_credential(
     selected: List[int],
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -301,7 +247,7 @@ async def delete_credential(
 
 
 @router.put("/{id}", response_model=credential_schema.CredentialResponse)
-async def update_credential(
+def update_credential(
     id: int,
     payload: credential_schema.CredentialUpdateRequest,
     db: Session = Depends(get_db),
@@ -2,8 +2,11 @@ from fastapi import Depends, APIRouter
 from sqlalchemy.orm import Session
 from ..models import schedule_model, organization_model, user_model, user_organization_model, user_team_model, user_credential_model, credential_model, user_inventory_model, inventory_model, user_group_model, group_model, user_host_model, host_model, user_project_model, project_model, user_template_model, template_model, job_model
 from ..schemas import user_schema, dashboard_schema
-from ..database.connection import get_db
-from app.utils.get_ids import get_ids_list, get_templates_ids_list_from_response
+from ..database.replica import get_read_db
+from ..configs.env_vars import settings
+from app.utils.get_ids import get_ids_list
+from app.utils.query_orm import get_count_subquery
+from app.utils.ttl_cache import TTLCache
 from ..auth import oauth2
 
 router = APIRouter(
@@ -11,19 +14,24 @@ router = APIRouter(
     tags=['Dashboards']
 )
 
+dashboard_totals_cache = TTLCache(settings.dashboard_cache_ttl)
+
 
 @router.get("/totals", response_model=dashboard_schema.DashboardTotalsResponse)
-async def get_dashboards_totals(
-    db: Session = Depends(get_db),
+def get_dashboards_totals(
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
+    totals = dashboard_totals_cache.get(current_user["user"].id)
+    if totals:
+        return totals
+
     users_query = db.query(
         user_model.User
     ).filter(
         user_model.User.tower_id == current_user["user"].tower.id
     )
-    users = users_query.all()
 
     user_organizations_query = db.query(
         user_organization_model.UserOrganization
@@ -33,7 +41,6 @@ async def get_dashboards_totals(
         user_model.User.tower_id == current_user["user"].tower.id,
         user_organization_model.UserOrganization.user_id == current_user["user"].id
     )
-    user_organizations = user_organizations_query.all()
 
     user_teams_query = db.query(
         user_team_model.UserTeam
@@ -43,7 +50,6 @@ async def get_dashboards_totals(
         user_model.User.tower_id == current_user["user"].tower.id,
         user_team_model.UserTeam.user_id == current_user["user"].id
     )
-    user_teams = user_teams_query.all()
 
     user_credentials_query = db.query(
         user_credential_model.UserCredential
@@ -57,7 +63,6 @@ async def get_dashboards_totals(
             get_ids_list(current_user['organizations'])),
         user_credential_model.UserCredential.user_id == current_user["user"].id
     )
-    user_credentials = user_credentials_query.all()
 
     user_inventories_query = db.query(
         user_inventory_model.UserInventory
@@ -71,7 +76,6 @@ async def get_dashboards_totals(
             get_ids_list(current_user['organizations'])),
         user_inventory_model.UserInventory.user_id == current_user["user"].id
     )
-    user_inventories = user_inventories_query.all()
 
     user_groups_query = db.query(
         user_group_model.UserGroup
@@ -85,7 +89,6 @@ async def get_dashboards_totals(
             get_ids_list(current_user['organizations'])),
         user_group_model.UserGroup.user_id == current_user["user"].id
     )
-    user_groups = user_groups_query.all()
 
     user_hosts_query = db.query(
         user_host_model.UserHost
@@ -99,7 +102,6 @@ async def get_dashboards_totals(
             get_ids_list(current_user['organizations'])),
         user_host_model.UserHost.user_id == current_user["user"].id
     )
-    user_hosts = user_hosts_query.all()
 
     user_projects_query = db.query(
         user_project_model.UserProject
@@ -113,7 +115,6 @@ async def get_dashboards_totals(
             get_ids_list(current_user['organizations'])),
         user_project_model.UserProject.user_id == current_user["user"].id
     )
-    user_projects = user_projects_query.all()
 
     user_templates_query = db.query(
         user_template_model.UserTemplate
@@ -127,7 +128,6 @@ async def get_dashboards_totals(
             get_ids_list(current_user['organizations'])),
         user_template_model.UserTemplate.user_id == current_user["user"].id
     )
-    user_templates = user_templates_query.all()
 
     schedules_query = db.query(
         schedule_model.Schedule
@@ -138,7 +138,6 @@ async def get_dashboards_totals(
         schedule_model.Schedule.organization_id.in_(
             get_ids_list(current_user['organizations']))
     )
-    schedules = schedules_query.all()
 
     jobs_query = db.query(
         job_model.Job
@@ -151,20 +150,38 @@ async def get_dashboards_totals(
         job_model.Job.organization_id.in_(
             get_ids_list(current_user['organizations'])),
         job_model.Job.template_id.in_(
-            get_templates_ids_list_from_response(user_templates))
+            user_templates_query.with_entities(
+                user_template_model.UserTemplate.template_id
+            ).scalar_subquery()
+        )
+    )
+
+    totals_query = db.query(
+        get_count_subquery(users_query, user_model.User.id).label(
+            "total_users"),
+        get_count_subquery(user_teams_query, user_team_model.UserTeam.team_id).label(
+            "total_teams"),
+        get_count_subquery(user_organizations_query, user_organization_model.UserOrganization.organization_id).label(
+            "total_organizations"),
+        get_count_subquery(user_credentials_query, user_credential_model.UserCredential.credential_id).label(
+            "total_credentials"),
+        get_count_subquery(user_inventories_query, user_inventory_model.UserInventory.inventory_id).label(
+            "total_inventories"),
+        get_count_subquery(user_groups_query, user_group_model.UserGroup.group_id).label(
+            "total_groups"),
+        get_count_subquery(user_hosts_query, user_host_model.UserHost.host_id).label(
+            "total_hosts"),
+        get_count_subquery(user_projects_query, user_project_model.UserProject.project_id).label(
+            "total_projects"),
+        get_count_subquery(user_templates_query, user_template_model.UserTemplate.template_id).label(
+            "total_templates"),
+        get_count_subquery(schedules_query, schedule_model.Schedule.id).label(
+            "total_schedules"),
+        get_count_subquery(jobs_query, job_model.Job.id).label(
+            "total_jobs")
     )
-    jobs = jobs_query.all()
-
-    return {
-        "total_users": len(users),
-        "total_teams": len(user_teams),
-        "total_organizations": len(user_organizations),
-        "total_credentials": len(user_credentials),
-        "total_inventories": len(user_inventories),
-        "total_groups": len(user_groups),
-        "total_hosts": len(user_hosts),
-        "total_projects": len(user_projects),
-        "total_templates": len(user_templates),
-        "total_schedules": len(schedules),
-        "total_jobs": len(jobs)
-    }
+    totals = dict(totals_query.one()._mapping)
+
+    dashboard_totals_cache.set(current_user["user"].id, totals)
+
+    return totals
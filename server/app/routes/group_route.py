@@ -1,12 +1,16 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from typing import Optional, List
-from ..models import group_model, organization_model, user_model, user_group_model
-from ..schemas import group_schema, user_schema, common_schema
+from ..models import group_model, organization_model, user_group_model
+from ..schemas import group_schema, user_schema
 from app.utils.check_value_exists import check_if_in_list_of_dict
 from app.utils.get_ids import get_ids_list
-from ..database.connection import get_db
+from app.utils.inventory_changes import mark_inventories_changed
+from ..database.connection import get_db, transaction
+from ..database.replica import get_read_db
+from app.utils.assignments import insert_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -16,18 +20,18 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[group_schema.GroupResponse])
-async def get_groups(
-    db: Session = Depends(get_db),
+def get_groups(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     groups_query = db.query(
         group_model.Group
+    ).options(
+        *get_loader_options(group_model.Group, group_schema.GroupResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == group_model.Group.organization_id
     ).filter(
@@ -41,24 +45,12 @@ async def get_groups(
             group_model.Group.name.contains(search_by_name)
         )
 
-    if skip:
-        groups_query = groups_query.offset(skip)
-
-    if limit:
-        groups_query = groups_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            groups_query = groups_query.order_by(desc(sort))
-        else:
-            groups_query = groups_query.order_by(sort)
-    else:
-        groups_query = groups_query.order_by(group_model.Group.id)
-
-    if limit == 1:
-        groups = groups_query.first()
-    else:
-        groups = groups_query.all()
+    groups = paginate(
+        groups_query,
+        response,
+        group_model.Group.id,
+        pagination
+    )
 
     if not groups:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -68,25 +60,23 @@ async def get_groups(
 
 
 @router.get("/owner", response_model=List[group_schema.GroupResponse])
-async def get_my_groups(
-    db: Session = Depends(get_db),
+def get_my_groups(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     my_groups_query = db.query(
         group_model.Group
+    ).options(
+        *get_loader_options(group_model.Group, group_schema.GroupResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == group_model.Group.organization_id
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id,
         group_model.Group.created_by == current_user['user'].username
-    ).distinct(
-        group_model.Group.id
     )
 
     if search_by_name:
@@ -94,24 +84,12 @@ async def get_my_groups(
             group_model.Group.name.contains(search_by_name)
         )
 
-    if skip:
-        my_groups_query = my_groups_query.offset(skip)
-
-    if limit:
-        my_groups_query = my_groups_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            my_groups_query = my_groups_query.order_by(desc(sort))
-        else:
-            my_groups_query = my_groups_query.order_by(sort)
-    else:
-        my_groups_query = my_groups_query.order_by(group_model.Group.id)
-
-    if limit == 1:
-        my_groups = my_groups_query.first()
-    else:
-        my_groups = my_groups_query.all()
+    my_groups = paginate(
+        my_groups_query,
+        response,
+        group_model.Group.id,
+        pagination
+    )
 
     if not my_groups:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -121,7 +99,7 @@ async def get_my_groups(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=group_schema.GroupResponse)
-async def create_groups(
+def create_groups(
     payload: group_schema.GroupRequest,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -168,66 +146,39 @@ async def create_groups(
 
     new_group = group_model.Group(**updated_payload)
 
-    db.add(new_group)
-    db.commit()
-    db.refresh(new_group)
-
-    if not new_group:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't create group! Something went wrong")
-    else:
-        if current_user["user"].user_type != user_schema.UserType.admin:
-            user_query = db.query(
-                user_model.User
-            ).filter(
-                user_model.User.tower_id == current_user["user"].tower.id,
-                user_model.User.user_type == user_schema.UserType.admin
-            )
-            user = user_query.first()
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Can't assign user to group! Provide a valid user")
-
-            admin_group_payload = dict(
-                user_id=user.id,
-                group_id=new_group.id
-            )
-            new_admin_group = user_group_model.UserGroup(**admin_group_payload)
-
-            db.add(new_admin_group)
-            db.commit()
-            db.refresh(new_admin_group)
-
-            if not new_admin_group:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign user to group! Something went wrong")
-
-        user_group_payload = dict(
-            user_id=current_user["user"].id,
-            group_id=new_group.id
+    owners_ids = oauth2.get_owners_ids(db, current_user["user"])
+    if not owners_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign user to group! Provide a valid user")
+
+    with transaction(db):
+        db.add(new_group)
+        db.flush()
+
+        insert_assignments(
+            db,
+            user_group_model.UserGroup.group_id,
+            new_group.id,
+            user_group_model.UserGroup.user_id,
+            owners_ids
         )
-        new_user_group = user_group_model.UserGroup(**user_group_payload)
-
-        db.add(new_user_group)
-        db.commit()
-        db.refresh(new_user_group)
 
-        if not new_user_group:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Can't assign user to group! Something went wrong")
+    db.refresh(new_group)
 
     return new_group
 
 
 @router.get("/{id}", response_model=group_schema.GroupResponse)
-async def get_group(
+def get_group(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
     group_query = db.query(
         group_model.Group
+    ).options(
+        *get_loader_options(group_model.Group, group_schema.GroupResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == group_model.Group.organization_id
     ).filter(
@@ -247,7 +198,7 @@ async def get_group(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_group(
+def delete_group(
     selected: List[int],
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -269,6 +220,9 @@ async def delete_group(
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="Not authorized to perform requested action")
 
+    mark_inventories_changed(
+        db, current_user["user"].username, groups_ids=selected)
+
     groups_query.delete(synchronize_session=False)
     db.commit()
 
@@ -276,7 +230,7 @@ async def delete_group(
 
 
 @router.put("/{id}", response_model=group_schema.GroupResponse)
-async def update_group(
+def update_group(
     id: int,
     payload: group_schema.GroupRequest,
     db: Session = Depends(get_db),
@@ -331,6 +285,9 @@ async def update_group(
             raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                                 detail="Can't update group! Group already exists!")
 
+        mark_inventories_changed(
+            db, current_user["user"].username, groups_ids=[id])
+
     updated_payload = dict(
         **payload.dict(),
         last_modified_by=current_user["user"].username
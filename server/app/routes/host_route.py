@@ -1,13 +1,23 @@
-from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc, or_
+from fastapi import File, Form, Query, Response, UploadFile, status, HTTPException, Depends, APIRouter
+from collections import Counter
+from io import TextIOWrapper
+from sqlalchemy import insert, or_
 from sqlalchemy.orm import Session
 from typing import Optional, List
-from ..models import host_model, organization_model, user_model, user_host_model
-from ..schemas import host_schema, user_schema, common_schema, tower_schema
-from ..database.connection import get_db
+from ..models import host_model, organization_model, user_host_model
+from ..schemas import common_schema, host_schema, user_schema, tower_schema
+from ..database.connection import get_db, transaction
+from ..database.replica import get_read_db
 from app.utils.check_value_exists import check_if_in_list_of_dict
-from app.services.tower.tower_service import add_host_fingerprint, delete_host_fingerprint
+from app.services.tower.tower_service import add_host_fingerprint, add_hosts_fingerprints, delete_host_fingerprint
 from app.utils.get_ids import get_ids_list
+from app.utils.inventory_changes import mark_inventories_changed
+from app.utils.assignments import insert_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
+from app.utils.row_serializer import get_row_query, get_rows_response
+from app.utils.export import get_export_response
+from app.utils.host_import import IMPORT_BATCH_SIZE, get_import_format, import_hosts_batch, iterate_batches, parse_inventory
 from ..auth import oauth2
 
 router = APIRouter(
@@ -17,19 +27,19 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[host_schema.HostResponse])
-async def get_hosts(
-    db: Session = Depends(get_db),
+def get_hosts(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_hostname: Optional[str] = "",
     search_by_ipv4: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
-    hosts_query = db.query(
-        host_model.Host
+    hosts_query = get_row_query(
+        db,
+        host_model.Host,
+        host_schema.HostResponse
     ).join(
         organization_model.Organization, organization_model.Organization.id == host_model.Host.organization_id
     ).filter(
@@ -47,93 +57,107 @@ async def get_hosts(
         hosts_query = hosts_query.filter(
             host_model.Host.ipv4.contains(search_by_ipv4))
 
-    if skip:
-        hosts_query = hosts_query.offset(skip)
-
-    if limit:
-        hosts_query = hosts_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            hosts_query = hosts_query.order_by(desc(sort))
-        else:
-            hosts_query = hosts_query.order_by(sort)
-    else:
-        hosts_query = hosts_query.order_by(host_model.Host.id)
-
-    if limit == 1:
-        hosts = hosts_query.first()
-    else:
-        hosts = hosts_query.all()
+    hosts = paginate(
+        hosts_query,
+        response,
+        host_model.Host.id,
+        pagination
+    )
 
     if not hosts:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Cannot find any hosts")
 
-    return hosts
+    return get_rows_response(hosts, host_model.Host, host_schema.HostResponse, response)
 
 
 @router.get("/owner", response_model=List[host_schema.HostResponse])
-async def get_my_hosts(
-    db: Session = Depends(get_db),
+def get_my_hosts(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_hostname: Optional[str] = "",
     search_by_ipv4: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
-    my_hosts_query = db.query(
-        host_model.Host
+    my_hosts_query = get_row_query(
+        db,
+        host_model.Host,
+        host_schema.HostResponse
     ).join(
         organization_model.Organization, organization_model.Organization.id == host_model.Host.organization_id
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id,
         host_model.Host.created_by == current_user['user'].username
-    ).distinct(
-        host_model.Host.id
     )
 
     if search_by_hostname:
-        hosts_query = hosts_query.filter(
+        my_hosts_query = my_hosts_query.filter(
             host_model.Host.hostname.contains(search_by_hostname)
         )
 
     if search_by_ipv4:
-        hosts_query = hosts_query.filter(
+        my_hosts_query = my_hosts_query.filter(
             host_model.Host.ipv4.contains(search_by_ipv4)
         )
 
-    if skip:
-        my_hosts_query = my_hosts_query.offset(skip)
-
-    if limit:
-        my_hosts_query = my_hosts_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            my_hosts_query = my_hosts_query.order_by(desc(sort))
-        else:
-            my_hosts_query = my_hosts_query.order_by(sort)
-    else:
-        my_hosts_query = my_hosts_query.order_by(host_model.Host.id)
-
-    if limit == 1:
-        my_hosts = my_hosts_query.first()
-    else:
-        my_hosts = my_hosts_query.all()
+    my_hosts = paginate(
+        my_hosts_query,
+        response,
+        host_model.Host.id,
+        pagination
+    )
 
     if not my_hosts:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Cannot find any hosts")
 
-    return my_hosts
+    return get_rows_response(my_hosts, host_model.Host, host_schema.HostResponse, response)
+
+
+@router.get("/export")
+def export_hosts(
+    db: Session = Depends(get_read_db),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user),
+    search_by_hostname: Optional[str] = "",
+    search_by_ipv4: Optional[str] = "",
+    export_format: common_schema.ExportFormat = Query(
+        common_schema.ExportFormat.ndjson, alias="format")
+):
+    hosts_query = get_row_query(
+        db,
+        host_model.Host,
+        host_schema.HostResponse
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == host_model.Host.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        host_model.Host.organization_id.in_(
+            get_ids_list(current_user['organizations']))
+    )
+
+    if search_by_hostname:
+        hosts_query = hosts_query.filter(
+            host_model.Host.hostname.contains(search_by_hostname)
+        )
+
+    if search_by_ipv4:
+        hosts_query = hosts_query.filter(
+            host_model.Host.ipv4.contains(search_by_ipv4))
+
+    return get_export_response(
+        hosts_query.order_by(host_model.Host.id),
+        host_model.Host,
+        host_schema.HostResponse,
+        export_format,
+        "hosts"
+    )
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=host_schema.HostResponse)
-async def create_hosts(
+def create_hosts(
     payload: host_schema.HostRequest,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -177,13 +201,19 @@ async def create_hosts(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                             detail="Can't create host! Host already exists!")
 
+    owners_ids = oauth2.get_owners_ids(db, current_user["user"])
+    if not owners_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign user to host! Provide a valid user")
+
     new_host_status = add_host_fingerprint(
         payload.ipv4,
         my_tower.ipv4,
         my_tower.port,
         my_tower.username,
         my_tower.password,
-        10
+        10,
+        tower_id=my_tower.id
     )
     if not new_host_status:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -198,67 +228,252 @@ async def create_hosts(
 
     new_host = host_model.Host(**updated_payload)
 
-    db.add(new_host)
-    db.commit()
+    with transaction(db):
+        db.add(new_host)
+        db.flush()
+
+        insert_assignments(
+            db,
+            user_host_model.UserHost.host_id,
+            new_host.id,
+            user_host_model.UserHost.user_id,
+            owners_ids
+        )
+
     db.refresh(new_host)
 
-    if not new_host:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't create host! Something went wrong")
-    else:
-        if current_user["user"].user_type != user_schema.UserType.admin:
-            user_query = db.query(
-                user_model.User
-            ).filter(
-                user_model.User.tower_id == current_user["user"].tower.id,
-                user_model.User.user_type == user_schema.UserType.admin
-            )
-            user = user_query.first()
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Can't assign user to host! Provide a valid user")
-
-            admin_host_payload = dict(
-                user_id=user.id,
-                host_id=new_host.id
-            )
-            new_admin_host = user_host_model.UserHost(**admin_host_payload)
+    return new_host
+
+
+@router.post("/bulk", status_code=status.HTTP_201_CREATED, response_model=List[host_schema.HostResponse])
+def create_bulk_hosts(
+    payload: List[host_schema.HostRequest],
+    db: Session = Depends(get_db),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user),
+    my_tower: tower_schema.TowerResponse = Depends(oauth2.get_tower)
+):
+    if not payload or any(not host.hostname or not host.ipv4 or not host.organization_id for host in payload):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Can't create hosts! Provide a valid request")
+
+    organizations_ids = {host.organization_id for host in payload}
+
+    for organization_id in organizations_ids:
+        if not check_if_in_list_of_dict(current_user['organizations'], organization_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                                detail="Not authorized to perform requested action")
 
-            db.add(new_admin_host)
-            db.commit()
-            db.refresh(new_admin_host)
+    organizations_query = db.query(
+        organization_model.Organization
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        organization_model.Organization.id.in_(organizations_ids)
+    )
+    organizations = organizations_query.all()
+    if len(organizations) != len(organizations_ids):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Cannot create hosts! Provide a valid Organization")
 
-            if not new_admin_host:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign user to host! Something went wrong")
+    hostnames = {(host.organization_id, host.hostname) for host in payload}
+    hosts_ipv4 = {(host.organization_id, host.ipv4) for host in payload}
+    if len(hostnames) != len(payload) or len(hosts_ipv4) != len(payload):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Can't create hosts! Duplicated hosts in request!")
 
-        user_host_payload = dict(
-            user_id=current_user["user"].id,
-            host_id=new_host.id
+    hosts_query = db.query(
+        host_model.Host
+    ).filter(
+        host_model.Host.organization_id.in_(organizations_ids)
+    ).filter(
+        or_(
+            host_model.Host.hostname.in_(
+                [host.hostname for host in payload]),
+            host_model.Host.ipv4.in_(
+                [host.ipv4 for host in payload])
         )
-        new_user_host = user_host_model.new_admin_host = user_host_model.UserHost(
-            **user_host_payload)
+    )
+    hosts = hosts_query.all()
+    if any((host.organization_id, host.hostname) in hostnames or (host.organization_id, host.ipv4) in hosts_ipv4 for host in hosts):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Can't create hosts! Host already exists!")
 
-        db.add(new_user_host)
-        db.commit()
-        db.refresh(new_user_host)
+    owners_ids = oauth2.get_owners_ids(db, current_user["user"])
+    if not owners_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign user to host! Provide a valid user")
 
-        if not new_user_host:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Can't assign user to host! Something went wrong")
+    new_hosts_status = add_hosts_fingerprints(
+        [host.ipv4 for host in payload],
+        my_tower.ipv4,
+        my_tower.port,
+        my_tower.username,
+        my_tower.password,
+        10,
+        tower_id=my_tower.id
+    )
+    if not new_hosts_status:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Can't sync hosts! Something went wrong")
 
-    return new_host
+    new_hosts_ids = db.execute(
+        insert(
+            host_model.Host
+        ).values([
+            dict(
+                **host.dict(),
+                host_status=new_hosts_status.get(
+                    host.ipv4, host_schema.HostStatus.alive),
+                created_by=current_user["user"].username,
+                last_modified_by=current_user["user"].username
+            ) for host in payload
+        ]).returning(
+            host_model.Host.id
+        )
+    ).scalars().all()
+
+    db.execute(
+        insert(
+            user_host_model.UserHost
+        ).values([
+            dict(
+                user_id=user_id,
+                host_id=new_host_id
+            ) for new_host_id in new_hosts_ids for user_id in owners_ids
+        ])
+    )
+    db.commit()
+
+    new_hosts_query = db.query(
+        host_model.Host
+    ).options(
+        *get_loader_options(host_model.Host, host_schema.HostResponse)
+    ).filter(
+        host_model.Host.id.in_(new_hosts_ids)
+    ).order_by(
+        host_model.Host.id
+    )
+
+    return new_hosts_query.all()
+
+
+@router.post("/import", response_model=host_schema.HostImportResponse)
+def import_hosts(
+    organization_id: int = Form(...),
+    file: UploadFile = File(...),
+    import_format: Optional[host_schema.HostImportFormat] = Form(
+        None, alias="format"),
+    db: Session = Depends(get_db),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user),
+    my_tower: tower_schema.TowerResponse = Depends(oauth2.get_tower)
+):
+    organization_query = db.query(
+        organization_model.Organization
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        organization_model.Organization.id == organization_id
+    )
+    organization = organization_query.first()
+    if not organization:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Cannot import hosts! Provide a valid Organization")
+
+    if not check_if_in_list_of_dict(current_user['organizations'], organization_id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Not authorized to perform requested action")
+
+    owners_ids = oauth2.get_owners_ids(db, current_user["user"])
+    if not owners_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign user to host! Provide a valid user")
+
+    results = []
+    fingerprint_hosts = []
+    seen_hosts = {}
+    groups_created = 0
+    memberships_created = 0
+
+    try:
+        with transaction(db):
+            records = parse_inventory(
+                TextIOWrapper(file.file, encoding="utf-8-sig", newline=""),
+                import_format or get_import_format(file.filename)
+            )
+
+            for batch in iterate_batches(records, IMPORT_BATCH_SIZE):
+                (batch_results, batch_fingerprint_hosts, batch_groups_created, batch_memberships_created) = import_hosts_batch(
+                    db,
+                    batch,
+                    organization_id,
+                    current_user["user"].username,
+                    owners_ids,
+                    seen_hosts
+                )
+                results += batch_results
+                fingerprint_hosts += batch_fingerprint_hosts
+                groups_created += batch_groups_created
+                memberships_created += batch_memberships_created
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Can't import hosts! Inventory file must be UTF-8 encoded")
+
+    fingerprinted = True
+
+    if fingerprint_hosts:
+        new_hosts_status = add_hosts_fingerprints(
+            [host_ipv4 for (host_id, host_ipv4) in fingerprint_hosts],
+            my_tower.ipv4,
+            my_tower.port,
+            my_tower.username,
+            my_tower.password,
+            10,
+            tower_id=my_tower.id
+        )
+        fingerprinted = bool(new_hosts_status)
+
+        if new_hosts_status:
+            hosts_ids_by_status = {}
+            for (host_id, host_ipv4) in fingerprint_hosts:
+                hosts_ids_by_status.setdefault(new_hosts_status.get(
+                    host_ipv4, host_schema.HostStatus.alive), []).append(host_id)
+
+            with transaction(db):
+                for (host_status, hosts_ids) in hosts_ids_by_status.items():
+                    db.query(
+                        host_model.Host
+                    ).filter(
+                        host_model.Host.id.in_(hosts_ids)
+                    ).update(
+                        dict(host_status=host_status),
+                        synchronize_session=False
+                    )
+
+    statuses = Counter(result["status"] for result in results)
+
+    return dict(
+        created=statuses[host_schema.HostImportStatus.created],
+        updated=statuses[host_schema.HostImportStatus.updated],
+        unchanged=statuses[host_schema.HostImportStatus.unchanged],
+        failed=statuses[host_schema.HostImportStatus.failed],
+        groups_created=groups_created,
+        memberships_created=memberships_created,
+        fingerprinted=fingerprinted,
+        results=results
+    )
 
 
 @router.get("/{id}", response_model=host_schema.HostResponse)
-async def get_host(
+def get_host(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
     host_query = db.query(
         host_model.Host
+    ).options(
+        *get_loader_options(host_model.Host, host_schema.HostResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == host_model.Host.organization_id
     ).filter(
@@ -278,7 +493,7 @@ async def get_host(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_host(
+def delete_host(
     selected: List[int],
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -307,20 +522,77 @@ async def delete_host(
         my_tower.port,
         my_tower.username,
         my_tower.password,
-        10
+        10,
+        tower_id=my_tower.id
     )
     if not deleted_host_key:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="Can't delete host key! Something went wrong")
 
+    mark_inventories_changed(
+        db, current_user["user"].username, hosts_ids=selected)
+
     hosts_query.delete(synchronize_session=False)
     db.commit()
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+@router.put("/status", response_model=List[host_schema.HostResponse])
+def update_hosts_status(
+    selected: List[int],
+    db: Session = Depends(get_db),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user),
+    my_tower: tower_schema.TowerResponse = Depends(oauth2.get_tower)
+):
+    hosts_query = db.query(
+        host_model.Host
+    ).options(
+        *get_loader_options(host_model.Host, host_schema.HostResponse)
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == host_model.Host.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        host_model.Host.id.in_(selected)
+    ).order_by(
+        host_model.Host.id
+    )
+    hosts = hosts_query.all()
+
+    if not hosts or len(hosts) != len(set(selected)):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Host not found")
+
+    for host in hosts:
+        if not check_if_in_list_of_dict(current_user['organizations'], host.organization_id):
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                                detail="Not authorized to perform requested action")
+
+    new_hosts_status = add_hosts_fingerprints(
+        [host.ipv4 for host in hosts],
+        my_tower.ipv4,
+        my_tower.port,
+        my_tower.username,
+        my_tower.password,
+        10,
+        tower_id=my_tower.id
+    )
+    if not new_hosts_status:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Can't sync hosts! Something went wrong")
+
+    for host in hosts:
+        host.host_status = new_hosts_status.get(host.ipv4, host.host_status)
+        host.last_modified_by = current_user["user"].username
+
+    db.commit()
+
+    return hosts_query.all()
+
+
 @router.put("/{id}", response_model=host_schema.HostResponse)
-async def update_host(
+def update_host(
     id: int,
     payload: host_schema.HostRequest,
     db: Session = Depends(get_db),
@@ -390,7 +662,8 @@ async def update_host(
             my_tower.port,
             my_tower.username,
             my_tower.password,
-            10
+            10,
+            tower_id=my_tower.id
         )
         if not deleted_host_key:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -402,12 +675,16 @@ async def update_host(
             my_tower.port,
             my_tower.username,
             my_tower.password,
-            10
+            10,
+            tower_id=my_tower.id
         )
         if not new_host_status:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Can't sync host! Something went wrong")
 
+        mark_inventories_changed(
+            db, current_user["user"].username, hosts_ids=[id])
+
     updated_payload = dict(
         **payload.dict(),
         host_status=new_host_status if new_host_status else host.host_status,
@@ -427,7 +704,7 @@ async def update_host(
 
 
 @router.put("/{id}/status", response_model=host_schema.HostResponse)
-async def update_host_status(
+def update_host_status(
     id: int,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -454,7 +731,8 @@ async def update_host_status(
         my_tower.port,
         my_tower.username,
         my_tower.password,
-        10
+        10,
+        tower_id=my_tower.id
     )
     if not new_host_status:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,12 +1,16 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List
 from ..models import inventory_group_model, group_model, organization_model, inventory_model
-from ..schemas import common_schema, user_schema, inventory_group_schema
+from ..schemas import user_schema, inventory_group_schema
 from ..database.connection import get_db
-from app.utils.check_value_exists import check_if_groups_ids_in_list_of_response, check_if_in_list_of_dict
-from app.utils.get_ids import get_groups_ids_list_from_response, get_ids_list
+from ..database.replica import get_read_db
+from app.utils.check_value_exists import check_if_in_list_of_dict
+from app.utils.get_ids import get_ids_list
+from app.utils.inventory_changes import mark_inventories_changed
+from app.utils.assignments import insert_assignments, replace_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -16,17 +20,17 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[inventory_group_schema.InventoryGroupResponse])
-async def get_inventories_groups(
-    db: Session = Depends(get_db),
+def get_inventories_groups(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     inventories_groups_query = db.query(
         inventory_group_model.InventoryGroup
+    ).options(
+        *get_loader_options(inventory_group_model.InventoryGroup, inventory_group_schema.InventoryGroupResponse)
     ).join(
         group_model.Group, group_model.Group.id == inventory_group_model.InventoryGroup.group_id
     ).join(
@@ -37,26 +41,12 @@ async def get_inventories_groups(
             get_ids_list(current_user['organizations']))
     )
 
-    if skip:
-        inventories_groups_query = inventories_groups_query.offset(skip)
-
-    if limit:
-        inventories_groups_query = inventories_groups_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            inventories_groups_query = inventories_groups_query.order_by(
-                desc(sort))
-        else:
-            inventories_groups_query = inventories_groups_query.order_by(sort)
-    else:
-        inventories_groups_query = inventories_groups_query.order_by(
-            inventory_group_model.InventoryGroup.inventory_group_id)
-
-    if limit == 1:
-        inventories_groups = inventories_groups_query.first()
-    else:
-        inventories_groups = inventories_groups_query.all()
+    inventories_groups = paginate(
+        inventories_groups_query,
+        response,
+        inventory_group_model.InventoryGroup.inventory_group_id,
+        pagination
+    )
 
     if not inventories_groups:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -66,7 +56,7 @@ async def get_inventories_groups(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=inventory_group_schema.InventoryGroupResponse)
-async def create_inventories_groups(
+def create_inventories_groups(
     payload: inventory_group_schema.InventoryGroupPostRequest,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -86,8 +76,8 @@ async def create_inventories_groups(
             get_ids_list(current_user['organizations'])),
         group_model.Group.id.in_(payload.groups_id)
     )
-    groups = groups_query.all()
-    if not groups or len(groups) != len(payload.groups_id):
+    groups_count = groups_query.count()
+    if groups_count != len(set(payload.groups_id)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Can't assign groups to inventory! Provide a valid group")
 
@@ -110,58 +100,118 @@ async def create_inventories_groups(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Not authorized to perform requested action")
 
-    inventories_groups_query = db.query(
+    new_groups_ids = insert_assignments(
+        db,
+        inventory_group_model.InventoryGroup.inventory_id,
+        payload.inventory_id,
+        inventory_group_model.InventoryGroup.group_id,
+        payload.groups_id
+    )
+    if not new_groups_ids:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Can't assign groups to inventory! Assign already exists!")
+
+    mark_inventories_changed(
+        db, current_user["user"].username, inventories_ids=[payload.inventory_id])
+
+    db.commit()
+
+    new_inventory_group = db.query(
         inventory_group_model.InventoryGroup
-    ).join(
-        group_model.Group, group_model.Group.id == inventory_group_model.InventoryGroup.group_id
+    ).filter(
+        inventory_group_model.InventoryGroup.inventory_id == payload.inventory_id,
+        inventory_group_model.InventoryGroup.group_id == new_groups_ids[-1]
+    ).first()
+    if not new_inventory_group:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Can't assign groups to inventory! Something went wrong")
+
+    return new_inventory_group
+
+
+@router.put("", response_model=List[inventory_group_schema.InventoryGroupResponse])
+def replace_inventories_groups(
+    payload: inventory_group_schema.InventoryGroupPostRequest,
+    db: Session = Depends(get_db),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user)
+):
+    if payload.groups_id is None or not payload.inventory_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Can't assign groups to inventory! Provide a valid request")
+
+    groups_query = db.query(
+        group_model.Group
     ).join(
         organization_model.Organization, organization_model.Organization.id == group_model.Group.organization_id
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id,
         group_model.Group.organization_id.in_(
             get_ids_list(current_user['organizations'])),
-        inventory_group_model.InventoryGroup.group_id.in_(payload.groups_id),
-        inventory_group_model.InventoryGroup.inventory_id == payload.inventory_id
+        group_model.Group.id.in_(payload.groups_id)
     )
-    inventories_groups = inventories_groups_query.all()
+    groups_count = groups_query.count()
+    if groups_count != len(set(payload.groups_id)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign groups to inventory! Provide a valid group")
 
-    if set(payload.groups_id) == set(get_groups_ids_list_from_response(inventories_groups)):
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
-                            detail="Can't assign groups to inventory! Assign already exists!")
+    inventory_query = db.query(
+        inventory_model.Inventory
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == inventory_model.Inventory.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        inventory_model.Inventory.organization_id.in_(
+            get_ids_list(current_user['organizations'])),
+        inventory_model.Inventory.id == payload.inventory_id
+    )
+    inventory = inventory_query.first()
+    if not inventory:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign groups to inventory! Provide a valid group")
+
+    if not check_if_in_list_of_dict(current_user['organizations'], inventory.organization.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Not authorized to perform requested action")
 
-    for group_id in payload.groups_id:
-        if not check_if_groups_ids_in_list_of_response(inventories_groups, group_id):
-            inventory_group_payload = dict(
-                group_id=group_id,
-                inventory_id=payload.inventory_id
-            )
-            new_inventory_group = inventory_group_model.InventoryGroup(
-                **inventory_group_payload)
+    (new_groups_ids, removed_groups_ids) = replace_assignments(
+        db,
+        inventory_group_model.InventoryGroup.inventory_id,
+        payload.inventory_id,
+        inventory_group_model.InventoryGroup.group_id,
+        payload.groups_id
+    )
 
-            db.add(new_inventory_group)
-            db.commit()
-            db.refresh(new_inventory_group)
+    if new_groups_ids or removed_groups_ids:
+        mark_inventories_changed(
+            db, current_user["user"].username, inventories_ids=[payload.inventory_id])
 
-            if not new_inventory_group:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign groups to inventory! Something went wrong")
+    db.commit()
 
-    return new_inventory_group
+    return db.query(
+        inventory_group_model.InventoryGroup
+    ).options(
+        *get_loader_options(inventory_group_model.InventoryGroup, inventory_group_schema.InventoryGroupResponse)
+    ).filter(
+        inventory_group_model.InventoryGroup.inventory_id == payload.inventory_id
+    ).order_by(
+        inventory_group_model.InventoryGroup.inventory_group_id
+    ).all()
 
 
 @router.get("/{id}/inventories", response_model=List[inventory_group_schema.InventoriesGroupResponse])
-async def get_inventories_group(
+def get_inventories_group(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     inventories_group_query = db.query(
         inventory_group_model.InventoryGroup
+    ).options(
+        *get_loader_options(inventory_group_model.InventoryGroup, inventory_group_schema.InventoriesGroupResponse)
     ).join(
         group_model.Group, group_model.Group.id == inventory_group_model.InventoryGroup.group_id
     ).join(
@@ -173,26 +223,12 @@ async def get_inventories_group(
         inventory_group_model.InventoryGroup.group_id == id
     )
 
-    if skip:
-        inventories_group_query = inventories_group_query.offset(skip)
-
-    if limit:
-        inventories_group_query = inventories_group_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            inventories_group_query = inventories_group_query.order_by(
-                desc(sort))
-        else:
-            inventories_group_query = inventories_group_query.order_by(sort)
-    else:
-        inventories_group_query = inventories_group_query.order_by(
-            inventory_group_model.InventoryGroup.inventory_group_id)
-
-    if limit == 1:
-        inventories_group = inventories_group_query.first()
-    else:
-        inventories_group = inventories_group_query.all()
+    inventories_group = paginate(
+        inventories_group_query,
+        response,
+        inventory_group_model.InventoryGroup.inventory_group_id,
+        pagination
+    )
 
     if not inventories_group:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -202,18 +238,18 @@ async def get_inventories_group(
 
 
 @router.get("/{id}/groups", response_model=List[inventory_group_schema.InventoryGroupsResponse])
-async def get_inventory_groups(
+def get_inventory_groups(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     inventory_groups_query = db.query(
         inventory_group_model.InventoryGroup
+    ).options(
+        *get_loader_options(inventory_group_model.InventoryGroup, inventory_group_schema.InventoryGroupsResponse)
     ).join(
         inventory_model.Inventory, inventory_model.Inventory.id == inventory_group_model.InventoryGroup.inventory_id
     ).join(
@@ -225,26 +261,12 @@ async def get_inventory_groups(
         inventory_group_model.InventoryGroup.inventory_id == id
     )
 
-    if skip:
-        inventory_groups_query = inventory_groups_query.offset(skip)
-
-    if limit:
-        inventory_groups_query = inventory_groups_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            inventory_groups_query = inventory_groups_query.order_by(
-                desc(sort))
-        else:
-            inventory_groups_query = inventory_groups_query.order_by(sort)
-    else:
-        inventory_groups_query = inventory_groups_query.order_by(
-            inventory_group_model.InventoryGroup.inventory_group_id)
-
-    if limit == 1:
-        inventory_groups = inventory_groups_query.first()
-    else:
-        inventory_groups = inventory_groups_query.all()
+    inventory_groups = paginate(
+        inventory_groups_query,
+        response,
+        inventory_group_model.InventoryGroup.inventory_group_id,
+        pagination
+    )
 
     if not inventory_groups:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -254,7 +276,7 @@ async def get_inventory_groups(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_inventories_groups(
+def delete_inventories_groups(
     selected: List[int],
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -276,6 +298,9 @@ async def delete_inventories_groups(
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="Not authorized to perform requested action")
 
+    mark_inventories_changed(db, current_user["user"].username, inventories_ids=list(
+        {inventory_group.inventory_id for inventory_group in inventories_groups}))
+
     inventories_groups_query.delete(synchronize_session=False)
     db.commit()
 
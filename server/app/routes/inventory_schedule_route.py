@@ -1,15 +1,16 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from fastapi.security.oauth2 import OAuth2PasswordBearer
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from uuid import uuid4
-from typing import List, Optional
+from typing import List
 from ..models import inventory_schedule_model, inventory_model, organization_model, schedule_model
 from ..schemas import common_schema, user_schema, inventory_schedule_schema
 from ..database.connection import get_db
-from app.services.tower.schedule_service import add_crontab_schedule_inventory, check_job_id, get_job_schedule_info, remove_job_schedules
-from app.utils.check_value_exists import check_if_schedules_ids_in_list_of_response, check_if_in_list_of_dict
+from ..database.replica import get_read_db
+from app.services.tower.schedule_service import get_job_schedule_info, get_schedule_next_run_at
+from app.utils.check_value_exists import check_if_in_list_of_dict
 from app.utils.get_ids import get_schedules_ids_list_from_response, get_ids_list
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -17,21 +18,18 @@ router = APIRouter(
     tags=['Inventories | Schedules assigns']
 )
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl='api/login')
-
-
 @router.get("", response_model=List[inventory_schedule_schema.InventoryScheduleResponse])
-async def get_inventories_schedules(
-    db: Session = Depends(get_db),
+def get_inventories_schedules(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     inventories_schedules_query = db.query(
         inventory_schedule_model.InventorySchedule
+    ).options(
+        *get_loader_options(inventory_schedule_model.InventorySchedule, inventory_schedule_schema.InventoryScheduleResponse)
     ).join(
         schedule_model.Schedule, schedule_model.Schedule.id == inventory_schedule_model.InventorySchedule.schedule_id
     ).join(
@@ -42,27 +40,12 @@ async def get_inventories_schedules(
             get_ids_list(current_user['organizations']))
     )
 
-    if skip:
-        inventories_schedules_query = inventories_schedules_query.offset(skip)
-
-    if limit:
-        inventories_schedules_query = inventories_schedules_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            inventories_schedules_query = inventories_schedules_query.order_by(
-                desc(sort))
-        else:
-            inventories_schedules_query = inventories_schedules_query.order_by(
-                sort)
-    else:
-        inventories_schedules_query = inventories_schedules_query.order_by(
-            inventory_schedule_model.InventorySchedule.inventory_schedule_id)
-
-    if limit == 1:
-        inventories_schedules = inventories_schedules_query.first()
-    else:
-        inventories_schedules = inventories_schedules_query.all()
+    inventories_schedules = paginate(
+        inventories_schedules_query,
+        response,
+        inventory_schedule_model.InventorySchedule.inventory_schedule_id,
+        pagination
+    )
 
     if not inventories_schedules:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -72,10 +55,9 @@ async def get_inventories_schedules(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=List[inventory_schedule_schema.InventorySchedulesResponse])
-async def create_inventories_schedules(
+def create_inventories_schedules(
     payload: inventory_schedule_schema.InventorySchedulePostRequest,
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
@@ -83,12 +65,6 @@ async def create_inventories_schedules(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Can't assign schedules to inventory! Provide a valid request")
 
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
-                            detail="Could not get credential token", headers={"WWW-Authenticate": "Bearer"})
-
-    response: list = []
-
     schedules_query = db.query(
         schedule_model.Schedule
     ).join(
@@ -137,63 +113,62 @@ async def create_inventories_schedules(
     )
     inventories_schedules = inventories_schedules_query.all()
 
-    if set(payload.schedules_id) == set(get_schedules_ids_list_from_response(inventories_schedules)):
+    assigned_schedules_ids = set(
+        get_schedules_ids_list_from_response(inventories_schedules))
+
+    if set(payload.schedules_id) == assigned_schedules_ids:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                             detail="Can't assign schedules to inventory! Assign already exists!")
 
-    for schedule in schedules:
-        if not check_if_schedules_ids_in_list_of_response(inventories_schedules, schedule.id):
-            cron_job_id: str = str(uuid4())
-            while check_job_id(cron_job_id):
-                cron_job_id = str(uuid4())
-
-            added_schedule = add_crontab_schedule_inventory(
-                token,
-                schedule.start_date_time,
-                schedule.repeat_frequency,
-                schedule.every if schedule.every else None,
-                schedule.week_days if schedule.week_days else None,
-                cron_job_id,
-                inventory.id
-            )
-            if not added_schedule:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't add schedule to service! Something went wrong")
+    new_schedules_ids: List[int] = []
 
+    for schedule in schedules:
+        if schedule.id not in assigned_schedules_ids:
             inventory_schedule_payload = dict(
                 schedule_id=schedule.id,
                 inventory_id=payload.inventory_id,
-                cron_job_id=cron_job_id
+                cron_job_id=str(uuid4()),
+                next_run_at=get_schedule_next_run_at(schedule)
             )
             new_inventory_schedule = inventory_schedule_model.InventorySchedule(
                 **inventory_schedule_payload)
 
             db.add(new_inventory_schedule)
-            db.commit()
-            db.refresh(new_inventory_schedule)
+            new_schedules_ids.append(schedule.id)
 
-            if not new_inventory_schedule:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign schedules to inventory! Something went wrong")
+    db.commit()
 
-            response.append(new_inventory_schedule)
+    response = db.query(
+        inventory_schedule_model.InventorySchedule
+    ).options(
+        *get_loader_options(inventory_schedule_model.InventorySchedule, inventory_schedule_schema.InventorySchedulesResponse)
+    ).filter(
+        inventory_schedule_model.InventorySchedule.inventory_id == payload.inventory_id,
+        inventory_schedule_model.InventorySchedule.schedule_id.in_(new_schedules_ids)
+    ).order_by(
+        inventory_schedule_model.InventorySchedule.inventory_schedule_id
+    ).all()
+
+    if len(response) != len(new_schedules_ids):
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Can't assign schedules to inventory! Something went wrong")
 
     return response
 
 
 @router.get("/{id}/inventories", response_model=List[inventory_schedule_schema.InventoriesScheduleResponse])
-async def get_inventories_schedule(
+def get_inventories_schedule(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     inventories_schedule_query = db.query(
         inventory_schedule_model.InventorySchedule
+    ).options(
+        *get_loader_options(inventory_schedule_model.InventorySchedule, inventory_schedule_schema.InventoriesScheduleResponse)
     ).join(
         schedule_model.Schedule, schedule_model.Schedule.id == inventory_schedule_model.InventorySchedule.schedule_id
     ).join(
@@ -205,27 +180,12 @@ async def get_inventories_schedule(
         inventory_schedule_model.InventorySchedule.schedule_id == id
     )
 
-    if skip:
-        inventories_schedule_query = inventories_schedule_query.offset(skip)
-
-    if limit:
-        inventories_schedule_query = inventories_schedule_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            inventories_schedule_query = inventories_schedule_query.order_by(
-                desc(sort))
-        else:
-            inventories_schedule_query = inventories_schedule_query.order_by(
-                sort)
-    else:
-        inventories_schedule_query = inventories_schedule_query.order_by(
-            inventory_schedule_model.InventorySchedule.inventory_schedule_id)
-
-    if limit == 1:
-        inventories_schedule = inventories_schedule_query.first()
-    else:
-        inventories_schedule = inventories_schedule_query.all()
+    inventories_schedule = paginate(
+        inventories_schedule_query,
+        response,
+        inventory_schedule_model.InventorySchedule.inventory_schedule_id,
+        pagination
+    )
 
     if not inventories_schedule:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -235,18 +195,18 @@ async def get_inventories_schedule(
 
 
 @router.get("/{id}/schedules", response_model=List[inventory_schedule_schema.InventorySchedulesResponse])
-async def get_inventory_schedules(
+def get_inventory_schedules(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     inventory_schedules_query = db.query(
         inventory_schedule_model.InventorySchedule
+    ).options(
+        *get_loader_options(inventory_schedule_model.InventorySchedule, inventory_schedule_schema.InventorySchedulesResponse)
     ).join(
         inventory_model.Inventory, inventory_model.Inventory.id == inventory_schedule_model.InventorySchedule.inventory_id
     ).join(
@@ -258,27 +218,12 @@ async def get_inventory_schedules(
         inventory_schedule_model.InventorySchedule.inventory_id == id
     )
 
-    if skip:
-        inventory_schedules_query = inventory_schedules_query.offset(skip)
-
-    if limit:
-        inventory_schedules_query = inventory_schedules_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            inventory_schedules_query = inventory_schedules_query.order_by(
-                desc(sort))
-        else:
-            inventory_schedules_query = inventory_schedules_query.order_by(
-                sort)
-    else:
-        inventory_schedules_query = inventory_schedules_query.order_by(
-            inventory_schedule_model.InventorySchedule.inventory_schedule_id)
-
-    if limit == 1:
-        inventory_schedules = inventory_schedules_query.first()
-    else:
-        inventory_schedules = inventory_schedules_query.all()
+    inventory_schedules = paginate(
+        inventory_schedules_query,
+        response,
+        inventory_schedule_model.InventorySchedule.inventory_schedule_id,
+        pagination
+    )
 
     if not inventory_schedules:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -288,9 +233,9 @@ async def get_inventory_schedules(
 
 
 @router.get("/{id}/schedules/info", response_model=List[common_schema.JobsScheduleInfoBase])
-async def get_inventory_schedules_info(
+def get_inventory_schedules_info(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
@@ -322,7 +267,7 @@ async def get_inventory_schedules_info(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_inventories_schedules(
+def delete_inventories_schedules(
     selected: List[int],
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -345,11 +290,6 @@ async def delete_inventories_schedules(
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="Not authorized to perform requested action")
 
-    schedules_deleted = remove_job_schedules(inventories_schedules)
-    if not schedules_deleted:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't delete schedule in service! Something went wrong")
-
     inventories_schedules_query.delete(synchronize_session=False)
     db.commit()
 
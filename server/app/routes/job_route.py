@@ -1,14 +1,20 @@
-from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from fastapi import Query, Response, status, HTTPException, Depends, APIRouter
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, undefer
 from typing import Optional, List
 from datetime import datetime, timezone
-from ..models import job_model, template_model, organization_model, user_template_model, user_model
-from ..schemas import job_schema, user_schema, common_schema, tower_schema
+from ..models import job_model, job_output_chunk_model, template_model, organization_model, user_template_model, user_model
+from ..schemas import common_schema, job_schema, user_schema, tower_schema
 from ..database.connection import get_db
+from ..database.replica import get_read_db
 from app.utils.get_ids import get_ids_list, get_templates_ids_list_from_response
 from app.utils.check_value_exists import check_if_in_list_of_dict
-from ..services.tower.tower_service import launch_jobs
+from ..services.jobs.job_runner import job_runner
+from ..services.jobs.job_output import read_job_output, stream_job_output
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
+from app.utils.row_serializer import get_row_query, get_rows_response
+from app.utils.export import get_export_response
 from ..auth import oauth2
 
 router = APIRouter(
@@ -17,16 +23,14 @@ router = APIRouter(
 )
 
 
-@router.get("", response_model=List[job_schema.JobResponse])
-async def get_all_jobs(
-    db: Session = Depends(get_db),
+@router.get("", response_model=List[job_schema.JobSummaryResponse])
+def get_all_jobs(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     user_templates_query = db.query(
         user_template_model.UserTemplate
@@ -45,8 +49,10 @@ async def get_all_jobs(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Cannot find any assignments")
 
-    jobs_query = db.query(
-        job_model.Job
+    jobs_query = get_row_query(
+        db,
+        job_model.Job,
+        job_schema.JobSummaryResponse
     ).join(
         template_model.Template, template_model.Template.id == job_model.Job.template_id
     ).join(
@@ -64,45 +70,33 @@ async def get_all_jobs(
             template_model.Template.name.contains(search_by_name)
         )
 
-    if skip:
-        jobs_query = jobs_query.offset(skip)
-
-    if limit:
-        jobs_query = jobs_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            jobs_query = jobs_query.order_by(desc(sort))
-        else:
-            jobs_query = jobs_query.order_by(sort)
-    else:
-        jobs_query = jobs_query.order_by(job_model.Job.id)
-
-    if limit == 1:
-        jobs = jobs_query.first()
-    else:
-        jobs = jobs_query.all()
+    jobs = paginate(
+        jobs_query,
+        response,
+        job_model.Job.id,
+        pagination
+    )
 
     if not jobs:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Cannot find any jobs")
 
-    return jobs
+    return get_rows_response(jobs, job_model.Job, job_schema.JobSummaryResponse, response)
 
 
-@router.get("/owner", response_model=List[job_schema.JobResponse])
-async def get_my_jobs(
-    db: Session = Depends(get_db),
+@router.get("/owner", response_model=List[job_schema.JobSummaryResponse])
+def get_my_jobs(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
-    my_jobs_query = db.query(
-        job_model.Job
+    my_jobs_query = get_row_query(
+        db,
+        job_model.Job,
+        job_schema.JobSummaryResponse
     ).join(
         template_model.Template, template_model.Template.id == job_model.Job.template_id
     ).join(
@@ -110,8 +104,6 @@ async def get_my_jobs(
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id,
         job_model.Job.launched_by == current_user['user'].username
-    ).distinct(
-        job_model.Job.id
     )
 
     if search_by_name:
@@ -119,34 +111,75 @@ async def get_my_jobs(
             template_model.Template.name.contains(search_by_name)
         )
 
-    if skip:
-        my_jobs_query = my_jobs_query.offset(skip)
-
-    if limit:
-        my_jobs_query = my_jobs_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            my_jobs_query = my_jobs_query.order_by(desc(sort))
-        else:
-            my_jobs_query = my_jobs_query.order_by(sort)
-    else:
-        my_jobs_query = my_jobs_query.order_by(job_model.Job.id)
-
-    if limit == 1:
-        my_jobs = my_jobs_query.first()
-    else:
-        my_jobs = my_jobs_query.all()
+    my_jobs = paginate(
+        my_jobs_query,
+        response,
+        job_model.Job.id,
+        pagination
+    )
 
     if not my_jobs:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Cannot find any jobs")
 
-    return my_jobs
+    return get_rows_response(my_jobs, job_model.Job, job_schema.JobSummaryResponse, response)
+
+
+@router.get("/export")
+def export_jobs(
+    db: Session = Depends(get_read_db),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user),
+    search_by_name: Optional[str] = "",
+    export_format: common_schema.ExportFormat = Query(
+        common_schema.ExportFormat.ndjson, alias="format")
+):
+    user_templates_query = db.query(
+        user_template_model.UserTemplate
+    ).join(
+        user_model.User, user_model.User.id == user_template_model.UserTemplate.user_id
+    ).join(
+        template_model.Template, template_model.Template.id == user_template_model.UserTemplate.template_id
+    ).filter(
+        user_model.User.tower_id == current_user["user"].tower.id,
+        template_model.Template.organization_id.in_(
+            get_ids_list(current_user['organizations'])),
+        user_template_model.UserTemplate.user_id == current_user["user"].id
+    )
+    user_templates = user_templates_query.all()
+
+    jobs_query = get_row_query(
+        db,
+        job_model.Job,
+        job_schema.JobSummaryResponse
+    ).join(
+        template_model.Template, template_model.Template.id == job_model.Job.template_id
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == job_model.Job.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        job_model.Job.organization_id.in_(
+            get_ids_list(current_user['organizations'])),
+        job_model.Job.template_id.in_(
+            get_templates_ids_list_from_response(user_templates))
+    )
+
+    if search_by_name:
+        jobs_query = jobs_query.filter(
+            template_model.Template.name.contains(search_by_name)
+        )
+
+    return get_export_response(
+        jobs_query.order_by(job_model.Job.id),
+        job_model.Job,
+        job_schema.JobSummaryResponse,
+        export_format,
+        "jobs"
+    )
 
 
-@router.post("/launch", status_code=status.HTTP_201_CREATED, response_model=job_schema.JobResponse)
-async def launch_new_job(
+@router.post("/launch", status_code=status.HTTP_202_ACCEPTED, response_model=job_schema.JobResponse)
+def launch_new_job(
     payload: job_schema.JobRequest,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -185,39 +218,10 @@ async def launch_new_job(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Cannot create a job! Provide a valid Template")
 
-    started_at = datetime.now(timezone.utc)
-
-    result_output = launch_jobs(
-        template.organization.name,
-        template.project.source_control_url,
-        template.playbook_name,
-        template.inventory.inventory_file,
-        template.privilege_escalation,
-        template.forks,
-        template.verbosity,
-        template.launch_type,
-        template.extra_vars,
-        template.credential.username,
-        template.credential.password,
-        my_tower.company,
-        my_tower.ipv4,
-        my_tower.port,
-        my_tower.username,
-        my_tower.password,
-        10
-    )
-    if not result_output:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't launch job! Something went wrong")
-
-    finished_at = datetime.now(timezone.utc)
-
     updated_payload = dict(
         **payload.dict(),
-        started_at=started_at,
-        finished_at=finished_at,
-        output=result_output,
-        job_status=job_schema.JobStatus.successful if result_output else job_schema.JobStatus.pending,
+        started_at=datetime.now(timezone.utc),
+        job_status=job_schema.JobStatus.pending,
         launched_by=current_user["user"].username
     )
 
@@ -231,11 +235,15 @@ async def launch_new_job(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="Can't create job! Something went wrong")
 
+    job_runner.submit(new_job.id, my_tower.id)
+
+    db.refresh(new_job)
+
     return new_job
 
 
 @router.get("/{id}", response_model=job_schema.JobResponse)
-async def get_job(
+def get_job(
     id: int,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -243,6 +251,9 @@ async def get_job(
 ):
     job_query = db.query(
         job_model.Job
+    ).options(
+        *get_loader_options(job_model.Job, job_schema.JobResponse),
+        undefer(job_model.Job.output)
     ).join(
         organization_model.Organization, organization_model.Organization.id == job_model.Job.organization_id
     ).filter(
@@ -261,8 +272,77 @@ async def get_job(
     return job
 
 
+@router.get("/{id}/output", response_model=job_schema.JobOutputResponse)
+def get_job_output(
+    id: int,
+    db: Session = Depends(get_db),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user),
+    offset: Optional[int] = 0,
+    limit: Optional[int] = 65536
+):
+    if offset < 0 or (limit is not None and limit < 1):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Can't read job output! Provide a valid range")
+
+    job_query = db.query(
+        job_model.Job
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == job_model.Job.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        job_model.Job.id == id
+    )
+    job = job_query.first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    if not check_if_in_list_of_dict(current_user['organizations'], job.organization.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Not authorized to perform requested action")
+
+    job_output = read_job_output(db, job.id, offset, limit)
+
+    return dict(
+        **job_output,
+        job_status=job.job_status
+    )
+
+
+@router.get("/{id}/stream")
+def stream_job(
+    id: int,
+    db: Session = Depends(get_db),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user)
+):
+    job_query = db.query(
+        job_model.Job
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == job_model.Job.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        job_model.Job.id == id
+    )
+    job = job_query.first()
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+
+    if not check_if_in_list_of_dict(current_user['organizations'], job.organization.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Not authorized to perform requested action")
+
+    return StreamingResponse(
+        stream_job_output(db, job.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_job(
+def delete_job(
     selected: List[int],
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -290,8 +370,8 @@ async def delete_job(
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
-@router.put("/{id}/launch", response_model=job_schema.JobResponse)
-async def launch_job(
+@router.put("/{id}/launch", status_code=status.HTTP_202_ACCEPTED, response_model=job_schema.JobResponse)
+def launch_job(
     id: int,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -312,50 +392,42 @@ async def launch_job(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Not authorized to perform requested action")
 
-    started_at = datetime.now(timezone.utc)
-
-    result_output = launch_jobs(
-        job.template.organization.name,
-        job.template.project.source_control_url,
-        job.template.playbook_name,
-        job.template.inventory.inventory_file,
-        job.template.privilege_escalation,
-        job.template.forks,
-        job.template.verbosity,
-        job.template.launch_type,
-        job.template.extra_vars,
-        job.template.credential.username,
-        job.template.credential.password,
-        my_tower.company,
-        my_tower.ipv4,
-        my_tower.port,
-        my_tower.username,
-        my_tower.password,
-        10
-    )
-    if not result_output:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't launch job! Something went wrong")
-
-    finished_at = datetime.now(timezone.utc)
+    if job.job_status in (job_schema.JobStatus.pending, job_schema.JobStatus.waiting, job_schema.JobStatus.running):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Can't launch job! Job is already in progress")
 
     updated_payload = dict(
-        template_id=job.template.id,
-        organization_id=job.organization.id,
-        started_at=started_at,
-        finished_at=finished_at,
-        output=result_output,
-        job_status=job_schema.JobStatus.successful if result_output else job.job_status,
+        started_at=datetime.now(timezone.utc),
+        finished_at=None,
+        job_status=job_schema.JobStatus.pending,
         launched_by=current_user["user"].username
     )
 
-    job_query.update(
+    launched_jobs_count = db.query(
+        job_model.Job
+    ).filter(
+        job_model.Job.id == job.id,
+        job_model.Job.job_status.notin_(
+            [job_schema.JobStatus.pending, job_schema.JobStatus.waiting, job_schema.JobStatus.running])
+    ).update(
         updated_payload,
         synchronize_session=False
     )
+    if launched_jobs_count == 0:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Can't launch job! Job is already in progress")
+
+    db.query(
+        job_output_chunk_model.JobOutputChunk
+    ).filter(
+        job_output_chunk_model.JobOutputChunk.job_id == job.id
+    ).delete(synchronize_session=False)
 
     db.commit()
 
+    job_runner.submit(job.id, my_tower.id)
+
     updated_job = job_query.first()
 
     return updated_job
@@ -1,12 +1,16 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from ..models import organization_model, user_organization_model, user_model
-from ..schemas import organization_schema, user_schema, common_schema, tower_schema
+from ..models import organization_model, user_organization_model, schedule_model, template_schedule_model, project_schedule_model, inventory_schedule_model
+from ..schemas import organization_schema, schedule_schema, user_schema, tower_schema
 from app.services.tower.organization_service import create_organization_directories, delete_organization_remote, update_organization_name
+from app.services.tower.schedule_service import get_schedule_next_run_at
+from app.utils.assignments import insert_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
-from ..database.connection import get_db
+from ..database.connection import get_db, transaction
+from ..database.replica import get_read_db
 
 router = APIRouter(
     prefix="/api/organizations",
@@ -15,20 +19,20 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[organization_schema.OrganizationResponse])
-async def get_organizations(
-    db: Session = Depends(get_db),
+def get_organizations(
+    response: Response,
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     organizations_query = db.query(
         organization_model.Organization
+    ).options(
+        *get_loader_options(organization_model.Organization, organization_schema.OrganizationResponse)
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id
     )
@@ -38,25 +42,12 @@ async def get_organizations(
             organization_model.Organization.name.contains(search_by_name)
         )
 
-    if skip:
-        organizations_query = organizations_query.offset(skip)
-
-    if limit:
-        organizations_query = organizations_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            organizations_query = organizations_query.order_by(desc(sort))
-        else:
-            organizations_query = organizations_query.order_by(sort)
-    else:
-        organizations_query = organizations_query.order_by(
-            organization_model.Organization.id)
-
-    if limit == 1:
-        organizations = organizations_query.first()
-    else:
-        organizations = organizations_query.all()
+    organizations = paginate(
+        organizations_query,
+        response,
+        organization_model.Organization.id,
+        pagination
+    )
 
     if not organizations:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -66,20 +57,20 @@ async def get_organizations(
 
 
 @router.get("/owner", response_model=List[organization_schema.OrganizationResponse])
-async def get_my_organizations(
-    db: Session = Depends(get_db),
+def get_my_organizations(
+    response: Response,
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     organizations_query = db.query(
         organization_model.Organization
+    ).options(
+        *get_loader_options(organization_model.Organization, organization_schema.OrganizationResponse)
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id,
         organization_model.Organization.created_by == current_user["user"].username
@@ -90,25 +81,12 @@ async def get_my_organizations(
             organization_model.Organization.name.contains(search_by_name)
         )
 
-    if skip:
-        organizations_query = organizations_query.offset(skip)
-
-    if limit:
-        organizations_query = organizations_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            organizations_query = organizations_query.order_by(desc(sort))
-        else:
-            organizations_query = organizations_query.order_by(sort)
-    else:
-        organizations_query = organizations_query.order_by(
-            organization_model.Organization.id)
-
-    if limit == 1:
-        organizations = organizations_query.first()
-    else:
-        organizations = organizations_query.all()
+    organizations = paginate(
+        organizations_query,
+        response,
+        organization_model.Organization.id,
+        pagination
+    )
 
     if not organizations:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -118,7 +96,7 @@ async def get_my_organizations(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=organization_schema.OrganizationResponse)
-async def create_organizations(
+def create_organizations(
     payload: organization_schema.OrganizationRequest,
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -142,6 +120,11 @@ async def create_organizations(
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                             detail="Can't create organization! Organization already exists!")
 
+    owners_ids = oauth2.get_owners_ids(db, current_user["user"])
+    if not owners_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign user to organization! Provide a valid user")
+
     updated_payload = dict(
         **payload.dict(),
         tower_id=current_user["user"].tower.id,
@@ -158,69 +141,36 @@ async def create_organizations(
         my_tower.port,
         my_tower.username,
         my_tower.password,
-        10
+        10,
+        tower_id=my_tower.id
     )
     if not organization_directories:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="Can't create directory! Something went wrong")
 
-    db.add(new_organization)
-    db.commit()
-    db.refresh(new_organization)
+    with transaction(db):
+        db.add(new_organization)
+        db.flush()
 
-    if not new_organization:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't create organization! Something went wrong")
-    else:
-        if current_user["user"].user_type != user_schema.UserType.admin:
-            user_query = db.query(
-                user_model.User
-            ).filter(
-                user_model.User.tower_id == current_user["user"].tower.id,
-                user_model.User.user_type == user_schema.UserType.admin
-            )
-            user = user_query.first()
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Can't assign user to organization! Provide a valid user")
-
-            admin_organization_payload = dict(
-                user_id=user.id,
-                organization_id=new_organization.id
-            )
-            new_admin_organization = user_organization_model.UserOrganization(
-                **admin_organization_payload)
-
-            db.add(new_admin_organization)
-            db.commit()
-            db.refresh(new_admin_organization)
-
-            if not new_admin_organization:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign user to organization! Something went wrong")
-
-        user_organization_payload = dict(
-            user_id=current_user["user"].id,
-            organization_id=new_organization.id
+        insert_assignments(
+            db,
+            user_organization_model.UserOrganization.organization_id,
+            new_organization.id,
+            user_organization_model.UserOrganization.user_id,
+            owners_ids
         )
-        new_user_organization = user_organization_model.UserOrganization(
-            **user_organization_payload)
 
-        db.add(new_user_organization)
-        db.commit()
-        db.refresh(new_user_organization)
+    db.refresh(new_organization)
 
-        if not new_user_organization:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Can't assign user to organization! Something went wrong")
+    oauth2.invalidate_tower_principals(current_user["user"].tower.id)
 
     return new_organization
 
 
 @router.get("/{id}", response_model=organization_schema.OrganizationResponse)
-async def get_organization(
+def get_organization(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -228,6 +178,8 @@ async def get_organization(
 ):
     organization_query = db.query(
         organization_model.Organization
+    ).options(
+        *get_loader_options(organization_model.Organization, organization_schema.OrganizationResponse)
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id,
         organization_model.Organization.id == id
@@ -242,7 +194,7 @@ async def get_organization(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_organization(
+def delete_organization(
     selected: List[int],
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -270,7 +222,8 @@ async def delete_organization(
             my_tower.port,
             my_tower.username,
             my_tower.password,
-            10
+            10,
+            tower_id=my_tower.id
         )
         if not deleted_organization_remote:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -279,11 +232,13 @@ async def delete_organization(
     organization_query.delete(synchronize_session=False)
     db.commit()
 
+    oauth2.invalidate_tower_principals(current_user["user"].tower.id)
+
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.put("/{id}", response_model=organization_schema.OrganizationResponse)
-async def update_organization(
+def update_organization(
     id: int,
     payload: organization_schema.OrganizationRequest,
     db: Session = Depends(get_db),
@@ -334,19 +289,67 @@ async def update_organization(
             my_tower.port,
             my_tower.username,
             my_tower.password,
-            10
+            10,
+            tower_id=my_tower.id
         )
         if not updated_organization_name:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                                 detail="Can't update organization! Something went wrong")
 
+    spread_window_changed = payload.schedule_spread_window != organization.schedule_spread_window
+
     organization_query.update(
         updated_payload,
         synchronize_session=False
     )
 
+    if spread_window_changed:
+        db.refresh(organization)
+
+        inherited_schedules = db.query(
+            schedule_model.Schedule
+        ).filter(
+            schedule_model.Schedule.organization_id == id,
+            schedule_model.Schedule.spread_window.is_(None)
+        ).all()
+
+        for schedule in inherited_schedules:
+            next_run_at = get_schedule_next_run_at(schedule)
+
+            if schedule.schedule_type == schedule_schema.ScheduleType.inventory:
+                db.query(
+                    inventory_schedule_model.InventorySchedule
+                ).filter(
+                    inventory_schedule_model.InventorySchedule.schedule_id == schedule.id
+                ).update(
+                    dict(next_run_at=next_run_at),
+                    synchronize_session=False
+                )
+
+            if schedule.schedule_type == schedule_schema.ScheduleType.project:
+                db.query(
+                    project_schedule_model.ProjectSchedule
+                ).filter(
+                    project_schedule_model.ProjectSchedule.schedule_id == schedule.id
+                ).update(
+                    dict(next_run_at=next_run_at),
+                    synchronize_session=False
+                )
+
+            if schedule.schedule_type == schedule_schema.ScheduleType.template:
+                db.query(
+                    template_schedule_model.TemplateSchedule
+                ).filter(
+                    template_schedule_model.TemplateSchedule.schedule_id == schedule.id
+                ).update(
+                    dict(next_run_at=next_run_at),
+                    synchronize_session=False
+                )
+
     db.commit()
 
     updated_organization = organization_query.first()
 
+    oauth2.invalidate_tower_principals(current_user["user"].tower.id)
+
     return updated_organization
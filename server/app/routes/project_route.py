@@ -1,13 +1,17 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc, or_
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from ..models import project_model, organization_model, user_credential_model, user_model, credential_model, user_project_model
-from ..schemas import project_schema, user_schema, common_schema, tower_schema, credential_schema
-from ..database.connection import get_db
+from ..schemas import project_schema, user_schema, tower_schema, credential_schema
+from ..database.connection import get_db, transaction
+from ..database.replica import get_read_db
 from app.utils.get_ids import get_ids_list
 from app.utils.check_value_exists import check_if_in_list_of_dict
 from app.services.tower.project_service import clone_repo, delete_projects, update_project_name, update_repo
+from app.utils.assignments import insert_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -17,18 +21,18 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[project_schema.ProjectResponse])
-async def get_projects(
-    db: Session = Depends(get_db),
+def get_projects(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     projects_query = db.query(
         project_model.Project
+    ).options(
+        *get_loader_options(project_model.Project, project_schema.ProjectResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == project_model.Project.organization_id
     ).filter(
@@ -42,24 +46,12 @@ async def get_projects(
             project_model.Project.name.contains(search_by_name)
         )
 
-    if skip:
-        projects_query = projects_query.offset(skip)
-
-    if limit:
-        projects_query = projects_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            projects_query = projects_query.order_by(desc(sort))
-        else:
-            projects_query = projects_query.order_by(sort)
-    else:
-        projects_query = projects_query.order_by(project_model.Project.id)
-
-    if limit == 1:
-        projects = projects_query.first()
-    else:
-        projects = projects_query.all()
+    projects = paginate(
+        projects_query,
+        response,
+        project_model.Project.id,
+        pagination
+    )
 
     if not projects:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -69,25 +61,23 @@ async def get_projects(
 
 
 @router.get("/owner", response_model=List[project_schema.ProjectResponse])
-async def get_my_projects(
-    db: Session = Depends(get_db),
+def get_my_projects(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     my_projects_query = db.query(
         project_model.Project
+    ).options(
+        *get_loader_options(project_model.Project, project_schema.ProjectResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == project_model.Project.organization_id
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id,
         project_model.Project.created_by == current_user['user'].username
-    ).distinct(
-        project_model.Project.id
     )
 
     if search_by_name:
@@ -95,25 +85,12 @@ async def get_my_projects(
             project_model.Project.name.contains(search_by_name)
         )
 
-    if skip:
-        my_projects_query = my_projects_query.offset(skip)
-
-    if limit:
-        my_projects_query = my_projects_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            my_projects_query = my_projects_query.order_by(desc(sort))
-        else:
-            my_projects_query = my_projects_query.order_by(sort)
-    else:
-        my_projects_query = my_projects_query.order_by(
-            project_model.Project.id)
-
-    if limit == 1:
-        my_projects = my_projects_query.first()
-    else:
-        my_projects = my_projects_query.all()
+    my_projects = paginate(
+        my_projects_query,
+        response,
+        project_model.Project.id,
+        pagination
+    )
 
     if not my_projects:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -123,7 +100,7 @@ async def get_my_projects(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=project_schema.ProjectResponse)
-async def create_project(
+def create_project(
     payload: project_schema.ProjectRequest,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -192,6 +169,11 @@ async def create_project(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Can't create a project! Need to create a credential first!")
 
+    owners_ids = oauth2.get_owners_ids(db, current_user["user"])
+    if not owners_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign user to project! Provide a valid user")
+
     cloned_repository = clone_repo(
         payload.source_control_url,
         organization.name,
@@ -202,7 +184,8 @@ async def create_project(
         my_tower.port,
         my_tower.username,
         my_tower.password,
-        10
+        10,
+        tower_id=my_tower.id
     )
     if not cloned_repository:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -217,68 +200,34 @@ async def create_project(
 
     new_project = project_model.Project(**updated_payload)
 
-    db.add(new_project)
-    db.commit()
-    db.refresh(new_project)
-
-    if not new_project:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't create project! Something went wrong")
-    else:
-        if current_user["user"].user_type != user_schema.UserType.admin:
-            user_query = db.query(
-                user_model.User
-            ).filter(
-                user_model.User.tower_id == current_user["user"].tower.id,
-                user_model.User.user_type == user_schema.UserType.admin
-            )
-            user = user_query.first()
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Can't assign user to project! Provide a valid user")
+    with transaction(db):
+        db.add(new_project)
+        db.flush()
 
-            admin_project_payload = dict(
-                user_id=user.id,
-                project_id=new_project.id
-            )
-            new_admin_project = user_project_model.UserProject(
-                **admin_project_payload)
-
-            db.add(new_admin_project)
-            db.commit()
-            db.refresh(new_admin_project)
-
-            if not new_admin_project:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign user to project! Something went wrong")
-
-        user_project_payload = dict(
-            user_id=current_user["user"].id,
-            project_id=new_project.id
+        insert_assignments(
+            db,
+            user_project_model.UserProject.project_id,
+            new_project.id,
+            user_project_model.UserProject.user_id,
+            owners_ids
         )
-        new_user_project = user_project_model.UserProject(
-            **user_project_payload)
 
-        db.add(new_user_project)
-        db.commit()
-        db.refresh(new_user_project)
-
-        if not new_user_project:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Can't assign user to project! Something went wrong")
+    db.refresh(new_project)
 
     return new_project
 
 
 @router.get("/{id}", response_model=project_schema.ProjectResponse)
-async def get_project(
+def get_project(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
     project_query = db.query(
         project_model.Project
+    ).options(
+        *get_loader_options(project_model.Project, project_schema.ProjectResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == project_model.Project.organization_id
     ).filter(
@@ -298,7 +247,7 @@ async def get_project(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_project(
+def delete_project(
     selected: List[int],
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -328,7 +277,8 @@ async def delete_project(
         my_tower.port,
         my_tower.username,
         my_tower.password,
-        10
+        10,
+        tower_id=my_tower.id
     )
     if not deleted_projects:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -341,7 +291,7 @@ async def delete_project(
 
 
 @router.put("/{id}", response_model=project_schema.ProjectResponse)
-async def update_project(
+def update_project(
     id: int,
     payload: project_schema.ProjectRequest,
     db: Session = Depends(get_db),
@@ -422,7 +372,8 @@ async def update_project(
             my_tower.port,
             my_tower.username,
             my_tower.password,
-            10
+            10,
+            tower_id=my_tower.id
         )
         if not updated_project_name:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -455,7 +406,8 @@ async def update_project(
                 my_tower.port,
                 my_tower.username,
                 my_tower.password,
-                10
+                10,
+                tower_id=my_tower.id
             )
             if not updated_repo:
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -486,7 +438,7 @@ async def update_project(
 
 
 @router.put("/{id}/repo", response_model=project_schema.ProjectResponse)
-async def update_repo_project(
+def update_repo_project(
     id: int,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -533,7 +485,8 @@ async def update_repo_project(
         my_tower.port,
         my_tower.username,
         my_tower.password,
-        10
+        10,
+        tower_id=my_tower.id
     )
     if not updated_repo:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,15 +1,16 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from fastapi.security.oauth2 import OAuth2PasswordBearer
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from uuid import uuid4
-from typing import List, Optional
+from typing import List
 from ..models import project_schedule_model, project_model, organization_model, schedule_model
 from ..schemas import common_schema, user_schema, project_schedule_schema
 from ..database.connection import get_db
-from app.services.tower.schedule_service import add_crontab_schedule_project, check_job_id, get_job_schedule_info, remove_job_schedules
-from app.utils.check_value_exists import check_if_schedules_ids_in_list_of_response, check_if_in_list_of_dict
+from ..database.replica import get_read_db
+from app.services.tower.schedule_service import get_job_schedule_info, get_schedule_next_run_at
+from app.utils.check_value_exists import check_if_in_list_of_dict
 from app.utils.get_ids import get_schedules_ids_list_from_response, get_ids_list
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -17,21 +18,18 @@ router = APIRouter(
     tags=['Projects | Schedules assigns']
 )
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl='api/login')
-
-
 @router.get("", response_model=List[project_schedule_schema.ProjectScheduleResponse])
-async def get_projects_schedules(
-    db: Session = Depends(get_db),
+def get_projects_schedules(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     projects_schedules_query = db.query(
         project_schedule_model.ProjectSchedule
+    ).options(
+        *get_loader_options(project_schedule_model.ProjectSchedule, project_schedule_schema.ProjectScheduleResponse)
     ).join(
         schedule_model.Schedule, schedule_model.Schedule.id == project_schedule_model.ProjectSchedule.schedule_id
     ).join(
@@ -42,26 +40,12 @@ async def get_projects_schedules(
             get_ids_list(current_user['organizations']))
     )
 
-    if skip:
-        projects_schedules_query = projects_schedules_query.offset(skip)
-
-    if limit:
-        projects_schedules_query = projects_schedules_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            projects_schedules_query = projects_schedules_query.order_by(
-                desc(sort))
-        else:
-            projects_schedules_query = projects_schedules_query.order_by(sort)
-    else:
-        projects_schedules_query = projects_schedules_query.order_by(
-            project_schedule_model.ProjectSchedule.project_schedule_id)
-
-    if limit == 1:
-        projects_schedules = projects_schedules_query.first()
-    else:
-        projects_schedules = projects_schedules_query.all()
+    projects_schedules = paginate(
+        projects_schedules_query,
+        response,
+        project_schedule_model.ProjectSchedule.project_schedule_id,
+        pagination
+    )
 
     if not projects_schedules:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -71,10 +55,9 @@ async def get_projects_schedules(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=List[project_schedule_schema.ProjectSchedulesResponse])
-async def create_projects_schedules(
+def create_projects_schedules(
     payload: project_schedule_schema.ProjectSchedulePostRequest,
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
@@ -82,12 +65,6 @@ async def create_projects_schedules(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Can't assign schedules to project! Provide a valid request")
 
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
-                            detail="Could not get credential token", headers={"WWW-Authenticate": "Bearer"})
-
-    response: list = []
-
     schedules_query = db.query(
         schedule_model.Schedule
     ).join(
@@ -136,63 +113,62 @@ async def create_projects_schedules(
     )
     projects_schedules = projects_schedules_query.all()
 
-    if set(payload.schedules_id) == set(get_schedules_ids_list_from_response(projects_schedules)):
+    assigned_schedules_ids = set(
+        get_schedules_ids_list_from_response(projects_schedules))
+
+    if set(payload.schedules_id) == assigned_schedules_ids:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                             detail="Can't assign schedules to project! Assign already exists!")
 
-    for schedule in schedules:
-        if not check_if_schedules_ids_in_list_of_response(projects_schedules, schedule.id):
-            cron_job_id: str = str(uuid4())
-            while check_job_id(cron_job_id):
-                cron_job_id = str(uuid4())
-
-            added_schedule = add_crontab_schedule_project(
-                token,
-                schedule.start_date_time,
-                schedule.repeat_frequency,
-                schedule.every if schedule.every else None,
-                schedule.week_days if schedule.week_days else None,
-                cron_job_id,
-                project.id
-            )
-            if not added_schedule:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't add schedule to service! Something went wrong")
+    new_schedules_ids: List[int] = []
 
+    for schedule in schedules:
+        if schedule.id not in assigned_schedules_ids:
             project_schedule_payload = dict(
                 schedule_id=schedule.id,
                 project_id=payload.project_id,
-                cron_job_id=cron_job_id
+                cron_job_id=str(uuid4()),
+                next_run_at=get_schedule_next_run_at(schedule)
             )
             new_project_schedule = project_schedule_model.ProjectSchedule(
                 **project_schedule_payload)
 
             db.add(new_project_schedule)
-            db.commit()
-            db.refresh(new_project_schedule)
+            new_schedules_ids.append(schedule.id)
 
-            if not new_project_schedule:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign schedules to project! Something went wrong")
+    db.commit()
 
-            response.append(new_project_schedule)
+    response = db.query(
+        project_schedule_model.ProjectSchedule
+    ).options(
+        *get_loader_options(project_schedule_model.ProjectSchedule, project_schedule_schema.ProjectSchedulesResponse)
+    ).filter(
+        project_schedule_model.ProjectSchedule.project_id == payload.project_id,
+        project_schedule_model.ProjectSchedule.schedule_id.in_(new_schedules_ids)
+    ).order_by(
+        project_schedule_model.ProjectSchedule.project_schedule_id
+    ).all()
+
+    if len(response) != len(new_schedules_ids):
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Can't assign schedules to project! Something went wrong")
 
     return response
 
 
 @router.get("/{id}/projects", response_model=List[project_schedule_schema.ProjectsScheduleResponse])
-async def get_projects_schedule(
+def get_projects_schedule(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     projects_schedule_query = db.query(
         project_schedule_model.ProjectSchedule
+    ).options(
+        *get_loader_options(project_schedule_model.ProjectSchedule, project_schedule_schema.ProjectsScheduleResponse)
     ).join(
         schedule_model.Schedule, schedule_model.Schedule.id == project_schedule_model.ProjectSchedule.schedule_id
     ).join(
@@ -204,26 +180,12 @@ async def get_projects_schedule(
         project_schedule_model.ProjectSchedule.schedule_id == id
     )
 
-    if skip:
-        projects_schedule_query = projects_schedule_query.offset(skip)
-
-    if limit:
-        projects_schedule_query = projects_schedule_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            projects_schedule_query = projects_schedule_query.order_by(
-                desc(sort))
-        else:
-            projects_schedule_query = projects_schedule_query.order_by(sort)
-    else:
-        projects_schedule_query = projects_schedule_query.order_by(
-            project_schedule_model.ProjectSchedule.project_schedule_id)
-
-    if limit == 1:
-        projects_schedule = projects_schedule_query.first()
-    else:
-        projects_schedule = projects_schedule_query.all()
+    projects_schedule = paginate(
+        projects_schedule_query,
+        response,
+        project_schedule_model.ProjectSchedule.project_schedule_id,
+        pagination
+    )
 
     if not projects_schedule:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -233,18 +195,18 @@ async def get_projects_schedule(
 
 
 @router.get("/{id}/schedules", response_model=List[project_schedule_schema.ProjectSchedulesResponse])
-async def get_project_schedules(
+def get_project_schedules(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     project_schedules_query = db.query(
         project_schedule_model.ProjectSchedule
+    ).options(
+        *get_loader_options(project_schedule_model.ProjectSchedule, project_schedule_schema.ProjectSchedulesResponse)
     ).join(
         project_model.Project, project_model.Project.id == project_schedule_model.ProjectSchedule.project_id
     ).join(
@@ -256,26 +218,12 @@ async def get_project_schedules(
         project_schedule_model.ProjectSchedule.project_id == id
     )
 
-    if skip:
-        project_schedules_query = project_schedules_query.offset(skip)
-
-    if limit:
-        project_schedules_query = project_schedules_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            project_schedules_query = project_schedules_query.order_by(
-                desc(sort))
-        else:
-            project_schedules_query = project_schedules_query.order_by(sort)
-    else:
-        project_schedules_query = project_schedules_query.order_by(
-            project_schedule_model.ProjectSchedule.project_schedule_id)
-
-    if limit == 1:
-        project_schedules = project_schedules_query.first()
-    else:
-        project_schedules = project_schedules_query.all()
+    project_schedules = paginate(
+        project_schedules_query,
+        response,
+        project_schedule_model.ProjectSchedule.project_schedule_id,
+        pagination
+    )
 
     if not project_schedules:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -285,9 +233,9 @@ async def get_project_schedules(
 
 
 @router.get("/{id}/schedules/info", response_model=List[common_schema.JobsScheduleInfoBase])
-async def get_project_schedules_info(
+def get_project_schedules_info(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
@@ -319,7 +267,7 @@ async def get_project_schedules_info(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_projects_schedules(
+def delete_projects_schedules(
     selected: List[int],
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -342,11 +290,6 @@ async def delete_projects_schedules(
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="Not authorized to perform requested action")
 
-    schedules_deleted = remove_job_schedules(projects_schedules)
-    if not schedules_deleted:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't delete schedule in service! Something went wrong")
-
     projects_schedules_query.delete(synchronize_session=False)
     db.commit()
 
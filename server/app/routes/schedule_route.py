@@ -1,13 +1,21 @@
-from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from fastapi import Query, Response, status, HTTPException, Depends, APIRouter
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, contains_eager
+from datetime import datetime, timedelta, timezone
+from heapq import merge
 from typing import Optional, List
-from ..models import schedule_model, organization_model, template_schedule_model, project_schedule_model, inventory_schedule_model
-from ..schemas import schedule_schema, user_schema, common_schema
+from ..models import schedule_model, organization_model, template_schedule_model, project_schedule_model, inventory_schedule_model, template_model, project_model, inventory_model
+from ..schemas import common_schema, schedule_schema, user_schema
 from ..database.connection import get_db
-from app.services.tower.schedule_service import update_job_schedule
+from ..database.replica import get_read_db
+from ..configs.env_vars import settings
+from app.services.tower.schedule_service import apply_launch_cap, get_load_histogram, get_schedule_next_run_at, get_schedule_run_times
 from app.utils.get_ids import get_ids_list
 from app.utils.check_value_exists import check_if_in_list_of_dict
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
+from app.utils.row_serializer import get_row_query
+from app.utils.export import get_export_response
 from ..auth import oauth2
 
 router = APIRouter(
@@ -15,20 +23,31 @@ router = APIRouter(
     tags=['Schedules']
 )
 
+MAX_FORECAST_WINDOW = timedelta(days=31)
+
+FORECAST_ASSIGNMENTS = (
+    (template_schedule_model.TemplateSchedule, template_model.Template,
+     template_schedule_model.TemplateSchedule.template_id),
+    (project_schedule_model.ProjectSchedule, project_model.Project,
+     project_schedule_model.ProjectSchedule.project_id),
+    (inventory_schedule_model.InventorySchedule, inventory_model.Inventory,
+     inventory_schedule_model.InventorySchedule.inventory_id)
+)
+
 
 @router.get("", response_model=List[schedule_schema.ScheduleResponse])
-async def get_schedules(
-    db: Session = Depends(get_db),
+def get_schedules(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     schedules_query = db.query(
         schedule_model.Schedule
+    ).options(
+        *get_loader_options(schedule_model.Schedule, schedule_schema.ScheduleResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == schedule_model.Schedule.organization_id
     ).filter(
@@ -42,24 +61,12 @@ async def get_schedules(
             schedule_model.Schedule.name.contains(search_by_name)
         )
 
-    if skip:
-        schedules_query = schedules_query.offset(skip)
-
-    if limit:
-        schedules_query = schedules_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            schedules_query = schedules_query.order_by(desc(sort))
-        else:
-            schedules_query = schedules_query.order_by(sort)
-    else:
-        schedules_query = schedules_query.order_by(schedule_model.Schedule.id)
-
-    if limit == 1:
-        schedules = schedules_query.first()
-    else:
-        schedules = schedules_query.all()
+    schedules = paginate(
+        schedules_query,
+        response,
+        schedule_model.Schedule.id,
+        pagination
+    )
 
     if not schedules:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -69,25 +76,23 @@ async def get_schedules(
 
 
 @router.get("/owner", response_model=List[schedule_schema.ScheduleResponse])
-async def get_my_schedules(
-    db: Session = Depends(get_db),
+def get_my_schedules(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     my_schedules_query = db.query(
         schedule_model.Schedule
+    ).options(
+        *get_loader_options(schedule_model.Schedule, schedule_schema.ScheduleResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == schedule_model.Schedule.organization_id
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id,
         schedule_model.Schedule.created_by == current_user['user'].username
-    ).distinct(
-        schedule_model.Schedule.id
     )
 
     if search_by_name:
@@ -95,25 +100,12 @@ async def get_my_schedules(
             schedule_model.Schedule.name.contains(search_by_name)
         )
 
-    if skip:
-        my_schedules_query = my_schedules_query.offset(skip)
-
-    if limit:
-        my_schedules_query = my_schedules_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            my_schedules_query = my_schedules_query.order_by(desc(sort))
-        else:
-            my_schedules_query = my_schedules_query.order_by(sort)
-    else:
-        my_schedules_query = my_schedules_query.order_by(
-            schedule_model.Schedule.id)
-
-    if limit == 1:
-        my_schedules = my_schedules_query.first()
-    else:
-        my_schedules = my_schedules_query.all()
+    my_schedules = paginate(
+        my_schedules_query,
+        response,
+        schedule_model.Schedule.id,
+        pagination
+    )
 
     if not my_schedules:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -122,8 +114,133 @@ async def get_my_schedules(
     return my_schedules
 
 
+@router.get("/export")
+def export_schedules(
+    db: Session = Depends(get_read_db),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user),
+    search_by_name: Optional[str] = "",
+    export_format: common_schema.ExportFormat = Query(
+        common_schema.ExportFormat.ndjson, alias="format")
+):
+    schedules_query = get_row_query(
+        db,
+        schedule_model.Schedule,
+        schedule_schema.ScheduleResponse
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == schedule_model.Schedule.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        schedule_model.Schedule.organization_id.in_(
+            get_ids_list(current_user['organizations']))
+    )
+
+    if search_by_name:
+        schedules_query = schedules_query.filter(
+            schedule_model.Schedule.name.contains(search_by_name)
+        )
+
+    return get_export_response(
+        schedules_query.order_by(schedule_model.Schedule.id),
+        schedule_model.Schedule,
+        schedule_schema.ScheduleResponse,
+        export_format,
+        "schedules"
+    )
+
+
+@router.get("/forecast", response_model=schedule_schema.ScheduleForecastResponse)
+def get_schedules_forecast(
+    db: Session = Depends(get_read_db),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user),
+    from_date: Optional[datetime] = Query(None, alias="from"),
+    to_date: Optional[datetime] = Query(None, alias="to"),
+    bucket_minutes: int = 60,
+    limit: Optional[int] = 1000
+):
+    now = datetime.now(timezone.utc)
+
+    if from_date and not from_date.tzinfo:
+        from_date = from_date.replace(tzinfo=timezone.utc)
+    if to_date and not to_date.tzinfo:
+        to_date = to_date.replace(tzinfo=timezone.utc)
+
+    from_date = max(from_date, now) if from_date else now
+    to_date = to_date if to_date else from_date + timedelta(days=1)
+
+    if to_date <= from_date or bucket_minutes < 1:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Can't forecast schedules! Provide a valid window")
+
+    if to_date - from_date > MAX_FORECAST_WINDOW:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Can't forecast schedules! Window can't exceed {MAX_FORECAST_WINDOW.days} days")
+
+    run_times_by_schedule: dict = {}
+    timelines: list = []
+
+    for (assignment_model, resource_model, resource_column) in FORECAST_ASSIGNMENTS:
+        assignments = db.query(
+            schedule_model.Schedule,
+            resource_model.id,
+            resource_model.name,
+            organization_model.Organization.tower_id
+        ).join(
+            assignment_model, assignment_model.schedule_id == schedule_model.Schedule.id
+        ).join(
+            resource_model, resource_model.id == resource_column
+        ).join(
+            organization_model.Organization, organization_model.Organization.id == schedule_model.Schedule.organization_id
+        ).options(
+            contains_eager(schedule_model.Schedule.organization)
+        ).filter(
+            organization_model.Organization.tower_id == current_user["user"].tower.id,
+            schedule_model.Schedule.organization_id.in_(
+                get_ids_list(current_user['organizations'])),
+            or_(
+                assignment_model.next_run_at <= to_date,
+                assignment_model.in_crontab.is_(True)
+            )
+        ).all()
+
+        for (schedule, resource_id, resource_name, tower_id) in assignments:
+            if schedule.id not in run_times_by_schedule:
+                run_times_by_schedule[schedule.id] = get_schedule_run_times(
+                    schedule,
+                    from_date,
+                    to_date
+                )
+
+            timelines.append([
+                dict(
+                    run_at=run_at,
+                    schedule_id=schedule.id,
+                    schedule_name=schedule.name,
+                    schedule_type=schedule.schedule_type,
+                    resource_id=resource_id,
+                    resource_name=resource_name,
+                    tower_id=tower_id
+                )
+                for run_at in run_times_by_schedule[schedule.id]
+            ])
+
+    runs = apply_launch_cap(
+        merge(*timelines, key=lambda run: run["run_at"]),
+        settings.scheduler_max_launches_per_minute
+    )
+
+    return dict(
+        runs=runs[:limit] if limit else runs,
+        load=get_load_histogram(
+            ((run["tower_id"], run["run_at"]) for run in runs),
+            bucket_minutes
+        )
+    )
+
+
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=schedule_schema.ScheduleResponse)
-async def create_schedule(
+def create_schedule(
     payload: schedule_schema.ScheduleRequest,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -192,14 +309,16 @@ async def create_schedule(
 
 
 @router.get("/{id}", response_model=schedule_schema.ScheduleResponse)
-async def get_schedule(
+def get_schedule(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
     schedule_query = db.query(
         schedule_model.Schedule
+    ).options(
+        *get_loader_options(schedule_model.Schedule, schedule_schema.ScheduleResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == schedule_model.Schedule.organization_id
     ).filter(
@@ -219,7 +338,7 @@ async def get_schedule(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_schedule(
+def delete_schedule(
     selected: List[int],
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -248,7 +367,7 @@ async def delete_schedule(
 
 
 @router.put("/{id}", response_model=schedule_schema.ScheduleResponse)
-async def update_schedule(
+def update_schedule(
     id: int,
     payload: schedule_schema.ScheduleUpdateRequest,
     db: Session = Depends(get_db),
@@ -313,99 +432,49 @@ async def update_schedule(
             raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                                 detail="Can't update schedule! Schedule already exists")
 
+    updated_payload = dict(
+        **payload.dict(),
+        last_modified_by=current_user["user"].username
+    )
+
+    schedule_query.update(
+        updated_payload,
+        synchronize_session=False
+    )
+
+    db.refresh(schedule)
+
+    next_run_at = get_schedule_next_run_at(schedule)
+
     if schedule.schedule_type == schedule_schema.ScheduleType.inventory:
-        inventories_schedule_query = db.query(
+        db.query(
             inventory_schedule_model.InventorySchedule
-        ).join(
-            schedule_model.Schedule, schedule_model.Schedule.id == inventory_schedule_model.InventorySchedule.schedule_id
-        ).join(
-            organization_model.Organization, organization_model.Organization.id == schedule_model.Schedule.organization_id
         ).filter(
-            organization_model.Organization.tower_id == current_user["user"].tower.id,
-            schedule_model.Schedule.organization_id.in_(
-                get_ids_list(current_user['organizations'])),
             inventory_schedule_model.InventorySchedule.schedule_id == id
+        ).update(
+            dict(next_run_at=next_run_at),
+            synchronize_session=False
         )
-        inventories_schedule = inventories_schedule_query.all()
-
-        if inventories_schedule:
-            for inventory_schedule in inventories_schedule:
-                schedules_updated = update_job_schedule(
-                    inventory_schedule.cron_job_id,
-                    payload.start_date_time,
-                    payload.repeat_frequency,
-                    payload.every if payload.every else None,
-                    payload.week_days if payload.week_days else None
-                )
-                if not schedules_updated:
-                    raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                        detail="Can't update schedule in service! Something went wrong")
 
     if schedule.schedule_type == schedule_schema.ScheduleType.project:
-        projects_schedule_query = db.query(
+        db.query(
             project_schedule_model.ProjectSchedule
-        ).join(
-            schedule_model.Schedule, schedule_model.Schedule.id == project_schedule_model.ProjectSchedule.schedule_id
-        ).join(
-            organization_model.Organization, organization_model.Organization.id == schedule_model.Schedule.organization_id
         ).filter(
-            organization_model.Organization.tower_id == current_user["user"].tower.id,
-            schedule_model.Schedule.organization_id.in_(
-                get_ids_list(current_user['organizations'])),
             project_schedule_model.ProjectSchedule.schedule_id == id
+        ).update(
+            dict(next_run_at=next_run_at),
+            synchronize_session=False
         )
-        projects_schedule = projects_schedule_query.all()
-
-        if projects_schedule:
-            for project_schedule in projects_schedule:
-                schedules_updated = update_job_schedule(
-                    project_schedule.cron_job_id,
-                    payload.start_date_time,
-                    payload.repeat_frequency,
-                    payload.every if payload.every else None,
-                    payload.week_days if payload.week_days else None
-                )
-                if not schedules_updated:
-                    raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                        detail="Can't update schedule in service! Something went wrong")
 
     if schedule.schedule_type == schedule_schema.ScheduleType.template:
-        templates_schedule_query = db.query(
+        db.query(
             template_schedule_model.TemplateSchedule
-        ).join(
-            schedule_model.Schedule, schedule_model.Schedule.id == template_schedule_model.TemplateSchedule.schedule_id
-        ).join(
-            organization_model.Organization, organization_model.Organization.id == schedule_model.Schedule.organization_id
         ).filter(
-            organization_model.Organization.tower_id == current_user["user"].tower.id,
-            schedule_model.Schedule.organization_id.in_(
-                get_ids_list(current_user['organizations'])),
             template_schedule_model.TemplateSchedule.schedule_id == id
+        ).update(
+            dict(next_run_at=next_run_at),
+            synchronize_session=False
         )
-        templates_schedule = templates_schedule_query.all()
-
-        if templates_schedule:
-            for template_schedule in templates_schedule:
-                schedules_updated = update_job_schedule(
-                    template_schedule.cron_job_id,
-                    payload.start_date_time,
-                    payload.repeat_frequency,
-                    payload.every if payload.every else None,
-                    payload.week_days if payload.week_days else None
-                )
-                if not schedules_updated:
-                    raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                        detail="Can't update schedule in service! Something went wrong")
-
-    updated_payload = dict(
-        **payload.dict(),
-        last_modified_by=current_user["user"].username
-    )
-
-    schedule_query.update(
-        updated_payload,
-        synchronize_session=False
-    )
 
     db.commit()
 
@@ -1,12 +1,15 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from ..models import team_credential_model, credential_model, organization_model, team_model, user_team_model, user_model, user_credential_model
-from ..schemas import common_schema, user_schema, team_credential_schema
+from typing import List
+from ..models import team_credential_model, credential_model, organization_model, team_model, user_credential_model
+from ..schemas import user_schema, team_credential_schema
 from ..database.connection import get_db
-from app.utils.check_value_exists import check_if_in_list_of_dict, check_if_teams_ids_in_list_of_response, check_if_users_ids_in_list_of_response
-from app.utils.get_ids import get_ids_list, get_teams_ids_list_from_response, get_users_ids_list_from_response
+from ..database.replica import get_read_db
+from app.utils.check_value_exists import check_if_in_list_of_dict
+from app.utils.get_ids import get_ids_list
+from app.utils.assignments import insert_assignments, insert_teams_users_assignments, replace_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -16,17 +19,17 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[team_credential_schema.TeamCredentialResponse])
-async def get_teams_credentials(
-    db: Session = Depends(get_db),
+def get_teams_credentials(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     teams_credentials_query = db.query(
         team_credential_model.TeamCredential
+    ).options(
+        *get_loader_options(team_credential_model.TeamCredential, team_credential_schema.TeamCredentialResponse)
     ).join(
         team_model.Team, team_model.Team.id == team_credential_model.TeamCredential.team_id
     ).join(
@@ -37,26 +40,12 @@ async def get_teams_credentials(
             get_ids_list(current_user['organizations']))
     )
 
-    if skip:
-        teams_credentials_query = teams_credentials_query.offset(skip)
-
-    if limit:
-        teams_credentials_query = teams_credentials_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            teams_credentials_query = teams_credentials_query.order_by(
-                desc(sort))
-        else:
-            teams_credentials_query = teams_credentials_query.order_by(sort)
-    else:
-        teams_credentials_query = teams_credentials_query.order_by(
-            team_credential_model.TeamCredential.team_credential_id)
-
-    if limit == 1:
-        teams_credentials = teams_credentials_query.first()
-    else:
-        teams_credentials = teams_credentials_query.all()
+    teams_credentials = paginate(
+        teams_credentials_query,
+        response,
+        team_credential_model.TeamCredential.team_credential_id,
+        pagination
+    )
 
     if not teams_credentials:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -66,7 +55,7 @@ async def get_teams_credentials(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=team_credential_schema.TeamCredentialResponse)
-async def create_teams_credentials(
+def create_teams_credentials(
     payload: team_credential_schema.TeamCredentialPostRequest,
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -83,8 +72,8 @@ async def create_teams_credentials(
         team_model.Team.tower_id == current_user["user"].tower.id,
         team_model.Team.id.in_(payload.teams_id)
     )
-    teams = teams_query.all()
-    if not teams or len(teams) != len(payload.teams_id):
+    teams_count = teams_query.count()
+    if teams_count != len(set(payload.teams_id)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Can't assign teams to credential! Provide a valid team")
 
@@ -105,95 +94,126 @@ async def create_teams_credentials(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Not authorized to perform requested action")
 
-    teams_credentials_query = db.query(
+    new_teams_ids = insert_assignments(
+        db,
+        team_credential_model.TeamCredential.credential_id,
+        payload.credential_id,
+        team_credential_model.TeamCredential.team_id,
+        payload.teams_id
+    )
+    if not new_teams_ids:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Can't assign teams to credential! Assign already exists!")
+
+    new_users_ids = insert_teams_users_assignments(
+        db,
+        user_credential_model.UserCredential.credential_id,
+        payload.credential_id,
+        user_credential_model.UserCredential.user_id,
+        new_teams_ids,
+        current_user["user"].tower.id
+    )
+
+    db.commit()
+
+    new_team_credential = db.query(
         team_credential_model.TeamCredential
-    ).join(
-        team_model.Team, team_model.Team.id == team_credential_model.TeamCredential.team_id
+    ).filter(
+        team_credential_model.TeamCredential.credential_id == payload.credential_id,
+        team_credential_model.TeamCredential.team_id == new_teams_ids[-1]
+    ).first()
+    if not new_team_credential:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Can't assign teams to credential! Something went wrong")
+
+    return new_team_credential
+
+
+@router.put("", response_model=List[team_credential_schema.TeamCredentialResponse])
+def replace_teams_credentials(
+    payload: team_credential_schema.TeamCredentialPostRequest,
+    db: Session = Depends(get_db),
+    is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user)
+):
+    if payload.teams_id is None or not payload.credential_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Can't assign teams to credential! Provide a valid request")
+
+    teams_query = db.query(
+        team_model.Team
     ).filter(
         team_model.Team.tower_id == current_user["user"].tower.id,
-        team_credential_model.TeamCredential.team_id.in_(payload.teams_id),
-        team_credential_model.TeamCredential.credential_id == payload.credential_id
+        team_model.Team.id.in_(payload.teams_id)
     )
-    teams_credentials = teams_credentials_query.all()
+    teams_count = teams_query.count()
+    if teams_count != len(set(payload.teams_id)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign teams to credential! Provide a valid team")
 
-    if set(payload.teams_id) == set(get_teams_ids_list_from_response(teams_credentials)):
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
-                            detail="Can't assign teams to credential! Assign already exists!")
+    credential_query = db.query(
+        credential_model.Credential
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == credential_model.Credential.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        credential_model.Credential.id == payload.credential_id
+    )
+    credential = credential_query.first()
+    if not credential:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign teams to credential! Provide a valid credential")
+
+    if not check_if_in_list_of_dict(current_user['organizations'], credential.organization.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Not authorized to perform requested action")
 
-    for team_id in payload.teams_id:
-        if not check_if_teams_ids_in_list_of_response(teams_credentials, team_id):
-            team_credential_payload = dict(
-                team_id=team_id,
-                credential_id=payload.credential_id
-            )
-            new_team_credential = team_credential_model.TeamCredential(
-                **team_credential_payload)
-
-            db.add(new_team_credential)
-            db.commit()
-            db.refresh(new_team_credential)
-
-            if not new_team_credential:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign teams to credential! Something went wrong")
-            else:
-                users_teams_query = db.query(
-                    user_team_model.UserTeam
-                ).join(
-                    user_model.User, user_model.User.id == user_team_model.UserTeam.user_id
-                ).filter(
-                    user_model.User.tower_id == current_user["user"].tower.id,
-                    user_team_model.UserTeam.team_id == team_id
-                )
-                users_teams = users_teams_query.all()
-
-                users_credentials_query = db.query(
-                    user_credential_model.UserCredential
-                ).join(
-                    user_model.User, user_model.User.id == user_credential_model.UserCredential.user_id
-                ).filter(
-                    user_model.User.tower_id == current_user["user"].tower.id,
-                    user_credential_model.UserCredential.user_id.in_(
-                        get_users_ids_list_from_response(users_teams)),
-                    user_credential_model.UserCredential.credential_id == payload.credential_id
-                )
-                users_credentials = users_credentials_query.all()
-
-                for user_team in users_teams:
-                    if not check_if_users_ids_in_list_of_response(users_credentials, user_team.user_id):
-                        user_credential_payload = dict(
-                            user_id=user_team.user.id,
-                            credential_id=payload.credential_id
-                        )
-                        new_user_credential = user_credential_model.UserCredential(
-                            **user_credential_payload)
-
-                        db.add(new_user_credential)
-                        db.commit()
-                        db.refresh(new_user_credential)
-
-                        if not new_user_credential:
-                            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                                detail="Can't assign users to credential! Something went wrong")
+    (new_teams_ids, removed_teams_ids) = replace_assignments(
+        db,
+        team_credential_model.TeamCredential.credential_id,
+        payload.credential_id,
+        team_credential_model.TeamCredential.team_id,
+        payload.teams_id
+    )
 
-    return new_team_credential
+    new_users_ids = insert_teams_users_assignments(
+        db,
+        user_credential_model.UserCredential.credential_id,
+        payload.credential_id,
+        user_credential_model.UserCredential.user_id,
+        new_teams_ids,
+        current_user["user"].tower.id
+    )
+
+    db.commit()
+
+    return db.query(
+        team_credential_model.TeamCredential
+    ).options(
+        *get_loader_options(team_credential_model.TeamCredential, team_credential_schema.TeamCredentialResponse)
+    ).filter(
+        team_credential_model.TeamCredential.credential_id == payload.credential_id
+    ).order_by(
+        team_credential_model.TeamCredential.team_credential_id
+    ).all()
 
 
 @router.get("/{id}/teams", response_model=List[team_credential_schema.TeamsCredentialResponse])
-async def get_teams_credential(
+def get_teams_credential(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     teams_credential_query = db.query(
         team_credential_model.TeamCredential
+    ).options(
+        *get_loader_options(team_credential_model.TeamCredential, team_credential_schema.TeamsCredentialResponse)
     ).join(
         team_model.Team, team_model.Team.id == team_credential_model.TeamCredential.team_id
     ).join(
@@ -205,26 +225,12 @@ async def get_teams_credential(
         team_credential_model.TeamCredential.credential_id == id
     )
 
-    if skip:
-        teams_credential_query = teams_credential_query.offset(skip)
-
-    if limit:
-        teams_credential_query = teams_credential_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            teams_credential_query = teams_credential_query.order_by(
-                desc(sort))
-        else:
-            teams_credential_query = teams_credential_query.order_by(sort)
-    else:
-        teams_credential_query = teams_credential_query.order_by(
-            team_credential_model.TeamCredential.team_credential_id)
-
-    if limit == 1:
-        teams_credential = teams_credential_query.first()
-    else:
-        teams_credential = teams_credential_query.all()
+    teams_credential = paginate(
+        teams_credential_query,
+        response,
+        team_credential_model.TeamCredential.team_credential_id,
+        pagination
+    )
 
     if not teams_credential:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -234,7 +240,7 @@ async def get_teams_credential(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_teams_credentials(
+def delete_teams_credentials(
     selected: List[int],
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
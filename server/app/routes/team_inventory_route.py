@@ -1,12 +1,15 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from ..models import team_inventory_model, inventory_model, organization_model, team_model, user_team_model, user_model, user_inventory_model
-from ..schemas import common_schema, user_schema, team_inventory_schema
+from typing import List
+from ..models import team_inventory_model, inventory_model, organization_model, team_model, user_inventory_model
+from ..schemas import user_schema, team_inventory_schema
 from ..database.connection import get_db
-from app.utils.check_value_exists import check_if_in_list_of_dict, check_if_teams_ids_in_list_of_response, check_if_users_ids_in_list_of_response
-from app.utils.get_ids import get_ids_list, get_teams_ids_list_from_response, get_users_ids_list_from_response
+from ..database.replica import get_read_db
+from app.utils.check_value_exists import check_if_in_list_of_dict
+from app.utils.get_ids import get_ids_list
+from app.utils.assignments import insert_assignments, insert_teams_users_assignments, replace_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -16,17 +19,17 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[team_inventory_schema.TeamInventoryResponse])
-async def get_teams_inventories(
-    db: Session = Depends(get_db),
+def get_teams_inventories(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     teams_inventories_query = db.query(
         team_inventory_model.TeamInventory
+    ).options(
+        *get_loader_options(team_inventory_model.TeamInventory, team_inventory_schema.TeamInventoryResponse)
     ).join(
         team_model.Team, team_model.Team.id == team_inventory_model.TeamInventory.team_id
     ).join(
@@ -37,26 +40,12 @@ async def get_teams_inventories(
             get_ids_list(current_user['organizations']))
     )
 
-    if skip:
-        teams_inventories_query = teams_inventories_query.offset(skip)
-
-    if limit:
-        teams_inventories_query = teams_inventories_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            teams_inventories_query = teams_inventories_query.order_by(
-                desc(sort))
-        else:
-            teams_inventories_query = teams_inventories_query.order_by(sort)
-    else:
-        teams_inventories_query = teams_inventories_query.order_by(
-            team_inventory_model.TeamInventory.team_inventory_id)
-
-    if limit == 1:
-        teams_inventories = teams_inventories_query.first()
-    else:
-        teams_inventories = teams_inventories_query.all()
+    teams_inventories = paginate(
+        teams_inventories_query,
+        response,
+        team_inventory_model.TeamInventory.team_inventory_id,
+        pagination
+    )
 
     if not teams_inventories:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -66,7 +55,7 @@ async def get_teams_inventories(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=team_inventory_schema.TeamInventoryResponse)
-async def create_teams_inventories(
+def create_teams_inventories(
     payload: team_inventory_schema.TeamInventoryPostRequest,
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -83,8 +72,8 @@ async def create_teams_inventories(
         team_model.Team.tower_id == current_user["user"].tower.id,
         team_model.Team.id.in_(payload.teams_id)
     )
-    teams = teams_query.all()
-    if not teams or len(teams) != len(payload.teams_id):
+    teams_count = teams_query.count()
+    if teams_count != len(set(payload.teams_id)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Can't assign teams to inventory! Provide a valid team")
 
@@ -105,95 +94,126 @@ async def create_teams_inventories(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Not authorized to perform requested action")
 
-    teams_inventories_query = db.query(
+    new_teams_ids = insert_assignments(
+        db,
+        team_inventory_model.TeamInventory.inventory_id,
+        payload.inventory_id,
+        team_inventory_model.TeamInventory.team_id,
+        payload.teams_id
+    )
+    if not new_teams_ids:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Can't assign teams to inventory! Assign already exists!")
+
+    new_users_ids = insert_teams_users_assignments(
+        db,
+        user_inventory_model.UserInventory.inventory_id,
+        payload.inventory_id,
+        user_inventory_model.UserInventory.user_id,
+        new_teams_ids,
+        current_user["user"].tower.id
+    )
+
+    db.commit()
+
+    new_team_inventory = db.query(
         team_inventory_model.TeamInventory
-    ).join(
-        team_model.Team, team_model.Team.id == team_inventory_model.TeamInventory.team_id
+    ).filter(
+        team_inventory_model.TeamInventory.inventory_id == payload.inventory_id,
+        team_inventory_model.TeamInventory.team_id == new_teams_ids[-1]
+    ).first()
+    if not new_team_inventory:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Can't assign teams to inventory! Something went wrong")
+
+    return new_team_inventory
+
+
+@router.put("", response_model=List[team_inventory_schema.TeamInventoryResponse])
+def replace_teams_inventories(
+    payload: team_inventory_schema.TeamInventoryPostRequest,
+    db: Session = Depends(get_db),
+    is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user)
+):
+    if payload.teams_id is None or not payload.inventory_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Can't assign teams to inventory! Provide a valid request")
+
+    teams_query = db.query(
+        team_model.Team
     ).filter(
         team_model.Team.tower_id == current_user["user"].tower.id,
-        team_inventory_model.TeamInventory.team_id.in_(payload.teams_id),
-        team_inventory_model.TeamInventory.inventory_id == payload.inventory_id
+        team_model.Team.id.in_(payload.teams_id)
     )
-    teams_inventories = teams_inventories_query.all()
+    teams_count = teams_query.count()
+    if teams_count != len(set(payload.teams_id)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign teams to inventory! Provide a valid team")
 
-    if set(payload.teams_id) == set(get_teams_ids_list_from_response(teams_inventories)):
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
-                            detail="Can't assign teams to inventory! Assign already exists!")
+    inventory_query = db.query(
+        inventory_model.Inventory
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == inventory_model.Inventory.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        inventory_model.Inventory.id == payload.inventory_id
+    )
+    inventory = inventory_query.first()
+    if not inventory:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign teams to inventory! Provide a valid inventory")
+
+    if not check_if_in_list_of_dict(current_user['organizations'], inventory.organization.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Not authorized to perform requested action")
 
-    for team_id in payload.teams_id:
-        if not check_if_teams_ids_in_list_of_response(teams_inventories, team_id):
-            team_inventory_payload = dict(
-                team_id=team_id,
-                inventory_id=payload.inventory_id
-            )
-            new_team_inventory = team_inventory_model.TeamInventory(
-                **team_inventory_payload)
-
-            db.add(new_team_inventory)
-            db.commit()
-            db.refresh(new_team_inventory)
-
-            if not new_team_inventory:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign teams to inventory! Something went wrong")
-            else:
-                users_teams_query = db.query(
-                    user_team_model.UserTeam
-                ).join(
-                    user_model.User, user_model.User.id == user_team_model.UserTeam.user_id
-                ).filter(
-                    user_model.User.tower_id == current_user["user"].tower.id,
-                    user_team_model.UserTeam.team_id == team_id
-                )
-                users_teams = users_teams_query.all()
-
-                users_inventories_query = db.query(
-                    user_inventory_model.UserInventory
-                ).join(
-                    user_model.User, user_model.User.id == user_inventory_model.UserInventory.user_id
-                ).filter(
-                    user_model.User.tower_id == current_user["user"].tower.id,
-                    user_inventory_model.UserInventory.user_id.in_(
-                        get_users_ids_list_from_response(users_teams)),
-                    user_inventory_model.UserInventory.inventory_id == payload.inventory_id
-                )
-                users_inventories = users_inventories_query.all()
-
-                for user_team in users_teams:
-                    if not check_if_users_ids_in_list_of_response(users_inventories, user_team.user_id):
-                        user_inventory_payload = dict(
-                            user_id=user_team.user.id,
-                            inventory_id=payload.inventory_id
-                        )
-                        new_user_inventory = user_inventory_model.UserInventory(
-                            **user_inventory_payload)
-
-                        db.add(new_user_inventory)
-                        db.commit()
-                        db.refresh(new_user_inventory)
-
-                        if not new_user_inventory:
-                            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                                detail="Can't assign users to inventory! Something went wrong")
+    (new_teams_ids, removed_teams_ids) = replace_assignments(
+        db,
+        team_inventory_model.TeamInventory.inventory_id,
+        payload.inventory_id,
+        team_inventory_model.TeamInventory.team_id,
+        payload.teams_id
+    )
 
-    return new_team_inventory
+    new_users_ids = insert_teams_users_assignments(
+        db,
+        user_inventory_model.UserInventory.inventory_id,
+        payload.inventory_id,
+        user_inventory_model.UserInventory.user_id,
+        new_teams_ids,
+        current_user["user"].tower.id
+    )
+
+    db.commit()
+
+    return db.query(
+        team_inventory_model.TeamInventory
+    ).options(
+        *get_loader_options(team_inventory_model.TeamInventory, team_inventory_schema.TeamInventoryResponse)
+    ).filter(
+        team_inventory_model.TeamInventory.inventory_id == payload.inventory_id
+    ).order_by(
+        team_inventory_model.TeamInventory.team_inventory_id
+    ).all()
 
 
 @router.get("/{id}/teams", response_model=List[team_inventory_schema.TeamsInventoryResponse])
-async def get_teams_inventory(
+def get_teams_inventory(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     teams_inventory_query = db.query(
         team_inventory_model.TeamInventory
+    ).options(
+        *get_loader_options(team_inventory_model.TeamInventory, team_inventory_schema.TeamsInventoryResponse)
     ).join(
         team_model.Team, team_model.Team.id == team_inventory_model.TeamInventory.team_id
     ).join(
@@ -205,25 +225,12 @@ async def get_teams_inventory(
         team_inventory_model.TeamInventory.inventory_id == id
     )
 
-    if skip:
-        teams_inventory_query = teams_inventory_query.offset(skip)
-
-    if limit:
-        teams_inventory_query = teams_inventory_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            teams_inventory_query = teams_inventory_query.order_by(desc(sort))
-        else:
-            teams_inventory_query = teams_inventory_query.order_by(sort)
-    else:
-        teams_inventory_query = teams_inventory_query.order_by(
-            team_inventory_model.TeamInventory.team_inventory_id)
-
-    if limit == 1:
-        teams_inventory = teams_inventory_query.first()
-    else:
-        teams_inventory = teams_inventory_query.all()
+    teams_inventory = paginate(
+        teams_inventory_query,
+        response,
+        team_inventory_model.TeamInventory.team_inventory_id,
+        pagination
+    )
 
     if not teams_inventory:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -233,7 +240,7 @@ async def get_teams_inventory(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_teams_inventories(
+def delete_teams_inventories(
     selected: List[int],
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
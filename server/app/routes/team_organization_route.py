@@ -1,12 +1,13 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.utils.check_value_exists import check_if_teams_ids_in_list_of_response, check_if_users_ids_in_list_of_response
-from app.utils.get_ids import get_teams_ids_list_from_response, get_users_ids_list_from_response
-from ..models import team_organization_model, organization_model, team_model, user_model, user_team_model, user_organization_model
-from ..schemas import common_schema, user_schema, team_organization_schema
+from typing import List
+from ..models import team_organization_model, organization_model, team_model, user_organization_model
+from ..schemas import user_schema, team_organization_schema
 from ..database.connection import get_db
+from ..database.replica import get_read_db
+from app.utils.assignments import insert_assignments, insert_teams_users_assignments, replace_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -16,46 +17,31 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[team_organization_schema.TeamOrganizationResponse])
-async def get_teams_organizations(
-    db: Session = Depends(get_db),
+def get_teams_organizations(
+    response: Response,
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     teams_organizations_query = db.query(
         team_organization_model.TeamOrganization
+    ).options(
+        *get_loader_options(team_organization_model.TeamOrganization, team_organization_schema.TeamOrganizationResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == team_organization_model.TeamOrganization.organization_id
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id
     )
 
-    if skip:
-        teams_organizations_query = teams_organizations_query.offset(skip)
-
-    if limit:
-        teams_organizations_query = teams_organizations_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            teams_organizations_query = teams_organizations_query.order_by(
-                desc(sort))
-        else:
-            teams_organizations_query = teams_organizations_query.order_by(
-                sort)
-    else:
-        teams_organizations_query = teams_organizations_query.order_by(
-            team_organization_model.TeamOrganization.team_organization_id)
-
-    if limit == 1:
-        teams_organizations = teams_organizations_query.first()
-    else:
-        teams_organizations = teams_organizations_query.all()
+    teams_organizations = paginate(
+        teams_organizations_query,
+        response,
+        team_organization_model.TeamOrganization.team_organization_id,
+        pagination
+    )
 
     if not teams_organizations:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -65,7 +51,7 @@ async def get_teams_organizations(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=team_organization_schema.TeamOrganizationResponse)
-async def create_teams_organizations(
+def create_teams_organizations(
     payload: team_organization_schema.TeamOrganizationPostRequest,
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -82,8 +68,8 @@ async def create_teams_organizations(
         team_model.Team.tower_id == current_user["user"].tower.id,
         team_model.Team.id.in_(payload.teams_id)
     )
-    teams = teams_query.all()
-    if not teams or len(teams) != len(payload.teams_id):
+    teams_count = teams_query.count()
+    if teams_count != len(set(payload.teams_id)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Can't assign teams to organization! Provide a valid team")
 
@@ -98,95 +84,124 @@ async def create_teams_organizations(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Can't assign teams to organization! Provide a valid organization")
 
-    teams_organizations_query = db.query(
+    new_teams_ids = insert_assignments(
+        db,
+        team_organization_model.TeamOrganization.organization_id,
+        payload.organization_id,
+        team_organization_model.TeamOrganization.team_id,
+        payload.teams_id
+    )
+    if not new_teams_ids:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Can't assign teams to organization! Assign already exists!")
+
+    new_users_ids = insert_teams_users_assignments(
+        db,
+        user_organization_model.UserOrganization.organization_id,
+        payload.organization_id,
+        user_organization_model.UserOrganization.user_id,
+        new_teams_ids,
+        current_user["user"].tower.id
+    )
+
+    db.commit()
+
+    oauth2.invalidate_principals(new_users_ids)
+
+    new_team_organization = db.query(
         team_organization_model.TeamOrganization
-    ).join(
-        organization_model.Organization, organization_model.Organization.id == team_organization_model.TeamOrganization.organization_id
+    ).filter(
+        team_organization_model.TeamOrganization.organization_id == payload.organization_id,
+        team_organization_model.TeamOrganization.team_id == new_teams_ids[-1]
+    ).first()
+    if not new_team_organization:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Can't assign teams to organization! Something went wrong")
+
+    return new_team_organization
+
+
+@router.put("", response_model=List[team_organization_schema.TeamOrganizationResponse])
+def replace_teams_organizations(
+    payload: team_organization_schema.TeamOrganizationPostRequest,
+    db: Session = Depends(get_db),
+    is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user)
+):
+    if payload.teams_id is None or not payload.organization_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Can't assign teams to organization! Provide a valid request")
+
+    teams_query = db.query(
+        team_model.Team
+    ).filter(
+        team_model.Team.tower_id == current_user["user"].tower.id,
+        team_model.Team.id.in_(payload.teams_id)
+    )
+    teams_count = teams_query.count()
+    if teams_count != len(set(payload.teams_id)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign teams to organization! Provide a valid team")
+
+    organization_query = db.query(
+        organization_model.Organization
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id,
-        team_organization_model.TeamOrganization.team_id.in_(payload.teams_id),
-        team_organization_model.TeamOrganization.organization_id == payload.organization_id
+        organization_model.Organization.id == payload.organization_id
+    )
+    organization = organization_query.first()
+    if not organization:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign teams to organization! Provide a valid organization")
+
+    (new_teams_ids, removed_teams_ids) = replace_assignments(
+        db,
+        team_organization_model.TeamOrganization.organization_id,
+        payload.organization_id,
+        team_organization_model.TeamOrganization.team_id,
+        payload.teams_id
     )
-    teams_organizations = teams_organizations_query.all()
 
-    if set(payload.teams_id) == set(get_teams_ids_list_from_response(teams_organizations)):
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
-                            detail="Can't assign teams to organization! Assign already exists!")
+    new_users_ids = insert_teams_users_assignments(
+        db,
+        user_organization_model.UserOrganization.organization_id,
+        payload.organization_id,
+        user_organization_model.UserOrganization.user_id,
+        new_teams_ids,
+        current_user["user"].tower.id
+    )
+
+    db.commit()
 
-    for team_id in payload.teams_id:
-        if not check_if_teams_ids_in_list_of_response(teams_organizations, team_id):
-            team_organization_payload = dict(
-                team_id=team_id,
-                organization_id=payload.organization_id
-            )
-            new_team_organization = team_organization_model.TeamOrganization(
-                **team_organization_payload)
-
-            db.add(new_team_organization)
-            db.commit()
-            db.refresh(new_team_organization)
-
-            if not new_team_organization:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign teams to organization! Something went wrong")
-            else:
-                users_teams_query = db.query(
-                    user_team_model.UserTeam
-                ).join(
-                    user_model.User, user_model.User.id == user_team_model.UserTeam.user_id
-                ).filter(
-                    user_model.User.tower_id == current_user["user"].tower.id,
-                    user_team_model.UserTeam.team_id == team_id
-                )
-                users_teams = users_teams_query.all()
-
-                users_organizations_query = db.query(
-                    user_organization_model.UserOrganization
-                ).join(
-                    user_model.User, user_model.User.id == user_organization_model.UserOrganization.user_id
-                ).filter(
-                    user_model.User.tower_id == current_user["user"].tower.id,
-                    user_organization_model.UserOrganization.user_id.in_(
-                        get_users_ids_list_from_response(users_teams)),
-                    user_organization_model.UserOrganization.organization_id == payload.organization_id
-                )
-                users_organizations = users_organizations_query.all()
-
-                for user_team in users_teams:
-                    if not check_if_users_ids_in_list_of_response(users_organizations, user_team.user_id):
-                        user_organization_payload = dict(
-                            user_id=user_team.user.id,
-                            organization_id=payload.organization_id
-                        )
-                        new_user_organization = user_organization_model.UserOrganization(
-                            **user_organization_payload)
-
-                        db.add(new_user_organization)
-                        db.commit()
-                        db.refresh(new_user_organization)
-
-                        if not new_user_organization:
-                            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                                detail="Can't assign users to organization! Something went wrong")
+    oauth2.invalidate_principals(new_users_ids)
 
-    return new_team_organization
+    return db.query(
+        team_organization_model.TeamOrganization
+    ).options(
+        *get_loader_options(team_organization_model.TeamOrganization, team_organization_schema.TeamOrganizationResponse)
+    ).filter(
+        team_organization_model.TeamOrganization.organization_id == payload.organization_id
+    ).order_by(
+        team_organization_model.TeamOrganization.team_organization_id
+    ).all()
 
 
 @router.get("/{id}/teams", response_model=List[team_organization_schema.TeamsOrganizationResponse])
-async def get_teams_organization(
+def get_teams_organization(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     teams_organization_query = db.query(
         team_organization_model.TeamOrganization
+    ).options(
+        *get_loader_options(team_organization_model.TeamOrganization, team_organization_schema.TeamsOrganizationResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == team_organization_model.TeamOrganization.organization_id
     ).filter(
@@ -194,26 +209,12 @@ async def get_teams_organization(
         team_organization_model.TeamOrganization.organization_id == id
     )
 
-    if skip:
-        teams_organization_query = teams_organization_query.offset(skip)
-
-    if limit:
-        teams_organization_query = teams_organization_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            teams_organization_query = teams_organization_query.order_by(
-                desc(sort))
-        else:
-            teams_organization_query = teams_organization_query.order_by(sort)
-    else:
-        teams_organization_query = teams_organization_query.order_by(
-            team_organization_model.TeamOrganization.team_organization_id)
-
-    if limit == 1:
-        teams_organization = teams_organization_query.first()
-    else:
-        teams_organization = teams_organization_query.all()
+    teams_organization = paginate(
+        teams_organization_query,
+        response,
+        team_organization_model.TeamOrganization.team_organization_id,
+        pagination
+    )
 
     if not teams_organization:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -223,7 +224,7 @@ async def get_teams_organization(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_teams_organizations(
+def delete_teams_organizations(
     selected: List[int],
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
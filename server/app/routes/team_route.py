@@ -1,11 +1,14 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from ..models import team_model, user_model, user_team_model
-from ..schemas import team_schema, user_schema, common_schema
+from ..models import team_model, user_team_model
+from ..schemas import team_schema, user_schema
+from app.utils.assignments import insert_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
-from ..database.connection import get_db
+from ..database.connection import get_db, transaction
+from ..database.replica import get_read_db
 
 router = APIRouter(
     prefix="/api/teams",
@@ -14,20 +17,20 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[team_schema.TeamResponse])
-async def get_teams(
-    db: Session = Depends(get_db),
+def get_teams(
+    response: Response,
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     teams_query = db.query(
         team_model.Team
+    ).options(
+        *get_loader_options(team_model.Team, team_schema.TeamResponse)
     ).filter(
         team_model.Team.tower_id == current_user["user"].tower.id
     )
@@ -37,24 +40,12 @@ async def get_teams(
             team_model.Team.name.contains(search_by_name)
         )
 
-    if skip:
-        teams_query = teams_query.offset(skip)
-
-    if limit:
-        teams_query = teams_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            teams_query = teams_query.order_by(desc(sort))
-        else:
-            teams_query = teams_query.order_by(sort)
-    else:
-        teams_query = teams_query.order_by(team_model.Team.id)
-
-    if limit == 1:
-        teams = teams_query.first()
-    else:
-        teams = teams_query.all()
+    teams = paginate(
+        teams_query,
+        response,
+        team_model.Team.id,
+        pagination
+    )
 
     if not teams:
         raise HTTPException(
@@ -64,20 +55,20 @@ async def get_teams(
 
 
 @router.get("/owner", response_model=List[team_schema.TeamResponse])
-async def get_my_teams(
-    db: Session = Depends(get_db),
+def get_my_teams(
+    response: Response,
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     teams_query = db.query(
         team_model.Team
+    ).options(
+        *get_loader_options(team_model.Team, team_schema.TeamResponse)
     ).filter(
         team_model.Team.tower_id == current_user["user"].tower.id,
         team_model.Team.created_by == current_user["user"].username
@@ -88,24 +79,12 @@ async def get_my_teams(
             team_model.Team.name.contains(search_by_name)
         )
 
-    if skip:
-        teams_query = teams_query.offset(skip)
-
-    if limit:
-        teams_query = teams_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            teams_query = teams_query.order_by(desc(sort))
-        else:
-            teams_query = teams_query.order_by(sort)
-    else:
-        teams_query = teams_query.order_by(team_model.Team.id)
-
-    if limit == 1:
-        teams = teams_query.first()
-    else:
-        teams = teams_query.all()
+    teams = paginate(
+        teams_query,
+        response,
+        team_model.Team.id,
+        pagination
+    )
 
     if not teams:
         raise HTTPException(
@@ -115,7 +94,7 @@ async def get_my_teams(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=team_schema.TeamResponse)
-async def create_team(
+def create_team(
     payload: team_schema.TeamRequest,
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -147,61 +126,34 @@ async def create_team(
 
     new_team = team_model.Team(**updated_payload)
 
-    db.add(new_team)
-    db.commit()
-    db.refresh(new_team)
-
-    if not new_team:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't create team! Something went wrong")
-    else:
-        if current_user["user"].user_type != user_schema.UserType.admin:
-            user_query = db.query(
-                user_model.User
-            ).filter(
-                user_model.User.tower_id == current_user["user"].tower.id,
-                user_model.User.user_type == user_schema.UserType.admin
-            )
-            user = user_query.first()
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Can't assign user to team! Provide a valid user")
-
-            admin_team_payload = dict(
-                user_id=user.id,
-                team_id=new_team.id
-            )
-            new_admin_team = user_team_model.UserTeam(**admin_team_payload)
-
-            db.add(new_admin_team)
-            db.commit()
-            db.refresh(new_admin_team)
-
-            if not new_admin_team:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign user to team! Something went wrong")
-
-        user_team_payload = dict(
-            user_id=current_user["user"].id,
-            team_id=new_team.id
+    owners_ids = oauth2.get_owners_ids(db, current_user["user"])
+    if not owners_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign user to team! Provide a valid user")
+
+    with transaction(db):
+        db.add(new_team)
+        db.flush()
+
+        insert_assignments(
+            db,
+            user_team_model.UserTeam.team_id,
+            new_team.id,
+            user_team_model.UserTeam.user_id,
+            owners_ids
         )
-        new_user_team = user_team_model.UserTeam(**user_team_payload)
 
-        db.add(new_user_team)
-        db.commit()
-        db.refresh(new_user_team)
+    db.refresh(new_team)
 
-        if not new_user_team:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Can't assign user to team! Something went wrong")
+    oauth2.invalidate_tower_principals(current_user["user"].tower.id)
 
     return new_team
 
 
 @router.get("/{id}", response_model=team_schema.TeamResponse)
-async def get_team(
+def get_team(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -209,6 +161,8 @@ async def get_team(
 ):
     team_query = db.query(
         team_model.Team
+    ).options(
+        *get_loader_options(team_model.Team, team_schema.TeamResponse)
     ).filter(
         team_model.Team.tower_id == current_user["user"].tower.id,
         team_model.Team.id == id
@@ -223,7 +177,7 @@ async def get_team(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_team(
+def delete_team(
     selected: List[int],
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -245,11 +199,13 @@ async def delete_team(
     team_query.delete(synchronize_session=False)
     db.commit()
 
+    oauth2.invalidate_tower_principals(current_user["user"].tower.id)
+
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.put("/{id}", response_model=team_schema.TeamResponse)
-async def update_team(
+def update_team(
     id: int,
     payload: team_schema.TeamRequest,
     db: Session = Depends(get_db),
@@ -289,4 +245,6 @@ async def update_team(
 
     updated_team = team_query.first()
 
+    oauth2.invalidate_tower_principals(current_user["user"].tower.id)
+
     return updated_team
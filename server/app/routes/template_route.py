@@ -1,12 +1,15 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from typing import Optional, List
-from ..models import template_model, organization_model, inventory_model, credential_model, project_model, user_model, user_template_model
-from ..schemas import template_schema, user_schema, common_schema
-from ..database.connection import get_db
+from ..models import template_model, organization_model, inventory_model, credential_model, project_model, user_template_model
+from ..schemas import template_schema, user_schema
+from ..database.connection import get_db, transaction
+from ..database.replica import get_read_db
 from app.utils.get_ids import get_ids_list
 from app.utils.check_value_exists import check_if_in_list_of_dict
+from app.utils.assignments import insert_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -16,18 +19,18 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[template_schema.TemplateResponse])
-async def get_templates(
-    db: Session = Depends(get_db),
+def get_templates(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     templates_query = db.query(
         template_model.Template
+    ).options(
+        *get_loader_options(template_model.Template, template_schema.TemplateResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == template_model.Template.organization_id
     ).filter(
@@ -41,24 +44,12 @@ async def get_templates(
             template_model.Template.name.contains(search_by_name)
         )
 
-    if skip:
-        templates_query = templates_query.offset(skip)
-
-    if limit:
-        templates_query = templates_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            templates_query = templates_query.order_by(desc(sort))
-        else:
-            templates_query = templates_query.order_by(sort)
-    else:
-        templates_query = templates_query.order_by(template_model.Template.id)
-
-    if limit == 1:
-        templates = templates_query.first()
-    else:
-        templates = templates_query.all()
+    templates = paginate(
+        templates_query,
+        response,
+        template_model.Template.id,
+        pagination
+    )
 
     if not templates:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -68,25 +59,23 @@ async def get_templates(
 
 
 @router.get("/owner", response_model=List[template_schema.TemplateResponse])
-async def get_my_templates(
-    db: Session = Depends(get_db),
+def get_my_templates(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_by_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     my_templates_query = db.query(
         template_model.Template
+    ).options(
+        *get_loader_options(template_model.Template, template_schema.TemplateResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == template_model.Template.organization_id
     ).filter(
         organization_model.Organization.tower_id == current_user["user"].tower.id,
         template_model.Template.created_by == current_user['user'].username
-    ).distinct(
-        template_model.Template.id
     )
 
     if search_by_name:
@@ -94,25 +83,12 @@ async def get_my_templates(
             template_model.Template.name.contains(search_by_name)
         )
 
-    if skip:
-        my_templates_query = my_templates_query.offset(skip)
-
-    if limit:
-        my_templates_query = my_templates_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            my_templates_query = my_templates_query.order_by(desc(sort))
-        else:
-            my_templates_query = my_templates_query.order_by(sort)
-    else:
-        my_templates_query = my_templates_query.order_by(
-            template_model.Template.id)
-
-    if limit == 1:
-        my_templates = my_templates_query.first()
-    else:
-        my_templates = my_templates_query.all()
+    my_templates = paginate(
+        my_templates_query,
+        response,
+        template_model.Template.id,
+        pagination
+    )
 
     if not my_templates:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -122,7 +98,7 @@ async def get_my_templates(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=template_schema.TemplateResponse)
-async def create_template(
+def create_template(
     payload: template_schema.TemplateRequest,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -208,68 +184,39 @@ async def create_template(
 
     new_template = template_model.Template(**updated_payload)
 
-    db.add(new_template)
-    db.commit()
-    db.refresh(new_template)
-
-    if not new_template:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't create template! Something went wrong")
-    else:
-        if current_user["user"].user_type != user_schema.UserType.admin:
-            user_query = db.query(
-                user_model.User
-            ).filter(
-                user_model.User.tower_id == current_user["user"].tower.id,
-                user_model.User.user_type == user_schema.UserType.admin
-            )
-            user = user_query.first()
-            if not user:
-                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
-                                    detail="Can't assign user to template! Provide a valid user")
-
-            admin_template_payload = dict(
-                user_id=user.id,
-                template_id=new_template.id
-            )
-            new_admin_template = user_template_model.UserTemplate(
-                **admin_template_payload)
-
-            db.add(new_admin_template)
-            db.commit()
-            db.refresh(new_admin_template)
-
-            if not new_admin_template:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign user to template! Something went wrong")
-
-        user_template_payload = dict(
-            user_id=current_user["user"].id,
-            template_id=new_template.id
+    owners_ids = oauth2.get_owners_ids(db, current_user["user"])
+    if not owners_ids:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign user to template! Provide a valid user")
+
+    with transaction(db):
+        db.add(new_template)
+        db.flush()
+
+        insert_assignments(
+            db,
+            user_template_model.UserTemplate.template_id,
+            new_template.id,
+            user_template_model.UserTemplate.user_id,
+            owners_ids
         )
-        new_user_template = user_template_model.UserTemplate(
-            **user_template_payload)
-
-        db.add(new_user_template)
-        db.commit()
-        db.refresh(new_user_template)
 
-        if not new_user_template:
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                detail="Can't assign user to template! Something went wrong")
+    db.refresh(new_template)
 
     return new_template
 
 
 @router.get("/{id}", response_model=template_schema.TemplateResponse)
-async def get_template(
+def get_template(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
     template_query = db.query(
         template_model.Template
+    ).options(
+        *get_loader_options(template_model.Template, template_schema.TemplateResponse)
     ).join(
         organization_model.Organization, organization_model.Organization.id == template_model.Template.organization_id
     ).filter(
@@ -289,7 +236,7 @@ async def get_template(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_template(
+def delete_template(
     selected: List[int],
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -318,7 +265,7 @@ async def delete_template(
 
 
 @router.put("/{id}", response_model=template_schema.TemplateResponse)
-async def update_template(
+def update_template(
     id: int,
     payload: template_schema.TemplateRequest,
     db: Session = Depends(get_db),
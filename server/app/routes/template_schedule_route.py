@@ -1,15 +1,16 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from fastapi.security.oauth2 import OAuth2PasswordBearer
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from uuid import uuid4
-from typing import List, Optional
+from typing import List
 from ..models import template_schedule_model, template_model, organization_model, schedule_model
 from ..schemas import common_schema, user_schema, template_schedule_schema
 from ..database.connection import get_db
-from app.services.tower.schedule_service import add_crontab_schedule_template, check_job_id, get_job_schedule_info, remove_job_schedules
-from app.utils.check_value_exists import check_if_schedules_ids_in_list_of_response, check_if_in_list_of_dict
+from ..database.replica import get_read_db
+from app.services.tower.schedule_service import get_job_schedule_info, get_schedule_next_run_at
+from app.utils.check_value_exists import check_if_in_list_of_dict
 from app.utils.get_ids import get_schedules_ids_list_from_response, get_ids_list
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -17,21 +18,18 @@ router = APIRouter(
     tags=['Templates | Schedules assigns']
 )
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl='api/login')
-
-
 @router.get("", response_model=List[template_schedule_schema.TemplateScheduleResponse])
-async def get_templates_schedules(
-    db: Session = Depends(get_db),
+def get_templates_schedules(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     templates_schedules_query = db.query(
         template_schedule_model.TemplateSchedule
+    ).options(
+        *get_loader_options(template_schedule_model.TemplateSchedule, template_schedule_schema.TemplateScheduleResponse)
     ).join(
         schedule_model.Schedule, schedule_model.Schedule.id == template_schedule_model.TemplateSchedule.schedule_id
     ).join(
@@ -42,27 +40,12 @@ async def get_templates_schedules(
             get_ids_list(current_user['organizations']))
     )
 
-    if skip:
-        templates_schedules_query = templates_schedules_query.offset(skip)
-
-    if limit:
-        templates_schedules_query = templates_schedules_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            templates_schedules_query = templates_schedules_query.order_by(
-                desc(sort))
-        else:
-            templates_schedules_query = templates_schedules_query.order_by(
-                sort)
-    else:
-        templates_schedules_query = templates_schedules_query.order_by(
-            template_schedule_model.TemplateSchedule.template_schedule_id)
-
-    if limit == 1:
-        templates_schedules = templates_schedules_query.first()
-    else:
-        templates_schedules = templates_schedules_query.all()
+    templates_schedules = paginate(
+        templates_schedules_query,
+        response,
+        template_schedule_model.TemplateSchedule.template_schedule_id,
+        pagination
+    )
 
     if not templates_schedules:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -72,10 +55,9 @@ async def get_templates_schedules(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=List[template_schedule_schema.TemplateSchedulesResponse])
-async def create_templates_schedules(
+def create_templates_schedules(
     payload: template_schedule_schema.TemplateSchedulePostRequest,
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
@@ -83,12 +65,6 @@ async def create_templates_schedules(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
                             detail="Can't assign schedules to template! Provide a valid request")
 
-    if not token:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED,
-                            detail="Could not get credential token", headers={"WWW-Authenticate": "Bearer"})
-
-    response: list = []
-
     schedules_query = db.query(
         schedule_model.Schedule
     ).join(
@@ -137,64 +113,62 @@ async def create_templates_schedules(
     )
     templates_schedules = templates_schedules_query.all()
 
-    if set(payload.schedules_id) == set(get_schedules_ids_list_from_response(templates_schedules)):
+    assigned_schedules_ids = set(
+        get_schedules_ids_list_from_response(templates_schedules))
+
+    if set(payload.schedules_id) == assigned_schedules_ids:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                             detail="Can't assign schedules to template! Assign already exists!")
 
-    for schedule in schedules:
-        if not check_if_schedules_ids_in_list_of_response(templates_schedules, schedule.id):
-            cron_job_id: str = str(uuid4())
-            while check_job_id(cron_job_id):
-                cron_job_id = str(uuid4())
-
-            added_schedule = add_crontab_schedule_template(
-                token,
-                schedule.start_date_time,
-                schedule.repeat_frequency,
-                schedule.every if schedule.every else None,
-                schedule.week_days if schedule.week_days else None,
-                cron_job_id,
-                template.id,
-                template.organization.id
-            )
-            if not added_schedule:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't add schedule to service! Something went wrong")
+    new_schedules_ids: List[int] = []
 
+    for schedule in schedules:
+        if schedule.id not in assigned_schedules_ids:
             template_schedule_payload = dict(
                 schedule_id=schedule.id,
                 template_id=payload.template_id,
-                cron_job_id=cron_job_id
+                cron_job_id=str(uuid4()),
+                next_run_at=get_schedule_next_run_at(schedule)
             )
             new_template_schedule = template_schedule_model.TemplateSchedule(
                 **template_schedule_payload)
 
             db.add(new_template_schedule)
-            db.commit()
-            db.refresh(new_template_schedule)
+            new_schedules_ids.append(schedule.id)
 
-            if not new_template_schedule:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign schedules to template! Something went wrong")
+    db.commit()
 
-            response.append(new_template_schedule)
+    response = db.query(
+        template_schedule_model.TemplateSchedule
+    ).options(
+        *get_loader_options(template_schedule_model.TemplateSchedule, template_schedule_schema.TemplateSchedulesResponse)
+    ).filter(
+        template_schedule_model.TemplateSchedule.template_id == payload.template_id,
+        template_schedule_model.TemplateSchedule.schedule_id.in_(new_schedules_ids)
+    ).order_by(
+        template_schedule_model.TemplateSchedule.template_schedule_id
+    ).all()
+
+    if len(response) != len(new_schedules_ids):
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Can't assign schedules to template! Something went wrong")
 
     return response
 
 
 @router.get("/{id}/templates", response_model=List[template_schedule_schema.TemplatesScheduleResponse])
-async def get_templates_schedule(
+def get_templates_schedule(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     templates_schedule_query = db.query(
         template_schedule_model.TemplateSchedule
+    ).options(
+        *get_loader_options(template_schedule_model.TemplateSchedule, template_schedule_schema.TemplatesScheduleResponse)
     ).join(
         schedule_model.Schedule, schedule_model.Schedule.id == template_schedule_model.TemplateSchedule.schedule_id
     ).join(
@@ -206,26 +180,12 @@ async def get_templates_schedule(
         template_schedule_model.TemplateSchedule.schedule_id == id
     )
 
-    if skip:
-        templates_schedule_query = templates_schedule_query.offset(skip)
-
-    if limit:
-        templates_schedule_query = templates_schedule_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            templates_schedule_query = templates_schedule_query.order_by(
-                desc(sort))
-        else:
-            templates_schedule_query = templates_schedule_query.order_by(sort)
-    else:
-        templates_schedule_query = templates_schedule_query.order_by(
-            template_schedule_model.TemplateSchedule.template_schedule_id)
-
-    if limit == 1:
-        templates_schedule = templates_schedule_query.first()
-    else:
-        templates_schedule = templates_schedule_query.all()
+    templates_schedule = paginate(
+        templates_schedule_query,
+        response,
+        template_schedule_model.TemplateSchedule.template_schedule_id,
+        pagination
+    )
 
     if not templates_schedule:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -235,18 +195,18 @@ async def get_templates_schedule(
 
 
 @router.get("/{id}/schedules", response_model=List[template_schedule_schema.TemplateSchedulesResponse])
-async def get_template_schedules(
+def get_template_schedules(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     template_schedules_query = db.query(
         template_schedule_model.TemplateSchedule
+    ).options(
+        *get_loader_options(template_schedule_model.TemplateSchedule, template_schedule_schema.TemplateSchedulesResponse)
     ).join(
         template_model.Template, template_model.Template.id == template_schedule_model.TemplateSchedule.template_id
     ).join(
@@ -258,26 +218,12 @@ async def get_template_schedules(
         template_schedule_model.TemplateSchedule.template_id == id
     )
 
-    if skip:
-        template_schedules_query = template_schedules_query.offset(skip)
-
-    if limit:
-        template_schedules_query = template_schedules_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            template_schedules_query = template_schedules_query.order_by(
-                desc(sort))
-        else:
-            template_schedules_query = template_schedules_query.order_by(sort)
-    else:
-        template_schedules_query = template_schedules_query.order_by(
-            template_schedule_model.TemplateSchedule.template_schedule_id)
-
-    if limit == 1:
-        template_schedules = template_schedules_query.first()
-    else:
-        template_schedules = template_schedules_query.all()
+    template_schedules = paginate(
+        template_schedules_query,
+        response,
+        template_schedule_model.TemplateSchedule.template_schedule_id,
+        pagination
+    )
 
     if not template_schedules:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -287,9 +233,9 @@ async def get_template_schedules(
 
 
 @router.get("/{id}/schedules/info", response_model=List[common_schema.JobsScheduleInfoBase])
-async def get_template_schedules_info(
+def get_template_schedules_info(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
@@ -321,7 +267,7 @@ async def get_template_schedules_info(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_templates_schedules(
+def delete_templates_schedules(
     selected: List[int],
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -344,11 +290,6 @@ async def delete_templates_schedules(
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                                 detail="Not authorized to perform requested action")
 
-    schedules_deleted = remove_job_schedules(templates_schedules)
-    if not schedules_deleted:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                            detail="Can't delete schedule in service! Something went wrong")
-
     templates_schedules_query.delete(synchronize_session=False)
     db.commit()
 
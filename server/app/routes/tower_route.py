@@ -4,6 +4,7 @@ from app.services.tower.tower_service import update_company_name
 from ..schemas import user_schema, tower_schema
 from ..models import tower_model
 from ..database.connection import get_db
+from ..database.replica import get_read_db
 from ..auth import oauth2
 
 router = APIRouter(
@@ -13,8 +14,8 @@ router = APIRouter(
 
 
 @router.get("/owner", response_model=tower_schema.TowerResponse)
-async def get_my_tower(
-    db: Session = Depends(get_db),
+def get_my_tower(
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -35,7 +36,7 @@ async def get_my_tower(
 
 
 @router.put("/owner", response_model=tower_schema.TowerResponse)
-async def update_tower(
+def update_tower(
     payload: tower_schema.TowerBase,
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -75,7 +76,8 @@ async def update_tower(
             my_tower.port,
             my_tower.username,
             my_tower.password,
-            10
+            10,
+            tower_id=my_tower.id
         )
         if not updated_company_name:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -95,4 +97,6 @@ async def update_tower(
 
     updated_tower = tower_query.first()
 
+    oauth2.invalidate_tower_principals(current_user["user"].tower.id)
+
     return updated_tower
@@ -1,12 +1,15 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List
 from ..models import user_credential_model, user_model, credential_model, organization_model
-from ..schemas import common_schema, user_schema, user_credential_schema, credential_schema
+from ..schemas import user_schema, user_credential_schema, credential_schema
 from ..database.connection import get_db
-from app.utils.check_value_exists import check_if_in_list_of_dict, check_if_users_ids_in_list_of_response
-from app.utils.get_ids import get_ids_list, get_users_ids_list_from_response
+from ..database.replica import get_read_db
+from app.utils.check_value_exists import check_if_in_list_of_dict
+from app.utils.get_ids import get_ids_list
+from app.utils.assignments import insert_assignments, replace_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -16,17 +19,17 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[user_credential_schema.UserCredentialResponse])
-async def get_users_credentials(
-    db: Session = Depends(get_db),
+def get_users_credentials(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     users_credentials_query = db.query(
         user_credential_model.UserCredential
+    ).options(
+        *get_loader_options(user_credential_model.UserCredential, user_credential_schema.UserCredentialResponse)
     ).join(
         user_model.User, user_model.User.id == user_credential_model.UserCredential.user_id
     ).join(
@@ -37,26 +40,12 @@ async def get_users_credentials(
             get_ids_list(current_user['organizations']))
     )
 
-    if skip:
-        users_credentials_query = users_credentials_query.offset(skip)
-
-    if limit:
-        users_credentials_query = users_credentials_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            users_credentials_query = users_credentials_query.order_by(
-                desc(sort))
-        else:
-            users_credentials_query = users_credentials_query.order_by(sort)
-    else:
-        users_credentials_query = users_credentials_query.order_by(
-            user_credential_model.UserCredential.user_credential_id)
-
-    if limit == 1:
-        users_credentials = users_credentials_query.first()
-    else:
-        users_credentials = users_credentials_query.all()
+    users_credentials = paginate(
+        users_credentials_query,
+        response,
+        user_credential_model.UserCredential.user_credential_id,
+        pagination
+    )
 
     if not users_credentials:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -66,7 +55,7 @@ async def get_users_credentials(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=user_credential_schema.UserCredentialResponse)
-async def create_users_credentials(
+def create_users_credentials(
     payload: user_credential_schema.UserCredentialPostRequest,
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -83,8 +72,8 @@ async def create_users_credentials(
         user_model.User.tower_id == current_user["user"].tower.id,
         user_model.User.id.in_(payload.users_id)
     )
-    users = users_query.all()
-    if not users or len(users) != len(payload.users_id):
+    users_count = users_query.count()
+    if users_count != len(set(payload.users_id)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Can't assign users to credential! Provide a valid user")
 
@@ -115,7 +104,8 @@ async def create_users_credentials(
         ).filter(
             user_model.User.tower_id == current_user["user"].tower.id,
             user_credential_model.UserCredential.user_id.in_(payload.users_id),
-            credential_model.Credential.credential_type == credential_schema.CredentialType.source_control
+            credential_model.Credential.credential_type == credential_schema.CredentialType.source_control,
+            credential_model.Credential.id != payload.credential_id
         )
         source_users_credentials = source_users_credentials_query.all()
 
@@ -123,54 +113,125 @@ async def create_users_credentials(
             raise HTTPException(status_code=status.HTTP_409_CONFLICT,
                                 detail="Can't assign users to credential! Some users already have source control credential type!")
 
-    users_credentials_query = db.query(
+    new_users_ids = insert_assignments(
+        db,
+        user_credential_model.UserCredential.credential_id,
+        payload.credential_id,
+        user_credential_model.UserCredential.user_id,
+        payload.users_id
+    )
+    if not new_users_ids:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Can't assign users to credential! Assign already exists!")
+
+    db.commit()
+
+    new_user_credential = db.query(
         user_credential_model.UserCredential
-    ).join(
-        user_model.User, user_model.User.id == user_credential_model.UserCredential.user_id
+    ).filter(
+        user_credential_model.UserCredential.credential_id == payload.credential_id,
+        user_credential_model.UserCredential.user_id == new_users_ids[-1]
+    ).first()
+    if not new_user_credential:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Can't assign users to credential! Something went wrong")
+
+    return new_user_credential
+
+
+@router.put("", response_model=List[user_credential_schema.UserCredentialResponse])
+def replace_users_credentials(
+    payload: user_credential_schema.UserCredentialPostRequest,
+    db: Session = Depends(get_db),
+    is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user)
+):
+    if payload.users_id is None or not payload.credential_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Can't assign users to credential! Provide a valid request")
+
+    users_query = db.query(
+        user_model.User
     ).filter(
         user_model.User.tower_id == current_user["user"].tower.id,
-        user_credential_model.UserCredential.user_id.in_(payload.users_id),
-        user_credential_model.UserCredential.credential_id == payload.credential_id
+        user_model.User.id.in_(payload.users_id)
     )
-    users_credentials = users_credentials_query.all()
+    users_count = users_query.count()
+    if users_count != len(set(payload.users_id)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign users to credential! Provide a valid user")
 
-    if set(payload.users_id) == set(get_users_ids_list_from_response(users_credentials)):
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
-                            detail="Can't assign users to credential! Assign already exists!")
+    credential_query = db.query(
+        credential_model.Credential
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == credential_model.Credential.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        credential_model.Credential.id == payload.credential_id
+    )
+    credential = credential_query.first()
+    if not credential:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign users to credential! Provide a valid credential")
 
-    for user_id in payload.users_id:
-        if not check_if_users_ids_in_list_of_response(users_credentials, user_id):
-            user_credential_payload = dict(
-                user_id=user_id,
-                credential_id=payload.credential_id
-            )
-            new_user_credential = user_credential_model.UserCredential(
-                **user_credential_payload)
+    if not check_if_in_list_of_dict(current_user['organizations'], credential.organization.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Not authorized to perform requested action")
 
-            db.add(new_user_credential)
-            db.commit()
-            db.refresh(new_user_credential)
+    if credential.credential_type == credential_schema.CredentialType.source_control:
+        source_users_credentials_query = db.query(
+            user_credential_model.UserCredential
+        ).join(
+            user_model.User, user_model.User.id == user_credential_model.UserCredential.user_id
+        ).join(
+            credential_model.Credential, credential_model.Credential.id == user_credential_model.UserCredential.credential_id
+        ).filter(
+            user_model.User.tower_id == current_user["user"].tower.id,
+            user_credential_model.UserCredential.user_id.in_(payload.users_id),
+            credential_model.Credential.credential_type == credential_schema.CredentialType.source_control,
+            credential_model.Credential.id != payload.credential_id
+        )
+        source_users_credentials = source_users_credentials_query.all()
 
-            if not new_user_credential:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign users to credential! Something went wrong")
+        if source_users_credentials:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                                detail="Can't assign users to credential! Some users already have source control credential type!")
 
-    return new_user_credential
+    (new_users_ids, removed_users_ids) = replace_assignments(
+        db,
+        user_credential_model.UserCredential.credential_id,
+        payload.credential_id,
+        user_credential_model.UserCredential.user_id,
+        payload.users_id
+    )
+
+    db.commit()
+
+    return db.query(
+        user_credential_model.UserCredential
+    ).options(
+        *get_loader_options(user_credential_model.UserCredential, user_credential_schema.UserCredentialResponse)
+    ).filter(
+        user_credential_model.UserCredential.credential_id == payload.credential_id
+    ).order_by(
+        user_credential_model.UserCredential.user_credential_id
+    ).all()
 
 
 @router.get("/{id}/users", response_model=List[user_credential_schema.UsersCredentialResponse])
-async def get_users_credential(
+def get_users_credential(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     users_credential_query = db.query(
         user_credential_model.UserCredential
+    ).options(
+        *get_loader_options(user_credential_model.UserCredential, user_credential_schema.UsersCredentialResponse)
     ).join(
         user_model.User, user_model.User.id == user_credential_model.UserCredential.user_id
     ).join(
@@ -182,26 +243,12 @@ async def get_users_credential(
         user_credential_model.UserCredential.credential_id == id
     )
 
-    if skip:
-        users_credential_query = users_credential_query.offset(skip)
-
-    if limit:
-        users_credential_query = users_credential_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            users_credential_query = users_credential_query.order_by(
-                desc(sort))
-        else:
-            users_credential_query = users_credential_query.order_by(sort)
-    else:
-        users_credential_query = users_credential_query.order_by(
-            user_credential_model.UserCredential.user_credential_id)
-
-    if limit == 1:
-        users_credential = users_credential_query.first()
-    else:
-        users_credential = users_credential_query.all()
+    users_credential = paginate(
+        users_credential_query,
+        response,
+        user_credential_model.UserCredential.user_credential_id,
+        pagination
+    )
 
     if not users_credential:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -211,20 +258,20 @@ async def get_users_credential(
 
 
 @router.get("/{id}/credentials", response_model=List[credential_schema.CredentialResponse])
-async def get_user_credentials(
+def get_user_credentials(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     my_credentials: list = []
 
     user_credentials_query = db.query(
         user_credential_model.UserCredential
+    ).options(
+        *get_loader_options(user_credential_model.UserCredential, credential_schema.CredentialResponse, "credential")
     ).join(
         user_model.User, user_model.User.id == user_credential_model.UserCredential.user_id
     ).join(
@@ -236,26 +283,12 @@ async def get_user_credentials(
         user_credential_model.UserCredential.user_id == id
     )
 
-    if skip:
-        user_credentials_query = user_credentials_query.offset(skip)
-
-    if limit:
-        user_credentials_query = user_credentials_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            user_credentials_query = user_credentials_query.order_by(
-                desc(sort))
-        else:
-            user_credentials_query = user_credentials_query.order_by(sort)
-    else:
-        user_credentials_query = user_credentials_query.order_by(
-            user_credential_model.UserCredential.user_credential_id)
-
-    if limit == 1:
-        user_credentials = user_credentials_query.first()
-    else:
-        user_credentials = user_credentials_query.all()
+    user_credentials = paginate(
+        user_credentials_query,
+        response,
+        user_credential_model.UserCredential.user_credential_id,
+        pagination
+    )
 
     if not user_credentials:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -268,7 +301,7 @@ async def get_user_credentials(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_users_credentials(
+def delete_users_credentials(
     selected: List[int],
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
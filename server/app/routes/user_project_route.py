@@ -1,12 +1,15 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List
 from ..models import user_project_model, user_model, project_model, organization_model
-from ..schemas import common_schema, user_schema, user_project_schema, project_schema
+from ..schemas import user_schema, user_project_schema, project_schema
 from ..database.connection import get_db
-from app.utils.check_value_exists import check_if_in_list_of_dict, check_if_users_ids_in_list_of_response
-from app.utils.get_ids import get_ids_list, get_users_ids_list_from_response
+from ..database.replica import get_read_db
+from app.utils.check_value_exists import check_if_in_list_of_dict
+from app.utils.get_ids import get_ids_list
+from app.utils.assignments import insert_assignments, replace_assignments
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 
 router = APIRouter(
@@ -16,17 +19,17 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[user_project_schema.UserProjectResponse])
-async def get_users_projects(
-    db: Session = Depends(get_db),
+def get_users_projects(
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     users_projects_query = db.query(
         user_project_model.UserProject
+    ).options(
+        *get_loader_options(user_project_model.UserProject, user_project_schema.UserProjectResponse)
     ).join(
         user_model.User, user_model.User.id == user_project_model.UserProject.user_id
     ).join(
@@ -37,25 +40,12 @@ async def get_users_projects(
             get_ids_list(current_user['organizations']))
     )
 
-    if skip:
-        users_projects_query = users_projects_query.offset(skip)
-
-    if limit:
-        users_projects_query = users_projects_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            users_projects_query = users_projects_query.order_by(desc(sort))
-        else:
-            users_projects_query = users_projects_query.order_by(sort)
-    else:
-        users_projects_query = users_projects_query.order_by(
-            user_project_model.UserProject.user_project_id)
-
-    if limit == 1:
-        users_projects = users_projects_query.first()
-    else:
-        users_projects = users_projects_query.all()
+    users_projects = paginate(
+        users_projects_query,
+        response,
+        user_project_model.UserProject.user_project_id,
+        pagination
+    )
 
     if not users_projects:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -65,7 +55,7 @@ async def get_users_projects(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=user_project_schema.UserProjectResponse)
-async def create_users_projects(
+def create_users_projects(
     payload: user_project_schema.UserProjectPostRequest,
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -82,8 +72,8 @@ async def create_users_projects(
         user_model.User.tower_id == current_user["user"].tower.id,
         user_model.User.id.in_(payload.users_id)
     )
-    users = users_query.all()
-    if not users or len(users) != len(payload.users_id):
+    users_count = users_query.count()
+    if users_count != len(set(payload.users_id)):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
                             detail="Can't assign users to project! Provide a valid user")
 
@@ -104,54 +94,106 @@ async def create_users_projects(
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
                             detail="Not authorized to perform requested action")
 
-    users_projects_query = db.query(
+    new_users_ids = insert_assignments(
+        db,
+        user_project_model.UserProject.project_id,
+        payload.project_id,
+        user_project_model.UserProject.user_id,
+        payload.users_id
+    )
+    if not new_users_ids:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="Can't assign users to project! Assign already exists!")
+
+    db.commit()
+
+    new_user_project = db.query(
         user_project_model.UserProject
-    ).join(
-        user_model.User, user_model.User.id == user_project_model.UserProject.user_id
+    ).filter(
+        user_project_model.UserProject.project_id == payload.project_id,
+        user_project_model.UserProject.user_id == new_users_ids[-1]
+    ).first()
+    if not new_user_project:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                            detail="Can't assign users to project! Something went wrong")
+
+    return new_user_project
+
+
+@router.put("", response_model=List[user_project_schema.UserProjectResponse])
+def replace_users_projects(
+    payload: user_project_schema.UserProjectPostRequest,
+    db: Session = Depends(get_db),
+    is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
+    current_user: user_schema.CurrentUserResponse = Depends(
+        oauth2.get_current_user)
+):
+    if payload.users_id is None or not payload.project_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="Can't assign users to project! Provide a valid request")
+
+    users_query = db.query(
+        user_model.User
     ).filter(
         user_model.User.tower_id == current_user["user"].tower.id,
-        user_project_model.UserProject.user_id.in_(payload.users_id),
-        user_project_model.UserProject.project_id == payload.project_id
+        user_model.User.id.in_(payload.users_id)
     )
-    users_projects = users_projects_query.all()
+    users_count = users_query.count()
+    if users_count != len(set(payload.users_id)):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign users to project! Provide a valid user")
 
-    if set(payload.users_id) == set(get_users_ids_list_from_response(users_projects)):
-        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
-                            detail="Can't assign users to project! Assign already exists!")
+    project_query = db.query(
+        project_model.Project
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == project_model.Project.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == current_user["user"].tower.id,
+        project_model.Project.id == payload.project_id
+    )
+    project = project_query.first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Can't assign users to project! Provide a valid project")
 
-    for user_id in payload.users_id:
-        if not check_if_users_ids_in_list_of_response(users_projects, user_id):
-            user_project_payload = dict(
-                user_id=user_id,
-                project_id=payload.project_id
-            )
-            new_user_project = user_project_model.UserProject(
-                **user_project_payload)
+    if not check_if_in_list_of_dict(current_user['organizations'], project.organization.id):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN,
+                            detail="Not authorized to perform requested action")
 
-            db.add(new_user_project)
-            db.commit()
-            db.refresh(new_user_project)
+    (new_users_ids, removed_users_ids) = replace_assignments(
+        db,
+        user_project_model.UserProject.project_id,
+        payload.project_id,
+        user_project_model.UserProject.user_id,
+        payload.users_id
+    )
 
-            if not new_user_project:
-                raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                                    detail="Can't assign users to project! Something went wrong")
+    db.commit()
 
-    return new_user_project
+    return db.query(
+        user_project_model.UserProject
+    ).options(
+        *get_loader_options(user_project_model.UserProject, user_project_schema.UserProjectResponse)
+    ).filter(
+        user_project_model.UserProject.project_id == payload.project_id
+    ).order_by(
+        user_project_model.UserProject.user_project_id
+    ).all()
 
 
 @router.get("/{id}/users", response_model=List[user_project_schema.UsersProjectResponse])
-async def get_users_project(
+def get_users_project(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     users_project_query = db.query(
         user_project_model.UserProject
+    ).options(
+        *get_loader_options(user_project_model.UserProject, user_project_schema.UsersProjectResponse)
     ).join(
         user_model.User, user_model.User.id == user_project_model.UserProject.user_id
     ).join(
@@ -163,25 +205,12 @@ async def get_users_project(
         user_project_model.UserProject.project_id == id
     )
 
-    if skip:
-        users_project_query = users_project_query.offset(skip)
-
-    if limit:
-        users_project_query = users_project_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            users_project_query = users_project_query.order_by(desc(sort))
-        else:
-            users_project_query = users_project_query.order_by(sort)
-    else:
-        users_project_query = users_project_query.order_by(
-            user_project_model.UserProject.user_project_id)
-
-    if limit == 1:
-        users_project = users_project_query.first()
-    else:
-        users_project = users_project_query.all()
+    users_project = paginate(
+        users_project_query,
+        response,
+        user_project_model.UserProject.user_project_id,
+        pagination
+    )
 
     if not users_project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -191,20 +220,20 @@ async def get_users_project(
 
 
 @router.get("/{id}/projects", response_model=List[project_schema.ProjectResponse])
-async def get_user_projects(
+def get_user_projects(
     id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     my_projects: list = []
 
     user_projects_query = db.query(
         user_project_model.UserProject
+    ).options(
+        *get_loader_options(user_project_model.UserProject, project_schema.ProjectResponse, "project")
     ).join(
         user_model.User, user_model.User.id == user_project_model.UserProject.user_id
     ).join(
@@ -216,25 +245,12 @@ async def get_user_projects(
         user_project_model.UserProject.user_id == id
     )
 
-    if skip:
-        user_projects_query = user_projects_query.offset(skip)
-
-    if limit:
-        user_projects_query = user_projects_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            user_projects_query = user_projects_query.order_by(desc(sort))
-        else:
-            user_projects_query = user_projects_query.order_by(sort)
-    else:
-        user_projects_query = user_projects_query.order_by(
-            user_project_model.UserProject.user_project_id)
-
-    if limit == 1:
-        user_projects = user_projects_query.first()
-    else:
-        user_projects = user_projects_query.all()
+    user_projects = paginate(
+        user_projects_query,
+        response,
+        user_project_model.UserProject.user_project_id,
+        pagination
+    )
 
     if not user_projects:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND,
@@ -247,7 +263,7 @@ async def get_user_projects(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_users_projects(
+def delete_users_projects(
     selected: List[int],
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -1,10 +1,12 @@
 from fastapi import Response, status, HTTPException, Depends, APIRouter
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from ..models import user_model
-from ..schemas import user_schema, common_schema
+from ..schemas import user_schema
 from ..database.connection import get_db
+from ..database.replica import get_read_db
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
 from ..auth import oauth2
 from ..utils import auth
 
@@ -15,21 +17,21 @@ router = APIRouter(
 
 
 @router.get("", response_model=List[user_schema.UserResponse])
-async def get_users(
-    db: Session = Depends(get_db),
+def get_users(
+    response: Response,
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user),
-    limit: Optional[int] = None,
-    skip: Optional[int] = 0,
     search_first_name: Optional[str] = "",
     search_last_name: Optional[str] = "",
-    sort: Optional[str] = None,
-    sort_dir: Optional[common_schema.SortDir] = None
+    pagination: PaginationParams = Depends()
 ):
     users_query = db.query(
         user_model.User
+    ).options(
+        *get_loader_options(user_model.User, user_schema.UserResponse)
     ).filter(
         user_model.User.tower_id == current_user["user"].tower.id
     )
@@ -44,24 +46,12 @@ async def get_users(
             user_model.User.last_name.contains(search_last_name)
         )
 
-    if skip:
-        users_query = users_query.offset(skip)
-
-    if limit:
-        users_query = users_query.limit(limit)
-
-    if sort:
-        if sort_dir == common_schema.SortDir.desc:
-            users_query = users_query.order_by(desc(sort))
-        else:
-            users_query = users_query.order_by(sort)
-    else:
-        users_query = users_query.order_by(user_model.User.id)
-
-    if limit == 1:
-        users = users_query.first()
-    else:
-        users = users_query.all()
+    users = paginate(
+        users_query,
+        response,
+        user_model.User.id,
+        pagination
+    )
 
     if not users:
         raise HTTPException(
@@ -71,8 +61,8 @@ async def get_users(
 
 
 @router.get("/current", response_model=user_schema.UserResponse)
-async def get_current_user(
-    db: Session = Depends(get_db),
+def get_current_user(
+    db: Session = Depends(get_read_db),
     current_user: user_schema.CurrentUserResponse = Depends(
         oauth2.get_current_user)
 ):
@@ -84,7 +74,7 @@ async def get_current_user(
 
 
 @router.post("", status_code=status.HTTP_201_CREATED, response_model=user_schema.UserResponse)
-async def create_user(
+def create_user(
     payload: user_schema.UserRequest,
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -137,13 +127,15 @@ async def create_user(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                             detail="Can't create user! Something went wrong")
 
+    oauth2.invalidate_tower_admin(current_user["user"].tower.id)
+
     return new_user
 
 
 @router.get("/{id}", response_model=user_schema.UserResponse)
-async def get_user(
+def get_user(
     id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     is_at_least_auditor: bool = Depends(
         oauth2.check_if_user_is_at_least_auditor),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -151,6 +143,8 @@ async def get_user(
 ):
     user_query = db.query(
         user_model.User
+    ).options(
+        *get_loader_options(user_model.User, user_schema.UserResponse)
     ).filter(
         user_model.User.tower_id == current_user["user"].tower.id,
         user_model.User.id == id
@@ -165,7 +159,7 @@ async def get_user(
 
 
 @router.delete("", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_user(
+def delete_user(
     selected: List[int],
     db: Session = Depends(get_db),
     is_admin: bool = Depends(oauth2.check_if_user_is_administrator),
@@ -187,11 +181,14 @@ async def delete_user(
     user_query.delete(synchronize_session=False)
     db.commit()
 
+    oauth2.invalidate_principals(selected)
+    oauth2.invalidate_tower_admin(current_user["user"].tower.id)
+
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.put("/current", response_model=user_schema.UserResponse)
-async def update_current_user(
+def update_current_user(
     payload: user_schema.CurrentUserRequest,
     db: Session = Depends(get_db),
     current_user: user_schema.CurrentUserResponse = Depends(
@@ -246,11 +243,13 @@ async def update_current_user(
 
     updated_user = user_query.first()
 
+    oauth2.invalidate_principals([current_user["user"].id])
+
     return updated_user
 
 
 @router.put("/{id}", response_model=user_schema.UserResponse)
-async def update_user(
+def update_user(
     id: int,
     payload: user_schema.UserBase,
     db: Session = Depends(get_db),
@@ -311,4 +310,7 @@ async def update_user(
 
     updated_user = user_query.first()
 
+    oauth2.invalidate_principals([id])
+    oauth2.invalidate_tower_admin(current_user["user"].tower.id)
+
     return updated_user
@@ -35,6 +35,7 @@ class TokenBase(BaseModel):
 
 class TokenData(TokenBase):
     user_id: Optional[str] = None
+    inventory_id: Optional[int] = None
 
 
 class TokenResponse(TokenBase):
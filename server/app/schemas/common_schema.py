@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from enum import Enum
 from datetime import datetime
+from typing import Optional
 
 
 class SortDir(str, Enum):
@@ -8,14 +9,19 @@ class SortDir(str, Enum):
     desc = 'desc'
 
 
+class ExportFormat(str, Enum):
+    ndjson = 'ndjson'
+    csv = 'csv'
+
+
 class JobsScheduleInfoBase(BaseModel):
     cron_job_id: str
     frequency: int
     frequency_per_hour: int
     frequency_per_day: int
     frequency_per_year: int
-    prev_date: datetime
-    next_date: datetime
+    prev_date: Optional[datetime]
+    next_date: Optional[datetime]
 
     class Config:
         orm_mode = True
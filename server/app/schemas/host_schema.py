@@ -1,7 +1,7 @@
 from pydantic import BaseModel
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import List, Optional
 from . import organization_schema
 
 
@@ -43,3 +43,37 @@ class HostRelationship(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class HostImportFormat(str, Enum):
+    ini = 'ini'
+    yaml = 'yaml'
+    csv = 'csv'
+
+
+class HostImportStatus(str, Enum):
+    created = 'created'
+    updated = 'updated'
+    unchanged = 'unchanged'
+    failed = 'failed'
+
+
+class HostImportResult(BaseModel):
+    row: int
+    hostname: Optional[str]
+    ipv4: Optional[str]
+    groups: List[str]
+    status: HostImportStatus
+    host_id: Optional[int]
+    detail: Optional[str]
+
+
+class HostImportResponse(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+    failed: int
+    groups_created: int
+    memberships_created: int
+    fingerprinted: bool
+    results: List[HostImportResult]
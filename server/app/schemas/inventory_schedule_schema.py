@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from . import inventory_schema, schedule_schema
 
 
@@ -20,6 +21,8 @@ class InventorySchedulePostRequest(InventoryScheduleBase):
 class InventoryScheduleResponse(InventoryScheduleBase):
     inventory_schedule_id: int
     cron_job_id: str
+    next_run_at: Optional[datetime]
+    last_run_at: Optional[datetime]
     inventory: inventory_schema.InventoryResponse
     schedule: schedule_schema.ScheduleResponse
 
@@ -30,6 +33,8 @@ class InventoryScheduleResponse(InventoryScheduleBase):
 class InventoriesScheduleResponse(InventoryScheduleBase):
     inventory_schedule_id: int
     cron_job_id: str
+    next_run_at: Optional[datetime]
+    last_run_at: Optional[datetime]
     inventory: inventory_schema.InventoryResponse
 
     class Config:
@@ -39,6 +44,8 @@ class InventoriesScheduleResponse(InventoryScheduleBase):
 class InventorySchedulesResponse(InventoryScheduleBase):
     inventory_schedule_id: int
     cron_job_id: str
+    next_run_at: Optional[datetime]
+    last_run_at: Optional[datetime]
     schedule: schedule_schema.ScheduleResponse
 
     class Config:
@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from datetime import datetime
 from enum import Enum
+from typing import Optional
 from . import organization_schema, template_schema
 
 
@@ -21,15 +22,29 @@ class JobRequest(JobBase):
     organization_id: int
 
 
-class JobResponse(JobBase):
+class JobSummaryResponse(JobBase):
     id: int
     job_status: JobStatus
     started_at: datetime
-    finished_at: datetime
+    finished_at: Optional[datetime]
     launched_by: str
-    output: str
     template: template_schema.TemplateResponse
     organization: organization_schema.OrganizationRelationship
 
     class Config:
         orm_mode = True
+
+
+class JobResponse(JobSummaryResponse):
+    output: str
+
+    class Config:
+        orm_mode = True
+
+
+class JobOutputResponse(JobBase):
+    offset: int
+    next_offset: int
+    total_length: int
+    content: str
+    job_status: JobStatus
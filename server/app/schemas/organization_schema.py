@@ -7,6 +7,7 @@ from . import tower_schema
 class OrganizationBase(BaseModel):
     name: str
     description: Optional[str]
+    schedule_spread_window: Optional[int]
 
 
 class OrganizationRequest(OrganizationBase):
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from app.schemas import project_schema, schedule_schema
 
 
@@ -20,6 +21,8 @@ class ProjectSchedulePostRequest(ProjectScheduleBase):
 class ProjectScheduleResponse(ProjectScheduleBase):
     project_schedule_id: int
     cron_job_id: str
+    next_run_at: Optional[datetime]
+    last_run_at: Optional[datetime]
     project: project_schema.ProjectResponse
     schedule: schedule_schema.ScheduleResponse
 
@@ -30,6 +33,8 @@ class ProjectScheduleResponse(ProjectScheduleBase):
 class ProjectsScheduleResponse(ProjectScheduleBase):
     project_schedule_id: int
     cron_job_id: str
+    next_run_at: Optional[datetime]
+    last_run_at: Optional[datetime]
     project: project_schema.ProjectResponse
 
     class Config:
@@ -39,6 +44,8 @@ class ProjectsScheduleResponse(ProjectScheduleBase):
 class ProjectSchedulesResponse(ProjectScheduleBase):
     project_schedule_id: int
     cron_job_id: str
+    next_run_at: Optional[datetime]
+    last_run_at: Optional[datetime]
     schedule: schedule_schema.ScheduleResponse
 
     class Config:
@@ -38,6 +38,7 @@ class ScheduleBase(BaseModel):
     repeat_frequency: ScheduleRepeatFrequency
     every: Optional[int]
     week_days: Optional[List[int]]
+    spread_window: Optional[int]
 
 
 class ScheduleRequest(ScheduleBase):
@@ -69,3 +70,24 @@ class ScheduleRelationship(BaseModel):
 
     class Config:
         orm_mode = True
+
+
+class ScheduleForecastRun(BaseModel):
+    run_at: datetime
+    schedule_id: int
+    schedule_name: str
+    schedule_type: ScheduleType
+    resource_id: int
+    resource_name: str
+    tower_id: int
+
+
+class ScheduleForecastLoad(BaseModel):
+    tower_id: int
+    bucket: datetime
+    runs: int
+
+
+class ScheduleForecastResponse(BaseModel):
+    runs: List[ScheduleForecastRun]
+    load: List[ScheduleForecastLoad]
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import List
+from datetime import datetime
+from typing import List, Optional
 from app.schemas import template_schema, schedule_schema
 
 
@@ -20,6 +21,8 @@ class TemplateSchedulePostRequest(TemplateScheduleBase):
 class TemplateScheduleResponse(TemplateScheduleBase):
     template_schedule_id: int
     cron_job_id: str
+    next_run_at: Optional[datetime]
+    last_run_at: Optional[datetime]
     template: template_schema.TemplateResponse
     schedule: schedule_schema.ScheduleResponse
 
@@ -30,6 +33,8 @@ class TemplateScheduleResponse(TemplateScheduleBase):
 class TemplatesScheduleResponse(TemplateScheduleBase):
     template_schedule_id: int
     cron_job_id: str
+    next_run_at: Optional[datetime]
+    last_run_at: Optional[datetime]
     template: template_schema.TemplateResponse
 
     class Config:
@@ -39,6 +44,8 @@ class TemplatesScheduleResponse(TemplateScheduleBase):
 class TemplateSchedulesResponse(TemplateScheduleBase):
     template_schedule_id: int
     cron_job_id: str
+    next_run_at: Optional[datetime]
+    last_run_at: Optional[datetime]
     schedule: schedule_schema.ScheduleResponse
 
     class Config:
@@ -0,0 +1,91 @@
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from threading import Event, Thread
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import func, text
+from app.configs.env_vars import settings
+from app.database.connection import SessionLocal
+from app.models import inventory_change_model, inventory_model, organization_model
+from app.services.jobs.job_runner import job_runner
+from app.services.jobs.tasks import sync_inventory
+
+INVENTORY_COALESCER_LOCK_KEY = 727364202
+
+
+class InventoryCoalescer:
+    def __init__(self, poll_interval: int, resync_window: int):
+        self.poll_interval = poll_interval
+        self.resync_window = resync_window
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._thread = Thread(
+            target=self._loop, name="inventory-coalescer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval)
+            self._thread = None
+
+    def tick(self) -> None:
+        tasks: List[Tuple[int, Callable[[], None]]] = []
+        db = SessionLocal()
+
+        try:
+            if not self._lock(db):
+                return
+
+            queued_before = datetime.now(
+                timezone.utc) - timedelta(seconds=self.resync_window)
+
+            inventories_changes = db.query(
+                inventory_change_model.InventoryChange,
+                organization_model.Organization.tower_id
+            ).join(
+                inventory_model.Inventory, inventory_model.Inventory.id == inventory_change_model.InventoryChange.inventory_id
+            ).join(
+                organization_model.Organization, organization_model.Organization.id == inventory_model.Inventory.organization_id
+            ).filter(
+                inventory_change_model.InventoryChange.queued_at <= queued_before
+            ).order_by(
+                inventory_change_model.InventoryChange.queued_at
+            ).with_for_update(
+                of=inventory_change_model.InventoryChange,
+                skip_locked=True
+            ).all()
+
+            for (inventory_change, tower_id) in inventories_changes:
+                tasks.append((tower_id, partial(
+                    sync_inventory, inventory_change.inventory_id, inventory_change.changed_by)))
+                inventory_change.queued_at = func.now()
+
+            db.commit()
+        finally:
+            db.close()
+
+        for (tower_id, task) in tasks:
+            job_runner.submit_task(tower_id, task)
+
+    def _lock(self, db) -> bool:
+        return bool(db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"),
+            dict(key=INVENTORY_COALESCER_LOCK_KEY)
+        ).scalar())
+
+    def _loop(self) -> None:
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.tick()
+            except Exception as error:
+                pass
+
+
+inventory_coalescer = InventoryCoalescer(
+    settings.inventory_resync_poll_interval,
+    settings.inventory_resync_window
+)
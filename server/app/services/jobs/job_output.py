@@ -0,0 +1,111 @@
+from asyncio import sleep
+from time import monotonic
+from typing import Any, AsyncIterator, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.models import job_model, job_output_chunk_model
+from app.schemas import job_schema
+from app.utils.server_sent_events import format_comment, format_event
+
+STREAM_POLL_INTERVAL = 1.0
+STREAM_KEEPALIVE_INTERVAL = 15.0
+
+FINISHED_JOB_STATUSES = (
+    job_schema.JobStatus.successful,
+    job_schema.JobStatus.failed
+)
+
+
+def read_job_output(db: Session, job_id: int, offset: int, limit: Optional[int]) -> dict[str, Any]:
+    total_length = db.query(
+        func.coalesce(
+            func.sum(job_output_chunk_model.JobOutputChunk.content_length), 0)
+    ).filter(
+        job_output_chunk_model.JobOutputChunk.job_id == job_id
+    ).scalar()
+
+    chunks_query = db.query(
+        job_output_chunk_model.JobOutputChunk.start_offset,
+        job_output_chunk_model.JobOutputChunk.content
+    ).filter(
+        job_output_chunk_model.JobOutputChunk.job_id == job_id,
+        job_output_chunk_model.JobOutputChunk.start_offset +
+        job_output_chunk_model.JobOutputChunk.content_length > offset
+    )
+
+    if limit is not None:
+        chunks_query = chunks_query.filter(
+            job_output_chunk_model.JobOutputChunk.start_offset < offset + limit
+        )
+
+    chunks = chunks_query.order_by(
+        job_output_chunk_model.JobOutputChunk.seq
+    ).all()
+
+    content: str = ""
+
+    if chunks:
+        start = offset - chunks[0].start_offset
+        content = "".join(chunk.content for chunk in chunks)
+        content = content[start:start + limit] if limit is not None else content[start:]
+
+    return dict(
+        offset=offset,
+        next_offset=offset + len(content),
+        total_length=total_length,
+        content=content
+    )
+
+
+def read_new_job_output_chunks(db: Session, job_id: int, last_seq: int) -> Tuple[Optional[str], List[Any]]:
+    try:
+        job_status = db.query(
+            job_model.Job.job_status
+        ).filter(
+            job_model.Job.id == job_id
+        ).scalar()
+
+        if not job_status:
+            return (None, [])
+
+        chunks = db.query(
+            job_output_chunk_model.JobOutputChunk.seq,
+            job_output_chunk_model.JobOutputChunk.content
+        ).filter(
+            job_output_chunk_model.JobOutputChunk.job_id == job_id,
+            job_output_chunk_model.JobOutputChunk.seq > last_seq
+        ).order_by(
+            job_output_chunk_model.JobOutputChunk.seq
+        ).all()
+
+        return (job_status, chunks)
+    finally:
+        db.rollback()
+
+
+async def stream_job_output(db: Session, job_id: int) -> AsyncIterator[str]:
+    last_seq: int = -1
+    last_event: float = monotonic()
+
+    while True:
+        (job_status, chunks) = await run_in_threadpool(
+            read_new_job_output_chunks, db, job_id, last_seq)
+
+        if not job_status:
+            return
+
+        if chunks:
+            last_seq = chunks[-1].seq
+            last_event = monotonic()
+            yield format_event("output", "".join(chunk.content for chunk in chunks))
+
+        if job_status in FINISHED_JOB_STATUSES:
+            yield format_event("status", job_status)
+            return
+
+        if monotonic() - last_event >= STREAM_KEEPALIVE_INTERVAL:
+            last_event = monotonic()
+            yield format_comment("keep-alive")
+
+        await sleep(STREAM_POLL_INTERVAL)
@@ -0,0 +1,369 @@
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from datetime import datetime, timedelta, timezone
+from threading import Event, Lock, Thread
+from time import monotonic
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+from sqlalchemy import or_, text
+from app.auth.oauth2 import create_inventory_token
+from app.configs.env_vars import settings
+from app.database.connection import SessionLocal
+from app.models import job_model, job_output_chunk_model, user_model
+from app.schemas import job_schema
+from app.services.jobs.tasks import sync_changed_inventory
+from app.services.tower.tower_service import launch_jobs
+
+OUTPUT_FLUSH_INTERVAL = 1.0
+OUTPUT_FLUSH_SIZE = 65536
+
+RECOVER_LOCK_KEY = 727364203
+
+CLAIMABLE_JOB_STATUSES = (
+    job_schema.JobStatus.pending,
+    job_schema.JobStatus.waiting
+)
+
+
+class JobOutputWriter:
+    def __init__(self, db, job_id: int):
+        self.db = db
+        self.job_id = job_id
+        self._seq: int = 0
+        self._offset: int = 0
+        self._buffer: List[str] = []
+        self._buffered: int = 0
+        self._last_flush: float = monotonic()
+
+    def write(self, chunk: str) -> None:
+        self._buffer.append(chunk)
+        self._buffered += len(chunk)
+
+        if self._buffered >= OUTPUT_FLUSH_SIZE or monotonic() - self._last_flush >= OUTPUT_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        self._last_flush = monotonic()
+
+        if not self._buffer:
+            return
+
+        content = "".join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+
+        new_chunk = job_output_chunk_model.JobOutputChunk(
+            job_id=self.job_id,
+            seq=self._seq,
+            start_offset=self._offset,
+            content_length=len(content),
+            content=content
+        )
+
+        self.db.add(new_chunk)
+        self.db.commit()
+
+        self._seq += 1
+        self._offset += len(content)
+
+
+class JobRunner:
+    def __init__(self, max_workers: int, max_jobs_per_tower: int, heartbeat_interval: int, stale_after: int):
+        self.max_jobs_per_tower = max_jobs_per_tower
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="job-runner")
+        self._running: Dict[int, int] = defaultdict(int)
+        self._queued: Dict[int, Deque[Callable[[], None]]] = defaultdict(deque)
+        self._lock = Lock()
+        self._active_jobs: Set[int] = set()
+        self._stopped = Event()
+        self._heartbeat_thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        self._stopped.clear()
+        self._heartbeat_thread = Thread(
+            target=self._heartbeat_loop, name="job-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def submit(self, job_id: int, tower_id: int) -> job_schema.JobStatus:
+        if self.submit_task(tower_id, partial(self._execute, job_id)):
+            return job_schema.JobStatus.pending
+
+        self._set_waiting(job_id)
+        return job_schema.JobStatus.waiting
+
+    def submit_task(self, tower_id: int, task: Callable[[], None]) -> bool:
+        with self._lock:
+            if self._running[tower_id] < self.max_jobs_per_tower:
+                self._running[tower_id] += 1
+                self._executor.submit(self._run, task, tower_id)
+                return True
+
+            self._queued[tower_id].append(task)
+
+        return False
+
+    def recover(self) -> None:
+        db = SessionLocal()
+
+        try:
+            if not db.execute(
+                text("SELECT pg_try_advisory_xact_lock(:key)"),
+                dict(key=RECOVER_LOCK_KEY)
+            ).scalar():
+                return
+
+            now = datetime.now(timezone.utc)
+
+            db.query(
+                job_model.Job
+            ).filter(
+                job_model.Job.job_status == job_schema.JobStatus.running,
+                or_(
+                    job_model.Job.heartbeat_at.is_(None),
+                    job_model.Job.heartbeat_at < now -
+                    timedelta(seconds=self.stale_after)
+                )
+            ).update(
+                dict(
+                    job_status=job_schema.JobStatus.failed,
+                    finished_at=now
+                ),
+                synchronize_session=False
+            )
+
+            jobs = db.query(
+                job_model.Job
+            ).filter(
+                job_model.Job.job_status.in_(CLAIMABLE_JOB_STATUSES)
+            ).order_by(
+                job_model.Job.id
+            ).all()
+            jobs_towers = [(job.id, job.organization.tower_id) for job in jobs]
+            db.commit()
+
+            for (job_id, tower_id) in jobs_towers:
+                self.submit(job_id, tower_id)
+        finally:
+            db.close()
+
+    def shutdown(self) -> None:
+        self._stopped.set()
+
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join(timeout=self.heartbeat_interval)
+            self._heartbeat_thread = None
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def heartbeat(self) -> None:
+        with self._lock:
+            active_jobs = list(self._active_jobs)
+
+        if not active_jobs:
+            return
+
+        db = SessionLocal()
+
+        try:
+            db.query(
+                job_model.Job
+            ).filter(
+                job_model.Job.id.in_(active_jobs),
+                job_model.Job.job_status == job_schema.JobStatus.running
+            ).update(
+                dict(heartbeat_at=datetime.now(timezone.utc)),
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _heartbeat_loop(self) -> None:
+        try:
+            self.recover()
+        except Exception as error:
+            pass
+
+        while not self._stopped.wait(self.heartbeat_interval):
+            try:
+                self.heartbeat()
+            except Exception as error:
+                pass
+
+    def _claim(self, db, job_id: int) -> bool:
+        now = datetime.now(timezone.utc)
+
+        claimed = db.query(
+            job_model.Job
+        ).filter(
+            job_model.Job.id == job_id,
+            job_model.Job.job_status.in_(CLAIMABLE_JOB_STATUSES)
+        ).update(
+            dict(
+                job_status=job_schema.JobStatus.running,
+                started_at=now,
+                heartbeat_at=now
+            ),
+            synchronize_session=False
+        )
+
+        return claimed == 1
+
+    def _run(self, task: Callable[[], None], tower_id: int) -> None:
+        try:
+            task()
+        except Exception as error:
+            pass
+        finally:
+            self._release(tower_id)
+
+    def _release(self, tower_id: int) -> None:
+        with self._lock:
+            if self._queued[tower_id]:
+                next_task = self._queued[tower_id].popleft()
+                self._executor.submit(self._run, next_task, tower_id)
+            else:
+                self._running[tower_id] -= 1
+
+    def _set_waiting(self, job_id: int) -> None:
+        db = SessionLocal()
+
+        try:
+            db.query(
+                job_model.Job
+            ).filter(
+                job_model.Job.id == job_id,
+                job_model.Job.job_status == job_schema.JobStatus.pending
+            ).update(
+                dict(job_status=job_schema.JobStatus.waiting),
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            db.close()
+
+    def _get_dynamic_inventory(self, db, username: str, tower_id: int, inventory_id: int) -> Tuple[Optional[str], Optional[str]]:
+        if not settings.dynamic_inventory_url:
+            return (None, None)
+
+        user = db.query(
+            user_model.User
+        ).filter(
+            user_model.User.tower_id == tower_id,
+            user_model.User.username == username
+        ).first()
+        if not user:
+            return (None, None)
+
+        inventory_token = create_inventory_token(user.id, inventory_id)
+
+        return (f"{settings.dynamic_inventory_url.rstrip('/')}/api/inventories/{inventory_id}/ansible", inventory_token)
+
+    def _execute(self, job_id: int) -> None:
+        db = SessionLocal()
+
+        try:
+            claimed = self._claim(db, job_id)
+            db.commit()
+        except Exception as error:
+            db.rollback()
+            claimed = False
+
+        if not claimed:
+            db.close()
+            return
+
+        with self._lock:
+            self._active_jobs.add(job_id)
+
+        try:
+            job_query = db.query(
+                job_model.Job
+            ).filter(
+                job_model.Job.id == job_id
+            )
+            job = job_query.first()
+
+            template = job.template
+            tower = job.organization.tower
+
+            db.query(
+                job_output_chunk_model.JobOutputChunk
+            ).filter(
+                job_output_chunk_model.JobOutputChunk.job_id == job_id
+            ).delete(synchronize_session=False)
+            db.commit()
+
+            output_writer = JobOutputWriter(db, job_id)
+
+            (inventory_url, inventory_token) = self._get_dynamic_inventory(
+                db, job.launched_by, tower.id, template.inventory.id)
+
+            if not inventory_url:
+                sync_changed_inventory(template.inventory.id)
+
+            job_result = launch_jobs(
+                template.organization.name,
+                template.project.source_control_url,
+                template.playbook_name,
+                template.inventory.inventory_file,
+                template.privilege_escalation,
+                template.forks,
+                template.verbosity,
+                template.launch_type,
+                template.extra_vars,
+                template.credential.username,
+                template.credential.password,
+                output_writer.write,
+                tower.company,
+                tower.ipv4,
+                tower.port,
+                tower.username,
+                tower.password,
+                10,
+                tower_id=tower.id,
+                inventory_url=inventory_url,
+                inventory_token=inventory_token
+            )
+
+            output_writer.flush()
+
+            job_query.update(
+                dict(
+                    job_status=job_result if job_result else job_schema.JobStatus.failed,
+                    finished_at=datetime.now(timezone.utc)
+                ),
+                synchronize_session=False
+            )
+            db.commit()
+        except Exception as error:
+            db.rollback()
+
+            db.query(
+                job_model.Job
+            ).filter(
+                job_model.Job.id == job_id
+            ).update(
+                dict(
+                    job_status=job_schema.JobStatus.failed,
+                    finished_at=datetime.now(timezone.utc)
+                ),
+                synchronize_session=False
+            )
+            db.commit()
+        finally:
+            with self._lock:
+                self._active_jobs.discard(job_id)
+
+            db.close()
+
+
+job_runner = JobRunner(
+    settings.job_max_workers,
+    settings.job_max_concurrency_per_tower,
+    settings.job_heartbeat_interval,
+    settings.job_stale_after
+)
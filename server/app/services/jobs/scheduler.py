@@ -0,0 +1,198 @@
+from collections import Counter
+from datetime import datetime, timezone
+from functools import partial
+from threading import Event, Thread
+from typing import Callable, List, Optional, Tuple
+from sqlalchemy import func, text
+from app.configs.env_vars import settings
+from app.database.connection import SessionLocal
+from app.models import inventory_model, inventory_schedule_model, job_model, organization_model, project_model, project_schedule_model, schedule_model, template_model, template_schedule_model
+from app.schemas import job_schema
+from app.services.jobs.job_runner import job_runner
+from app.services.jobs.tasks import sync_inventory, update_project_repo
+from app.services.tower.schedule_service import get_schedule_next_run_at, remove_job_schedules
+
+SCHEDULER_LOCK_KEY = 727364201
+
+ASSIGNMENTS = (
+    (template_schedule_model.TemplateSchedule, template_model.Template,
+     template_schedule_model.TemplateSchedule.template_id, None),
+    (project_schedule_model.ProjectSchedule, project_model.Project,
+     project_schedule_model.ProjectSchedule.project_id, update_project_repo),
+    (inventory_schedule_model.InventorySchedule, inventory_model.Inventory,
+     inventory_schedule_model.InventorySchedule.inventory_id, sync_inventory)
+)
+
+
+class Scheduler:
+    def __init__(self, poll_interval: int, max_launches_per_minute: int):
+        self.poll_interval = poll_interval
+        self.max_launches_per_minute = max_launches_per_minute
+        self._stopped = Event()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> None:
+        self.backfill()
+
+        self._stopped.clear()
+        self._thread = Thread(
+            target=self._loop, name="scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval)
+            self._thread = None
+
+    def backfill(self) -> None:
+        db = SessionLocal()
+
+        try:
+            if not self._lock(db):
+                return
+
+            now = datetime.now(timezone.utc)
+            legacy_schedules = []
+
+            for (assignment_model, resource_model, resource_column, resource_task) in ASSIGNMENTS:
+                rows = db.query(
+                    assignment_model,
+                    schedule_model.Schedule
+                ).join(
+                    schedule_model.Schedule, schedule_model.Schedule.id == assignment_model.schedule_id
+                ).filter(
+                    assignment_model.in_crontab.is_(True)
+                ).all()
+
+                for (assignment, schedule) in rows:
+                    assignment.next_run_at = get_schedule_next_run_at(
+                        schedule, now)
+                    assignment.in_crontab = False
+                    legacy_schedules.append(assignment)
+
+            if legacy_schedules and not remove_job_schedules(legacy_schedules):
+                db.rollback()
+                return
+
+            db.commit()
+        finally:
+            db.close()
+
+    def tick(self) -> None:
+        new_jobs: List[Tuple[job_model.Job, int]] = []
+        tasks: List[Tuple[int, Callable[[], None]]] = []
+        db = SessionLocal()
+
+        try:
+            if not self._lock(db):
+                return
+
+            now = datetime.now(timezone.utc)
+            launches_by_tower = self._get_launches_by_tower(
+                db, now.replace(second=0, microsecond=0))
+
+            for (assignment_model, resource_model, resource_column, resource_task) in ASSIGNMENTS:
+                due_assignments = db.query(
+                    assignment_model,
+                    schedule_model.Schedule,
+                    resource_model,
+                    organization_model.Organization.tower_id
+                ).join(
+                    schedule_model.Schedule, schedule_model.Schedule.id == assignment_model.schedule_id
+                ).join(
+                    resource_model, resource_model.id == resource_column
+                ).join(
+                    organization_model.Organization, organization_model.Organization.id == resource_model.organization_id
+                ).filter(
+                    assignment_model.next_run_at <= now
+                ).order_by(
+                    assignment_model.next_run_at
+                ).with_for_update(
+                    of=assignment_model,
+                    skip_locked=True
+                ).all()
+
+                for (assignment, schedule, resource, tower_id) in due_assignments:
+                    if self.max_launches_per_minute and launches_by_tower[tower_id] >= self.max_launches_per_minute:
+                        continue
+
+                    launches_by_tower[tower_id] += 1
+
+                    if resource_task is None:
+                        new_job = job_model.Job(
+                            template_id=resource.id,
+                            organization_id=resource.organization_id,
+                            started_at=now,
+                            job_status=job_schema.JobStatus.pending,
+                            launched_by=schedule.created_by
+                        )
+                        db.add(new_job)
+                        new_jobs.append((new_job, tower_id))
+                    else:
+                        tasks.append((tower_id, partial(
+                            resource_task, resource.id, schedule.created_by)))
+
+                    assignment.last_run_at = now
+                    assignment.next_run_at = get_schedule_next_run_at(
+                        schedule, now)
+
+            db.flush()
+            launches = [(new_job.id, tower_id)
+                        for (new_job, tower_id) in new_jobs]
+            db.commit()
+        finally:
+            db.close()
+
+        for (job_id, tower_id) in launches:
+            job_runner.submit(job_id, tower_id)
+
+        for (tower_id, task) in tasks:
+            job_runner.submit_task(tower_id, task)
+
+    def _get_launches_by_tower(self, db, since: datetime) -> Counter:
+        launches_by_tower: Counter = Counter()
+
+        if not self.max_launches_per_minute:
+            return launches_by_tower
+
+        for (assignment_model, resource_model, resource_column, resource_task) in ASSIGNMENTS:
+            launches = db.query(
+                organization_model.Organization.tower_id,
+                func.count()
+            ).select_from(
+                assignment_model
+            ).join(
+                resource_model, resource_model.id == resource_column
+            ).join(
+                organization_model.Organization, organization_model.Organization.id == resource_model.organization_id
+            ).filter(
+                assignment_model.last_run_at >= since
+            ).group_by(
+                organization_model.Organization.tower_id
+            ).all()
+
+            for (tower_id, launches_count) in launches:
+                launches_by_tower[tower_id] += launches_count
+
+        return launches_by_tower
+
+    def _lock(self, db) -> bool:
+        return bool(db.execute(
+            text("SELECT pg_try_advisory_xact_lock(:key)"),
+            dict(key=SCHEDULER_LOCK_KEY)
+        ).scalar())
+
+    def _loop(self) -> None:
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.tick()
+            except Exception as error:
+                pass
+
+
+scheduler = Scheduler(
+    settings.scheduler_poll_interval,
+    settings.scheduler_max_launches_per_minute
+)
@@ -0,0 +1,149 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.database.connection import SessionLocal
+from app.models import credential_model, inventory_model, project_model, user_credential_model, user_model
+from app.schemas import credential_schema, inventory_schema
+from app.services.tower.inventory_service import write_inventory_file
+from app.services.tower.project_service import update_repo
+from app.utils.inventory_changes import clear_inventory_change, get_inventory_change
+from app.utils.inventory_file import get_content_hash, get_inventory_groups_hosts, render_inventory_file
+
+
+def update_project_repo(project_id: int, username: str) -> None:
+    db = SessionLocal()
+
+    try:
+        project_query = db.query(
+            project_model.Project
+        ).filter(
+            project_model.Project.id == project_id
+        )
+        project = project_query.first()
+        if not project:
+            return
+
+        tower = project.organization.tower
+
+        user_credential = db.query(
+            user_credential_model.UserCredential
+        ).join(
+            user_model.User, user_model.User.id == user_credential_model.UserCredential.user_id
+        ).join(
+            credential_model.Credential, credential_model.Credential.id == user_credential_model.UserCredential.credential_id
+        ).filter(
+            user_model.User.tower_id == tower.id,
+            user_model.User.username == username,
+            credential_model.Credential.credential_type == credential_schema.CredentialType.source_control
+        ).first()
+        if not user_credential:
+            return
+
+        updated_repo = update_repo(
+            project.source_control_url,
+            project.organization.name,
+            user_credential.credential.password,
+            user_credential.credential.username,
+            tower.company,
+            tower.ipv4,
+            tower.port,
+            tower.username,
+            tower.password,
+            10,
+            tower_id=tower.id
+        )
+        if not updated_repo:
+            return
+
+        project_query.update(
+            dict(
+                project_status=updated_repo,
+                last_modified_by=username
+            ),
+            synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+def sync_inventory_file(db: Session, inventory: inventory_model.Inventory, username: str) -> Optional[inventory_schema.InventoryStatus]:
+    tower = inventory.organization.tower
+
+    inventory_change = get_inventory_change(db, inventory.id)
+    changed_at = inventory_change.changed_at if inventory_change else None
+
+    groups_hosts = get_inventory_groups_hosts(db, inventory.id, tower.id)
+
+    file_content = render_inventory_file(groups_hosts)
+    content_hash = get_content_hash(file_content)
+
+    if content_hash == inventory.content_hash and inventory.inventory_status == inventory_schema.InventoryStatus.successful:
+        if changed_at:
+            clear_inventory_change(db, inventory.id, changed_at)
+            db.commit()
+        return inventory_schema.InventoryStatus.successful
+
+    write_file = write_inventory_file(
+        inventory.organization.name,
+        inventory.inventory_file,
+        file_content,
+        tower.company,
+        tower.ipv4,
+        tower.port,
+        tower.username,
+        tower.password,
+        10,
+        tower_id=tower.id
+    )
+    if not write_file:
+        return None
+
+    db.query(
+        inventory_model.Inventory
+    ).filter(
+        inventory_model.Inventory.id == inventory.id
+    ).update(
+        dict(
+            inventory_status=write_file,
+            content_hash=content_hash if write_file == inventory_schema.InventoryStatus.successful else None,
+            last_modified_by=username
+        ),
+        synchronize_session=False
+    )
+
+    if changed_at and write_file == inventory_schema.InventoryStatus.successful:
+        clear_inventory_change(db, inventory.id, changed_at)
+
+    db.commit()
+
+    return write_file
+
+
+def sync_inventory(inventory_id: int, username: str) -> None:
+    db = SessionLocal()
+
+    try:
+        inventory = db.query(
+            inventory_model.Inventory
+        ).filter(
+            inventory_model.Inventory.id == inventory_id
+        ).first()
+        if not inventory:
+            return
+
+        sync_inventory_file(db, inventory, username)
+    finally:
+        db.close()
+
+
+def sync_changed_inventory(inventory_id: int) -> None:
+    db = SessionLocal()
+
+    try:
+        inventory_change = get_inventory_change(db, inventory_id)
+        changed_by = inventory_change.changed_by if inventory_change else None
+    finally:
+        db.close()
+
+    if changed_by:
+        sync_inventory(inventory_id, changed_by)
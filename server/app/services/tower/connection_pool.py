@@ -0,0 +1,155 @@
+from contextlib import contextmanager
+from threading import BoundedSemaphore, Lock
+from time import monotonic
+from typing import Any, Dict, Iterator, Optional, Tuple
+from paramiko import SSHClient, AutoAddPolicy
+from app.configs.env_vars import settings
+
+
+class TowerConnection:
+    def __init__(self, client: SSHClient, params: Tuple[Any, ...], max_channels: int):
+        self.client = client
+        self.params = params
+        self.channels = BoundedSemaphore(max_channels)
+        self.borrowed: int = 0
+        self.stale: bool = False
+        self.last_used: float = monotonic()
+
+    def is_alive(self) -> bool:
+        transport = self.client.get_transport()
+
+        if transport is None or not transport.is_active():
+            return False
+
+        try:
+            transport.send_ignore()
+        except Exception as error:
+            return False
+
+        return True
+
+    def close(self) -> None:
+        try:
+            self.client.close()
+        except Exception as error:
+            pass
+
+
+class TowerConnectionPool:
+    def __init__(self, keepalive_interval: int, idle_timeout: int, max_channels: int):
+        self.keepalive_interval = keepalive_interval
+        self.idle_timeout = idle_timeout
+        self.max_channels = max_channels
+        self._connections: Dict[Any, TowerConnection] = {}
+        self._key_locks: Dict[Any, Lock] = {}
+        self._lock = Lock()
+
+    @contextmanager
+    def connection(self, hostname, port, username, password, timeout: int, tower_id: Optional[int] = None) -> Iterator[SSHClient]:
+        key = tower_id if tower_id is not None else (hostname, port, username)
+        params = (hostname, port, username, password)
+
+        connection = self._checkout(key, params, timeout)
+
+        if not connection.channels.acquire(timeout=timeout):
+            self._checkin(key, connection, False)
+            raise TimeoutError(f"No free SSH channel for tower {key}")
+
+        try:
+            yield connection.client
+        finally:
+            self._checkin(key, connection, True)
+
+    def evict(self, tower_id: int) -> None:
+        with self._lock:
+            connection = self._connections.get(tower_id)
+            if connection is not None:
+                self._discard(tower_id, connection)
+
+    def evict_idle(self) -> None:
+        with self._lock:
+            self._evict_idle()
+
+    def close_all(self) -> None:
+        with self._lock:
+            for key, connection in list(self._connections.items()):
+                self._discard(key, connection)
+
+    def _checkout(self, key, params: Tuple[Any, ...], timeout: int) -> TowerConnection:
+        with self._lock:
+            self._evict_idle()
+            key_lock = self._key_locks.setdefault(key, Lock())
+
+        with key_lock:
+            with self._lock:
+                connection = self._connections.get(key)
+
+                if connection is not None and connection.params == params and connection.is_alive():
+                    connection.borrowed += 1
+                    return connection
+
+                if connection is not None:
+                    self._discard(key, connection)
+
+            new_connection = self._connect(params, timeout)
+
+            with self._lock:
+                self._connections[key] = new_connection
+                new_connection.borrowed += 1
+
+            return new_connection
+
+    def _checkin(self, key, connection: TowerConnection, release_channel: bool) -> None:
+        if release_channel:
+            connection.channels.release()
+
+        transport = connection.client.get_transport()
+
+        with self._lock:
+            connection.borrowed -= 1
+            connection.last_used = monotonic()
+
+            if not connection.stale and (transport is None or not transport.is_active()):
+                self._discard(key, connection)
+            elif connection.stale and connection.borrowed == 0:
+                connection.close()
+
+    def _connect(self, params: Tuple[Any, ...], timeout: int) -> TowerConnection:
+        (hostname, port, username, password) = params
+
+        ssh_client = SSHClient()
+        ssh_client.set_missing_host_key_policy(AutoAddPolicy())
+        ssh_client.load_system_host_keys()
+
+        try:
+            ssh_client.connect(hostname=hostname, port=port,
+                               username=username, password=password, timeout=timeout)
+            ssh_client.get_transport().set_keepalive(self.keepalive_interval)
+        except Exception:
+            ssh_client.close()
+            raise
+
+        return TowerConnection(ssh_client, params, self.max_channels)
+
+    def _discard(self, key, connection: TowerConnection) -> None:
+        if self._connections.get(key) is connection:
+            del self._connections[key]
+
+        connection.stale = True
+
+        if connection.borrowed == 0:
+            connection.close()
+
+    def _evict_idle(self) -> None:
+        now = monotonic()
+
+        for key, connection in list(self._connections.items()):
+            if connection.borrowed == 0 and now - connection.last_used > self.idle_timeout:
+                self._discard(key, connection)
+
+
+ssh_pool = TowerConnectionPool(
+    settings.ssh_keepalive_interval,
+    settings.ssh_idle_timeout,
+    settings.ssh_max_channels_per_transport
+)
@@ -1,247 +1,277 @@
+from collections import Counter, defaultdict
 from crontab import CronTab
 from croniter import croniter
-from json import dumps
-from datetime import datetime
-from typing import Any, List
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from zlib import crc32
 from app.schemas import schedule_schema
 
 
-def add_job_schedule(command: str, comment: str, schedule_datetime: datetime, repeat_frequency: schedule_schema.ScheduleRepeatFrequency, schedule_every: int, schedule_weekdays: List[int]) -> bool:
-    try:
-        cron = CronTab(user=True)
-        cron.env['SHELL'] = '/bin/bash'
+def get_every_field(schedule_every: int) -> str:
+    return f"*/{schedule_every}" if schedule_every else "*"
 
-        job = cron.new(
-            command=command,
-            comment=comment
-        )
 
-        if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.run_once.name:
-            job.minute.on(schedule_datetime.minute)
-            job.hour.on(schedule_datetime.hour)
-            job.day.on(schedule_datetime.day)
-            job.month.on(schedule_datetime.month)
-
-        if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.minute.name:
-            if schedule_every:
-                job.minute.every(schedule_every)
-
-        if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.hour.name:
-            job.minute.on(schedule_datetime.minute)
-            if schedule_every:
-                job.hour.every(schedule_every)
-
-        if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.day.name:
-            job.minute.on(schedule_datetime.minute)
-            job.hour.on(schedule_datetime.hour)
-            if schedule_every:
-                job.day.every(schedule_every)
-
-        if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.week.name:
-            job.minute.on(schedule_datetime.minute)
-            job.hour.on(schedule_datetime.hour)
-            if schedule_weekdays:
-                for index, week_day in enumerate(schedule_weekdays):
-                    if index == 0:
-                        job.dow.on(week_day)
-                    else:
-                        job.dow.also.on(week_day)
-
-        if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.month.name:
-            job.minute.on(schedule_datetime.minute)
-            job.hour.on(schedule_datetime.hour)
-            job.day.on(schedule_datetime.day)
-            if schedule_every:
-                job.month.every(schedule_every)
-
-        if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.year.name:
-            job.minute.on(schedule_datetime.minute)
-            job.hour.on(schedule_datetime.hour)
-            job.day.on(schedule_datetime.day)
-            job.month.on(schedule_datetime.month)
-
-        cron.write_to_user(user=True)
-        return True
-    except Exception as error:
-        return False
+def get_cron_expression(schedule_datetime: datetime, repeat_frequency: schedule_schema.ScheduleRepeatFrequency, schedule_every: int, schedule_weekdays: List[int]) -> str:
+    minute = schedule_datetime.minute
+    hour = schedule_datetime.hour
+    day = schedule_datetime.day
+    month = schedule_datetime.month
 
+    if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.minute.name:
+        return f"{get_every_field(schedule_every)} * * * *"
 
-def update_job_schedule(comment: str, schedule_datetime: datetime, repeat_frequency: schedule_schema.ScheduleRepeatFrequency, schedule_every: int, schedule_weekdays: List[int]) -> bool:
-    try:
-        cron = CronTab(user=True)
-        cron.env['SHELL'] = '/bin/bash'
-
-        for job in cron:
-            if job.comment == comment:
-                job.clear()
-
-                if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.run_once.name:
-                    job.minute.on(schedule_datetime.minute)
-                    job.hour.on(schedule_datetime.hour)
-                    job.day.on(schedule_datetime.day)
-                    job.month.on(schedule_datetime.month)
-
-                if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.minute.name:
-                    if schedule_every:
-                        job.minute.every(schedule_every)
-
-                if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.hour.name:
-                    job.minute.on(schedule_datetime.minute)
-                    if schedule_every:
-                        job.hour.every(schedule_every)
-
-                if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.day.name:
-                    job.minute.on(schedule_datetime.minute)
-                    job.hour.on(schedule_datetime.hour)
-                    if schedule_every:
-                        job.day.every(schedule_every)
-
-                if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.week.name:
-                    job.minute.on(schedule_datetime.minute)
-                    job.hour.on(schedule_datetime.hour)
-                    if schedule_weekdays:
-                        for index, week_day in enumerate(schedule_weekdays):
-                            if index == 0:
-                                job.dow.on(week_day)
-                            else:
-                                job.dow.also.on(week_day)
-
-                if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.month.name:
-                    job.minute.on(schedule_datetime.minute)
-                    job.hour.on(schedule_datetime.hour)
-                    job.day.on(schedule_datetime.day)
-                    if schedule_every:
-                        job.month.every(schedule_every)
-
-                if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.year.name:
-                    job.minute.on(schedule_datetime.minute)
-                    job.hour.on(schedule_datetime.hour)
-                    job.day.on(schedule_datetime.day)
-                    job.month.on(schedule_datetime.month)
-
-                cron.write_to_user(user=True)
-        return True
-    except Exception as error:
-        return False
-
+    if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.hour.name:
+        return f"{minute} {get_every_field(schedule_every)} * * *"
 
-def remove_job_schedules(resource_schedules: Any | list | None) -> bool:
-    try:
-        cron = CronTab(user=True)
-        cron.env['SHELL'] = '/bin/bash'
+    if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.day.name:
+        return f"{minute} {hour} {get_every_field(schedule_every)} * *"
 
-        for job in cron:
-            for resource_schedule in resource_schedules:
-                if job.comment == resource_schedule.cron_job_id:
-                    job.delete()
-
-        cron.write_to_user(user=True)
-        return True
-    except Exception as error:
-        return False
+    if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.week.name:
+        week_days = ",".join(str(week_day) for week_day in schedule_weekdays) if schedule_weekdays else "*"
+        return f"{minute} {hour} * * {week_days}"
 
+    if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.month.name:
+        return f"{minute} {hour} {day} {get_every_field(schedule_every)} *"
 
-def get_job_schedule_info(resource_schedules: Any | list | None) -> list[dict[str, Any]] | None:
-    try:
-        cron = CronTab(user=True)
-        cron.env['SHELL'] = '/bin/bash'
+    return f"{minute} {hour} {day} {month} *"
 
-        schedule_info_response: list[dict[str, Any]] = []
 
-        for job in cron:
-            for resource_schedule in resource_schedules:
-                if job.comment == resource_schedule.cron_job_id:
-                    sch: croniter = job.schedule(date_from=datetime.now())
-
-                    schedule_info: dict[str, Any] = dict(
-                        cron_job_id=resource_schedule.cron_job_id,
-                        frequency=job.frequency(),
-                        frequency_per_hour=job.frequency_per_hour(),
-                        frequency_per_day=job.frequency_per_day(),
-                        frequency_per_year=job.frequency_per_year(),
-                        prev_date=sch.get_prev(),
-                        next_date=sch.get_next()
-                    )
-                    schedule_info_response.append(schedule_info)
-        return schedule_info_response
-    except Exception as error:
-        return None
+def get_spread_offset(schedule_id: int, spread_window: Optional[int]) -> timedelta:
+    if not spread_window or spread_window < 0:
+        return timedelta(0)
 
+    return timedelta(seconds=crc32(str(schedule_id).encode("utf-8")) % (spread_window * 60))
 
-def check_job_id(comment: str) -> bool:
-    try:
-        cron = CronTab(user=True)
-        cron.env['SHELL'] = '/bin/bash'
 
-        for job in cron:
-            if job.comment == comment:
-                return True
-        return False
-    except Exception as error:
-        return False
+def get_schedule_spread_offset(schedule) -> timedelta:
+    spread_window = schedule.spread_window if schedule.spread_window is not None else schedule.organization.schedule_spread_window
 
+    return get_spread_offset(schedule.id, spread_window)
 
-def add_crontab_schedule_template(token: str, schedule_datetime: datetime, repeat_frequency: schedule_schema.ScheduleRepeatFrequency, schedule_every: int, schedule_weekdays: List[int], comment: str, template_id, organization_id) -> bool:
-    try:
-        payload = dumps({"template_id": template_id,
-                        "organization_id": organization_id})
 
-        cmd = f"curl -X POST -H 'Content-Type: application/json' -H 'Authorization: Bearer {token}' -d '{payload}' 127.0.0.1:8000/api/jobs/launch"
+def get_next_run_at(schedule_datetime: datetime, repeat_frequency: schedule_schema.ScheduleRepeatFrequency, schedule_every: int, schedule_weekdays: List[int], after: Optional[datetime] = None, offset: timedelta = timedelta(0)) -> Optional[datetime]:
+    if after is None:
+        after = datetime.now(timezone.utc)
 
-        schedule_added = add_job_schedule(
-            cmd,
-            comment,
+    if offset:
+        next_run_at = get_next_run_at(
             schedule_datetime,
             repeat_frequency,
-            schedule_every if schedule_every else None,
-            schedule_weekdays if schedule_weekdays else None
+            schedule_every,
+            schedule_weekdays,
+            after - offset
         )
-
-        if schedule_added:
-            return True
+        return next_run_at + offset if next_run_at else None
+
+    if schedule_datetime.tzinfo is None:
+        schedule_datetime = schedule_datetime.replace(tzinfo=timezone.utc)
+
+    if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.run_once.name:
+        return schedule_datetime if schedule_datetime > after else None
+
+    start = schedule_datetime.replace(
+        second=0, microsecond=0) - timedelta(seconds=1)
+    base = max(after, start).astimezone(schedule_datetime.tzinfo)
+
+    expression = get_cron_expression(
+        schedule_datetime,
+        repeat_frequency,
+        schedule_every,
+        schedule_weekdays
+    )
+
+    return croniter(expression, base).get_next(datetime)
+
+
+def get_run_times(schedule_datetime: datetime, repeat_frequency: schedule_schema.ScheduleRepeatFrequency, schedule_every: int, schedule_weekdays: List[int], start: datetime, end: datetime, offset: timedelta = timedelta(0)) -> List[datetime]:
+    if offset:
+        return [
+            run_at + offset
+            for run_at in get_run_times(
+                schedule_datetime,
+                repeat_frequency,
+                schedule_every,
+                schedule_weekdays,
+                start - offset,
+                end - offset
+            )
+        ]
+
+    first_run_at = get_next_run_at(
+        schedule_datetime,
+        repeat_frequency,
+        schedule_every,
+        schedule_weekdays,
+        start - timedelta(microseconds=1)
+    )
+    if first_run_at is None or first_run_at > end:
+        return []
+
+    run_times: List[datetime] = [first_run_at]
+
+    if repeat_frequency == schedule_schema.ScheduleRepeatFrequency.run_once.name:
+        return run_times
+
+    iterator = croniter(get_cron_expression(
+        schedule_datetime,
+        repeat_frequency,
+        schedule_every,
+        schedule_weekdays
+    ), first_run_at)
+
+    while True:
+        run_at = iterator.get_next(datetime)
+        if run_at > end:
+            return run_times
+        run_times.append(run_at)
+
+
+def get_schedule_next_run_at(schedule, after: Optional[datetime] = None) -> Optional[datetime]:
+    return get_next_run_at(
+        schedule.start_date_time,
+        schedule.repeat_frequency,
+        schedule.every,
+        schedule.week_days,
+        after,
+        get_schedule_spread_offset(schedule)
+    )
+
+
+def get_schedule_run_times(schedule, start: datetime, end: datetime) -> List[datetime]:
+    return get_run_times(
+        schedule.start_date_time,
+        schedule.repeat_frequency,
+        schedule.every,
+        schedule.week_days,
+        start,
+        end,
+        get_schedule_spread_offset(schedule)
+    )
+
+
+def apply_launch_cap(runs: Iterable[dict[str, Any]], max_launches_per_minute: int) -> list[dict[str, Any]]:
+    if not max_launches_per_minute:
+        return list(runs)
+
+    slots: Dict[int, Tuple[datetime, int]] = {}
+    capped_runs: list[dict[str, Any]] = []
+
+    for run in runs:
+        minute = run["run_at"].replace(second=0, microsecond=0)
+        (slot_minute, slot_launches) = slots.get(run["tower_id"], (None, 0))
+
+        if slot_minute is not None and minute <= slot_minute:
+            if slot_launches < max_launches_per_minute:
+                minute = slot_minute
+                slot_launches += 1
+            else:
+                minute = slot_minute + timedelta(minutes=1)
+                slot_launches = 1
         else:
-            return False
-    except Exception as error:
-        return False
+            slot_launches = 1
 
+        slots[run["tower_id"]] = (minute, slot_launches)
+        capped_runs.append(
+            dict(run, run_at=max(run["run_at"], minute)))
 
-def add_crontab_schedule_project(token: str, schedule_datetime: datetime, repeat_frequency: schedule_schema.ScheduleRepeatFrequency, schedule_every: int, schedule_weekdays: List[int], comment: str, project_id) -> bool:
-    try:
-        cmd = f"curl -X PUT -H 'Content-Type: application/json' -H 'Authorization: Bearer {token}' 127.0.0.1:8000/api/projects/{project_id}/repo"
+    return sorted(capped_runs, key=lambda run: run["run_at"])
 
-        schedule_added = add_job_schedule(
-            cmd,
-            comment,
-            schedule_datetime,
-            repeat_frequency,
-            schedule_every if schedule_every else None,
-            schedule_weekdays if schedule_weekdays else None
+
+def get_load_histogram(runs: Iterable[Tuple[int, datetime]], bucket_minutes: int) -> list[dict[str, Any]]:
+    bucket_seconds = bucket_minutes * 60
+    load: Counter = Counter()
+
+    for (tower_id, run_at) in runs:
+        bucket = int(run_at.timestamp()) // bucket_seconds * bucket_seconds
+        load[(tower_id, bucket)] += 1
+
+    return [
+        dict(
+            tower_id=tower_id,
+            bucket=datetime.fromtimestamp(bucket, timezone.utc),
+            runs=runs_count
         )
+        for ((tower_id, bucket), runs_count) in sorted(load.items())
+    ]
 
-        if schedule_added:
-            return True
-        else:
-            return False
+
+class CrontabEntries:
+    def __init__(self, user=True):
+        self.user = user
+        self.cron = CronTab(user=user)
+        self.cron.env['SHELL'] = '/bin/bash'
+        self.jobs_by_comment: Dict[str, List[Any]] = defaultdict(list)
+        self._removed: Set[int] = set()
+
+        for job in self.cron:
+            if job.comment:
+                self.jobs_by_comment[job.comment].append(job)
+
+    def remove(self, comments: Iterable[str]) -> int:
+        removed = 0
+
+        for comment in comments:
+            for job in self.jobs_by_comment.pop(comment, []):
+                self._removed.add(id(job))
+                removed += 1
+
+        return removed
+
+    def write(self) -> None:
+        if not self._removed:
+            return
+
+        self.cron.crons[:] = [
+            job for job in self.cron.crons if id(job) not in self._removed]
+        self.cron.lines[:] = [
+            line for line in self.cron.lines if id(line) not in self._removed]
+
+        self.cron.write_to_user(user=self.user)
+        self._removed = set()
+
+
+def remove_job_schedules(resource_schedules: Any | list | None) -> bool:
+    try:
+        crontab_entries = CrontabEntries()
+
+        crontab_entries.remove(
+            resource_schedule.cron_job_id for resource_schedule in resource_schedules)
+        crontab_entries.write()
+        return True
     except Exception as error:
         return False
 
 
-def add_crontab_schedule_inventory(token: str, schedule_datetime: datetime, repeat_frequency: schedule_schema.ScheduleRepeatFrequency, schedule_every: int, schedule_weekdays: List[int], comment: str, inventory_id) -> bool:
+def get_job_schedule_info(resource_schedules: Any | list | None) -> list[dict[str, Any]] | None:
     try:
-        cmd = f"curl -X PUT -H 'Content-Type: application/json' -H 'Authorization: Bearer {token}' 127.0.0.1:8000/api/inventories/{inventory_id}/sync"
+        cron = CronTab(tab='')
 
-        schedule_added = add_job_schedule(
-            cmd,
-            comment,
-            schedule_datetime,
-            repeat_frequency,
-            schedule_every if schedule_every else None,
-            schedule_weekdays if schedule_weekdays else None
-        )
+        schedule_info_response: list[dict[str, Any]] = []
 
-        if schedule_added:
-            return True
-        else:
-            return False
+        for resource_schedule in resource_schedules:
+            schedule = resource_schedule.schedule
+
+            job = cron.new(
+                command='true',
+                comment=resource_schedule.cron_job_id
+            )
+            job.setall(get_cron_expression(
+                schedule.start_date_time,
+                schedule.repeat_frequency,
+                schedule.every,
+                schedule.week_days
+            ))
+
+            schedule_info: dict[str, Any] = dict(
+                cron_job_id=resource_schedule.cron_job_id,
+                frequency=job.frequency(),
+                frequency_per_hour=job.frequency_per_hour(),
+                frequency_per_day=job.frequency_per_day(),
+                frequency_per_year=job.frequency_per_year(),
+                prev_date=resource_schedule.last_run_at,
+                next_date=resource_schedule.next_run_at
+            )
+            schedule_info_response.append(schedule_info)
+        return schedule_info_response
     except Exception as error:
-        return False
+        return None
@@ -1,274 +1,395 @@
-from paramiko import SSHClient, AutoAddPolicy
+import re
+from codecs import getincrementaldecoder
+from hashlib import sha256
+from time import sleep
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+from paramiko import HostKeys
 from app.utils.get_project_name_url import get_project_name_from_git_url
 from app.utils.remove_whitespaces import remove_whitespaces_add_dashes
+from app.services.tower.connection_pool import ssh_pool
 from app.schemas import job_schema, template_schema, host_schema
 
+OUTPUT_CHUNK_SIZE = 32768
+OUTPUT_POLL_INTERVAL = 0.1
+KEYSCAN_TIMEOUT = 5
+DYNAMIC_INVENTORY_SCRIPT = """#!/usr/bin/env python3
+import hashlib
+import json
+import os
+import sys
+import urllib.error
+import urllib.request
+
+if "--host" in sys.argv:
+    print("{}")
+    sys.exit(0)
+
+url = os.environ["INVENTORY_URL"]
+cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".inventory-cache")
+cache_path = os.path.join(cache_dir, hashlib.sha256(url.encode("utf-8")).hexdigest())
+with open(os.environ["INVENTORY_TOKEN_FILE"]) as token_file:
+    headers = {"Authorization": "Bearer " + token_file.read().strip()}
+cached = None
+
+if os.path.exists(cache_path):
+    with open(cache_path) as cache_file:
+        cached = json.load(cache_file)
+    headers["If-None-Match"] = cached["etag"]
+
+try:
+    with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30) as response:
+        content = response.read().decode("utf-8")
+        etag = response.headers.get("ETag")
+except urllib.error.HTTPError as error:
+    if error.code != 304 or cached is None:
+        raise
+    content = cached["content"]
+    etag = None
+
+if etag:
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path + ".tmp", "w") as cache_file:
+        json.dump(dict(etag=etag, content=content), cache_file)
+    os.replace(cache_path + ".tmp", cache_path)
+
+sys.stdout.write(content)
+"""
+
+DYNAMIC_INVENTORY_SCRIPT_HASH = sha256(
+    DYNAMIC_INVENTORY_SCRIPT.encode("utf8")).hexdigest()
+
+
+def check_host_connection(hostname, port, username, password, timeout: int, tower_id: Optional[int] = None) -> bool:
+    try:
+        with ssh_pool.connection(hostname, port, username, password, timeout, tower_id) as ssh_client:
+            return True
+    except Exception as error:
+        return False
 
-def check_host_connection(hostname, port, username, password, timeout: int) -> bool:
-    ssh_client = SSHClient()
 
+def install_tower_services(hostname, port, username, password, timeout: int, tower_id: Optional[int] = None) -> bool:
     try:
-        ssh_client.set_missing_host_key_policy(AutoAddPolicy())
-        ssh_client.load_system_host_keys()
+        with ssh_pool.connection(hostname, port, username, password, timeout, tower_id) as ssh_client:
+            (stdin, stdout, stderr) = ssh_client.exec_command(
+                "sudo -S dnf install -y python3 ansible git-all")
 
-        ssh_client.connect(hostname=hostname, port=port,
-                           username=username, password=password, timeout=timeout)
+            stdin.write(password + '\n')
+            stdin.flush()
 
-        return True
+            cmd_output = stdout.read().decode("utf8")
+            cmd_output_error = stderr.read().decode("utf8")
+
+            if not cmd_output_error or "[sudo]" in cmd_output_error:
+                return True
+            else:
+                return False
     except Exception as error:
         return False
-    finally:
-        ssh_client.close()
 
 
-def install_tower_services(hostname, port, username, password, timeout: int) -> bool:
-    ssh_client = SSHClient()
-
+def prepare_utils_directory(add_schedule_file: str, hostname, port, username, password, timeout: int, tower_id: Optional[int] = None) -> bool:
     try:
-        ssh_client.set_missing_host_key_policy(AutoAddPolicy())
-        ssh_client.load_system_host_keys()
-        ssh_client.connect(hostname=hostname, port=port,
-                           username=username, password=password, timeout=timeout)
+        with ssh_pool.connection(hostname, port, username, password, timeout, tower_id) as ssh_client:
+            (stdin, stdout, stderr) = ssh_client.exec_command(
+                f"mkdir utils;mkdir utils/logs;python3 -m venv utils/venv;source utils/venv/bin/activate;pip install python-crontab"
+            )
 
-        (stdin, stdout, stderr) = ssh_client.exec_command(
-            "sudo -S dnf install -y python3 ansible git-all")
+            cmd_output = stdout.read().decode("utf8")
+            cmd_output_error = stderr.read().decode("utf8")
 
-        stdin.write(password + '\n')
-        stdin.flush()
+            if (not cmd_output or "Successfully installed" in cmd_output or "Requirement already satisfied" in cmd_output) and (not cmd_output_error or "File exists" in cmd_output_error or "WARNING" in cmd_output_error):
+                (added_file_stdin, added_file_stdout, added_file_stderr) = ssh_client.exec_command(
+                    f"tee ~/utils/add_schedule.py <<-EOF {add_schedule_file}"
+                )
 
-        cmd_output = stdout.read().decode("utf8")
-        cmd_output_error = stderr.read().decode("utf8")
+                added_file_cmd_output = added_file_stdout.read().decode("utf8")
+                added_file_cmd_output_error = added_file_stderr.read().decode("utf8")
 
-        if not cmd_output_error or "[sudo]" in cmd_output_error:
-            return True
-        else:
-            return False
+                if add_schedule_file.strip() in added_file_cmd_output and (not added_file_cmd_output_error or "File exists" in added_file_cmd_output_error or 'desejado "EOF"' in added_file_cmd_output_error or "wanted `EOF'" in added_file_cmd_output_error):
+                    return True
+                else:
+                    return False
+            else:
+                return False
     except Exception as error:
         return False
-    finally:
-        ssh_client.close()
-
 
-def prepare_utils_directory(add_schedule_file: str, hostname, port, username, password, timeout: int) -> bool:
-    ssh_client = SSHClient()
 
+def create_tower_directory(company_name, hostname, port, username, password, timeout: int, tower_id: Optional[int] = None) -> bool:
     try:
-        ssh_client.set_missing_host_key_policy(AutoAddPolicy())
-        ssh_client.load_system_host_keys()
-
-        ssh_client.connect(hostname=hostname, port=port,
-                           username=username, password=password, timeout=timeout)
-
-        (stdin, stdout, stderr) = ssh_client.exec_command(
-            f"mkdir utils;mkdir utils/logs;python3 -m venv utils/venv;source utils/venv/bin/activate;pip install python-crontab"
-        )
+        with ssh_pool.connection(hostname, port, username, password, timeout, tower_id) as ssh_client:
+            company = remove_whitespaces_add_dashes(company_name)
 
-        cmd_output = stdout.read().decode("utf8")
-        cmd_output_error = stderr.read().decode("utf8")
-
-        if (not cmd_output or "Successfully installed" in cmd_output or "Requirement already satisfied" in cmd_output) and (not cmd_output_error or "File exists" in cmd_output_error or "WARNING" in cmd_output_error):
-            (added_file_stdin, added_file_stdout, added_file_stderr) = ssh_client.exec_command(
-                f"tee ~/utils/add_schedule.py <<-EOF {add_schedule_file}"
+            (stdin, stdout, stderr) = ssh_client.exec_command(
+                f"mkdir {company}"
             )
 
-            added_file_cmd_output = added_file_stdout.read().decode("utf8")
-            added_file_cmd_output_error = added_file_stderr.read().decode("utf8")
+            cmd_output = stdout.read().decode("utf8")
+            cmd_output_error = stderr.read().decode("utf8")
 
-            if add_schedule_file.strip() in added_file_cmd_output and (not added_file_cmd_output_error or "File exists" in added_file_cmd_output_error or 'desejado "EOF"' in added_file_cmd_output_error or "wanted `EOF'" in added_file_cmd_output_error):
+            if not cmd_output and (not cmd_output_error or "File exists" in cmd_output_error):
                 return True
             else:
                 return False
-        else:
-            return False
     except Exception as error:
         return False
-    finally:
-        ssh_client.close()
 
 
-def create_tower_directory(company_name, hostname, port, username, password, timeout: int) -> bool:
-    ssh_client = SSHClient()
-
+def update_company_name(old_company_name, company_name, hostname, port, username, password, timeout: int, tower_id: Optional[int] = None) -> bool:
     try:
-        ssh_client.set_missing_host_key_policy(AutoAddPolicy())
-        ssh_client.load_system_host_keys()
+        with ssh_pool.connection(hostname, port, username, password, timeout, tower_id) as ssh_client:
+            old_company = remove_whitespaces_add_dashes(old_company_name)
+            company = remove_whitespaces_add_dashes(company_name)
 
-        ssh_client.connect(hostname=hostname, port=port,
-                           username=username, password=password, timeout=timeout)
+            (stdin, stdout, stderr) = ssh_client.exec_command(
+                f"mv {old_company} {company}"
+            )
 
-        company = remove_whitespaces_add_dashes(company_name)
+            cmd_output = stdout.read().decode("utf8")
+            cmd_output_error = stderr.read().decode("utf8")
 
-        (stdin, stdout, stderr) = ssh_client.exec_command(
-            f"mkdir {company}"
-        )
+            if not cmd_output and (not cmd_output_error or "File exists" in cmd_output_error):
+                return True
+            else:
+                return False
+    except Exception as error:
+        return False
 
-        cmd_output = stdout.read().decode("utf8")
-        cmd_output_error = stderr.read().decode("utf8")
 
-        if not cmd_output and (not cmd_output_error or "File exists" in cmd_output_error):
-            return True
-        else:
-            return False
-    except Exception as error:
+def add_host_fingerprint(host_ipv4, hostname, port, username, password, timeout: int, tower_id: Optional[int] = None) -> host_schema.HostStatus:
+    hosts_status = add_hosts_fingerprints(
+        [host_ipv4], hostname, port, username, password, timeout, tower_id)
+    if not hosts_status:
         return False
-    finally:
-        ssh_client.close()
 
+    return hosts_status[host_ipv4]
 
-def update_company_name(old_company_name, company_name, hostname, port, username, password, timeout: int) -> bool:
-    ssh_client = SSHClient()
 
+def add_hosts_fingerprints(hosts_ipv4: List[str], hostname, port, username, password, timeout: int, tower_id: Optional[int] = None) -> Dict[str, host_schema.HostStatus]:
     try:
-        ssh_client.set_missing_host_key_policy(AutoAddPolicy())
-        ssh_client.load_system_host_keys()
+        hosts_ipv4 = list(dict.fromkeys(hosts_ipv4))
 
-        ssh_client.connect(hostname=hostname, port=port,
-                           username=username, password=password, timeout=timeout)
+        with ssh_pool.connection(hostname, port, username, password, timeout, tower_id) as ssh_client:
+            (get_keys_stdin, get_keys_stdout, get_keys_stderr) = ssh_client.exec_command(
+                f"ssh-keyscan -T {KEYSCAN_TIMEOUT} -f -"
+            )
 
-        old_company = remove_whitespaces_add_dashes(old_company_name)
-        company = remove_whitespaces_add_dashes(company_name)
+            get_keys_stdin.write("\n".join(hosts_ipv4) + "\n")
+            get_keys_stdin.flush()
+            get_keys_stdin.channel.shutdown_write()
 
-        (stdin, stdout, stderr) = ssh_client.exec_command(
-            f"mv {old_company} {company}"
-        )
+            get_keys_cmd_output = get_keys_stdout.read().decode("utf8")
+            get_keys_cmd_output_error = get_keys_stderr.read().decode("utf8")
 
-        cmd_output = stdout.read().decode("utf8")
-        cmd_output_error = stderr.read().decode("utf8")
+            scanned_keys: Dict[str, List[Tuple[str, str]]] = {}
+            for line in get_keys_cmd_output.splitlines():
+                fields = line.split()
+                if len(fields) < 3 or line.startswith("#"):
+                    continue
+                scanned_keys.setdefault(fields[0], []).append(
+                    (fields[1], fields[2]))
 
-        if not cmd_output and (not cmd_output_error or "File exists" in cmd_output_error):
-            return True
-        else:
-            return False
+            (known_hosts_stdin, known_hosts_stdout, known_hosts_stderr) = ssh_client.exec_command(
+                "mkdir -p ~/.ssh && chmod 700 ~/.ssh && touch ~/.ssh/known_hosts && cat ~/.ssh/known_hosts"
+            )
+
+            known_hosts = known_hosts_stdout.read().decode("utf8")
+            known_hosts_error = known_hosts_stderr.read().decode("utf8")
+            if known_hosts_stdout.channel.recv_exit_status() != 0:
+                return False
+
+            known_entries: Dict[Tuple[str, str], List[str]] = {}
+            for line in known_hosts.splitlines():
+                fields = line.split()
+                if len(fields) < 3 or line.startswith("#"):
+                    continue
+                known_entries.setdefault(
+                    (fields[-2], fields[-1]), []).append(fields[-3])
+
+            new_lines = []
+            for host_ipv4, keys in scanned_keys.items():
+                for (key_type, key) in keys:
+                    if not any(is_known_host(host_ipv4, host_field) for host_field in known_entries.get((key_type, key), [])):
+                        new_lines.append(
+                            f"{HostKeys.hash_host(host_ipv4)} {key_type} {key}")
+
+            is_written = True
+            if new_lines:
+                is_written = write_known_hosts(
+                    ssh_client, known_hosts, new_lines)
+
+            hosts_status: Dict[str, host_schema.HostStatus] = {}
+            for host_ipv4 in hosts_ipv4:
+                if host_ipv4 in scanned_keys:
+                    hosts_status[host_ipv4] = host_schema.HostStatus.successful if is_written else host_schema.HostStatus.failed
+                elif any(re.search(rf"(?<![\d.]){re.escape(host_ipv4)}(?!\d)", line) and not line.startswith("#") and 'No route to host' not in line for line in get_keys_cmd_output_error.splitlines()):
+                    hosts_status[host_ipv4] = host_schema.HostStatus.failed
+                else:
+                    hosts_status[host_ipv4] = host_schema.HostStatus.unreachable
+
+            return hosts_status
     except Exception as error:
         return False
-    finally:
-        ssh_client.close()
 
 
-def add_host_fingerprint(host_ipv4, hostname, port, username, password, timeout: int) -> host_schema.HostStatus:
-    ssh_client = SSHClient()
+def is_known_host(host_ipv4: str, host_field: str) -> bool:
+    if host_field.startswith("|1|"):
+        return HostKeys.hash_host(host_ipv4, host_field) == host_field
 
-    try:
-        ssh_client.set_missing_host_key_policy(AutoAddPolicy())
-        ssh_client.load_system_host_keys()
+    return host_ipv4 in host_field.split(",")
 
-        ssh_client.connect(hostname=hostname, port=port,
-                           username=username, password=password, timeout=timeout)
 
-        (get_key_stdin, get_key_stdout, get_key_stderr) = ssh_client.exec_command(
-            f"ssh-keyscan -H {host_ipv4}"
-        )
+def write_known_hosts(ssh_client, known_hosts: str, new_lines: List[str]) -> bool:
+    temporary_path = f".ssh/known_hosts.{uuid4().hex}"
 
-        get_key_cmd_output = get_key_stdout.read().decode("utf8")
-        get_key_cmd_output_error = get_key_stderr.read().decode("utf8")
+    content = known_hosts
+    if content and not content.endswith("\n"):
+        content += "\n"
+    content += "\n".join(new_lines) + "\n"
 
-        if not get_key_cmd_output and (not get_key_cmd_output_error or 'No route to host' in get_key_cmd_output_error):
-            return host_schema.HostStatus.unreachable
+    with ssh_client.open_sftp() as sftp_client:
+        try:
+            with sftp_client.open(temporary_path, "w") as known_hosts_file:
+                known_hosts_file.write(content)
+            sftp_client.chmod(temporary_path, 0o600)
+            sftp_client.posix_rename(temporary_path, ".ssh/known_hosts")
+        except Exception as error:
+            try:
+                sftp_client.remove(temporary_path)
+            except Exception:
+                pass
+            return False
 
-        if get_key_cmd_output:
-            (check_key_stdin, check_key_stdout, check_key_stderr) = ssh_client.exec_command(
-                f"grep '{get_key_cmd_output}' ~/.ssh/known_hosts"
-            )
+    return True
 
-            check_key_cmd_output = check_key_stdout.read().decode("utf8")
-            check_key_cmd_output_error = check_key_stderr.read().decode("utf8")
 
-            if not check_key_cmd_output:
-                (write_key_stdin, write_key_stdout, write_key_stderr) = ssh_client.exec_command(
-                    f"echo '{get_key_cmd_output.strip()}' >> ~/.ssh/known_hosts"
-                )
+def delete_host_fingerprint(host_ipv4, hostname, port, username, password, timeout: int, tower_id: Optional[int] = None) -> bool:
+    try:
+        with ssh_pool.connection(hostname, port, username, password, timeout, tower_id) as ssh_client:
+            (stdin, stdout, stderr) = ssh_client.exec_command(
+                f"ssh-keygen -R {host_ipv4}"
+            )
 
-                write_key_cmd_output = write_key_stdout.read().decode("utf8")
-                write_key_cmd_output_error = write_key_stderr.read().decode("utf8")
+            cmd_output = stdout.read().decode("utf8")
+            cmd_output_error = stderr.read().decode("utf8")
 
-                if not write_key_cmd_output and not write_key_cmd_output_error:
-                    return host_schema.HostStatus.successful
-                else:
-                    return host_schema.HostStatus.failed
+            if "known_hosts updated" in cmd_output and (not cmd_output_error or "not found in" in cmd_output_error or "No such file or directory" in cmd_output_error):
+                return True
+            elif not cmd_output and "not found in" in cmd_output_error:
+                return True
             else:
-                return host_schema.HostStatus.successful
-        else:
-            return host_schema.HostStatus.failed
+                return False
     except Exception as error:
         return False
-    finally:
-        ssh_client.close()
 
 
-def delete_host_fingerprint(host_ipv4, hostname, port, username, password, timeout: int) -> bool:
-    ssh_client = SSHClient()
+def upload_dynamic_inventory_script(ssh_client, script_path: str) -> None:
+    with ssh_client.open_sftp() as sftp_client:
+        try:
+            with sftp_client.open(script_path, "rb") as remote_file:
+                if sha256(remote_file.read()).hexdigest() == DYNAMIC_INVENTORY_SCRIPT_HASH:
+                    return
+        except IOError:
+            pass
 
-    try:
-        ssh_client.set_missing_host_key_policy(AutoAddPolicy())
-        ssh_client.load_system_host_keys()
+        temporary_path = f"{script_path}.{uuid4().hex}.tmp"
 
-        ssh_client.connect(hostname=hostname, port=port,
-                           username=username, password=password, timeout=timeout)
+        with sftp_client.open(temporary_path, "w") as remote_file:
+            remote_file.write(DYNAMIC_INVENTORY_SCRIPT)
+        sftp_client.chmod(temporary_path, 0o700)
+        sftp_client.posix_rename(temporary_path, script_path)
 
-        (stdin, stdout, stderr) = ssh_client.exec_command(
-            f"ssh-keygen -R {host_ipv4}"
-        )
 
-        cmd_output = stdout.read().decode("utf8")
-        cmd_output_error = stderr.read().decode("utf8")
+def upload_inventory_token(ssh_client, token_path: str, inventory_token: str) -> None:
+    with ssh_client.open_sftp() as sftp_client:
+        with sftp_client.open(token_path, "w") as remote_file:
+            remote_file.chmod(0o600)
+            remote_file.write(inventory_token)
 
-        if "known_hosts updated" in cmd_output and (not cmd_output_error or "not found in" in cmd_output_error or "No such file or directory" in cmd_output_error):
-            return True
-        elif not cmd_output and "not found in" in cmd_output_error:
-            return True
-        else:
-            return False
-    except Exception as error:
-        return False
-    finally:
-        ssh_client.close()
 
+def remove_inventory_token(ssh_client, token_path: str) -> None:
+    with ssh_client.open_sftp() as sftp_client:
+        try:
+            sftp_client.remove(token_path)
+        except IOError:
+            pass
 
-def launch_jobs(template_organization_name, template_project_source_control_url, template_playbook_name, template_inventory_file, template_privilege_escalation, template_forks, template_verbosity, template_launch_type, template_extra_vars, template_credential_username, template_credential_password, company_name, hostname, port, username, password, timeout: int) -> str:
-    ssh_client = SSHClient()
 
+def launch_jobs(template_organization_name, template_project_source_control_url, template_playbook_name, template_inventory_file, template_privilege_escalation, template_forks, template_verbosity, template_launch_type, template_extra_vars, template_credential_username, template_credential_password, on_output: Callable[[str], None], company_name, hostname, port, username, password, timeout: int, tower_id: Optional[int] = None, inventory_url: Optional[str] = None, inventory_token: Optional[str] = None) -> job_schema.JobStatus:
     try:
-        ssh_client.set_missing_host_key_policy(AutoAddPolicy())
-        ssh_client.load_system_host_keys()
-        ssh_client.connect(hostname=hostname, port=port,
-                           username=username, password=password, timeout=timeout)
-
-        company = remove_whitespaces_add_dashes(company_name)
-        organization = remove_whitespaces_add_dashes(
-            template_organization_name)
-        project = get_project_name_from_git_url(
-            template_project_source_control_url)
-        inventory_file_name = remove_whitespaces_add_dashes(
-            template_inventory_file)
-
-        cmd = f"ansible-playbook {company}/{organization}/projects/{project}/{template_playbook_name} -i {company}/{organization}/inventories/{inventory_file_name} -u {template_credential_username} -K"
-
-        if template_privilege_escalation:
-            cmd += f" -b"
-        if template_forks:
-            cmd += f" -f {template_forks}"
-        if template_verbosity and template_verbosity != template_schema.Verbosity.zero:
-            cmd += f" -{template_verbosity}"
-        if template_launch_type == template_schema.LaunchType.check:
-            cmd += f" -C"
-        if template_extra_vars:
-            cmd += f" -e 'ansible_password={template_credential_password} {template_extra_vars}'"
-        else:
-            cmd += f" -e 'ansible_password={template_credential_password}'"
-
-        (stdin, stdout, stderr) = ssh_client.exec_command(cmd)
-
-        stdin.write(template_credential_password + '\n')
-        stdin.flush()
-
-        cmd_output = stdout.read().decode("utf8")
-        cmd_output_error = stderr.read().decode("utf8")
-
-        if cmd_output and (not cmd_output_error or "Can not control echo on the terminal" in cmd_output_error or "DEPRECATION WARNING" in cmd_output_error):
-            return cmd_output
-        else:
-            return job_schema.JobStatus.failed
+        with ssh_pool.connection(hostname, port, username, password, timeout, tower_id) as ssh_client:
+            company = remove_whitespaces_add_dashes(company_name)
+            organization = remove_whitespaces_add_dashes(
+                template_organization_name)
+            project = get_project_name_from_git_url(
+                template_project_source_control_url)
+            inventory_file_name = remove_whitespaces_add_dashes(
+                template_inventory_file)
+
+            token_path = None
+
+            if inventory_url and inventory_token:
+                inventory_path = f"{company}/dynamic_inventory.py"
+                token_path = f"{company}/.inventory-token-{uuid4().hex}"
+                upload_dynamic_inventory_script(ssh_client, inventory_path)
+                cmd = f"INVENTORY_URL='{inventory_url}' INVENTORY_TOKEN_FILE='{token_path}' ansible-playbook {company}/{organization}/projects/{project}/{template_playbook_name} -i {inventory_path} -u {template_credential_username} -K"
+            else:
+                cmd = f"ansible-playbook {company}/{organization}/projects/{project}/{template_playbook_name} -i {company}/{organization}/inventories/{inventory_file_name} -u {template_credential_username} -K"
+
+            if template_privilege_escalation:
+                cmd += f" -b"
+            if template_forks:
+                cmd += f" -f {template_forks}"
+            if template_verbosity and template_verbosity != template_schema.Verbosity.zero:
+                cmd += f" -{template_verbosity}"
+            if template_launch_type == template_schema.LaunchType.check:
+                cmd += f" -C"
+            if template_extra_vars:
+                cmd += f" -e 'ansible_password={template_credential_password} {template_extra_vars}'"
+            else:
+                cmd += f" -e 'ansible_password={template_credential_password}'"
+
+            try:
+                if token_path:
+                    upload_inventory_token(
+                        ssh_client, token_path, inventory_token)
+
+                (stdin, stdout, stderr) = ssh_client.exec_command(cmd)
+
+                stdin.write(template_credential_password + '\n')
+                stdin.flush()
+
+                channel = stdout.channel
+                output_decoder = getincrementaldecoder("utf8")(errors="replace")
+                cmd_output_received: bool = False
+                cmd_output_error: str = ""
+
+                while True:
+                    if channel.recv_ready():
+                        chunk = output_decoder.decode(
+                            channel.recv(OUTPUT_CHUNK_SIZE))
+                        if chunk:
+                            cmd_output_received = True
+                            on_output(chunk)
+                    elif channel.recv_stderr_ready():
+                        cmd_output_error += channel.recv_stderr(
+                            OUTPUT_CHUNK_SIZE).decode("utf8", errors="replace")
+                    elif channel.exit_status_ready():
+                        break
+                    else:
+                        sleep(OUTPUT_POLL_INTERVAL)
+
+                chunk = output_decoder.decode(b"", final=True)
+                if chunk:
+                    on_output(chunk)
+
+                if cmd_output_received and (not cmd_output_error or "Can not control echo on the terminal" in cmd_output_error or "DEPRECATION WARNING" in cmd_output_error):
+                    return job_schema.JobStatus.successful
+                else:
+                    return job_schema.JobStatus.failed
+            finally:
+                if token_path:
+                    remove_inventory_token(ssh_client, token_path)
     except Exception as error:
         return False
-    finally:
-        ssh_client.close()
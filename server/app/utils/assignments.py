@@ -0,0 +1,65 @@
+from typing import Any, List, Tuple
+from sqlalchemy import delete, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models import user_model, user_team_model
+
+
+def insert_assignments(db: Session, target_column: Any, target_id: int, members_column: Any, members_ids: List[int]) -> List[int]:
+    members_ids = list(dict.fromkeys(members_ids))
+    if not members_ids:
+        return []
+
+    inserted_members_ids = set(db.execute(
+        insert(
+            target_column.class_
+        ).values(
+            [{members_column.key: member_id, target_column.key: target_id}
+             for member_id in members_ids]
+        ).on_conflict_do_nothing(
+        ).returning(
+            members_column
+        )
+    ).scalars().all())
+
+    return [member_id for member_id in members_ids if member_id in inserted_members_ids]
+
+
+def insert_teams_users_assignments(db: Session, target_column: Any, target_id: int, users_column: Any, teams_ids: List[int], tower_id: int) -> List[int]:
+    if not teams_ids:
+        return []
+
+    return db.execute(
+        insert(
+            target_column.class_
+        ).from_select(
+            [users_column.key, target_column.key],
+            select(
+                user_team_model.UserTeam.user_id,
+                literal(target_id)
+            ).join(
+                user_model.User, user_model.User.id == user_team_model.UserTeam.user_id
+            ).where(
+                user_model.User.tower_id == tower_id,
+                user_team_model.UserTeam.team_id.in_(teams_ids)
+            ).distinct()
+        ).on_conflict_do_nothing(
+        ).returning(
+            users_column
+        )
+    ).scalars().all()
+
+
+def replace_assignments(db: Session, target_column: Any, target_id: int, members_column: Any, members_ids: List[int]) -> Tuple[List[int], List[int]]:
+    removed_members_ids = db.execute(
+        delete(
+            target_column.class_
+        ).where(
+            target_column == target_id,
+            members_column.notin_(members_ids)
+        ).returning(
+            members_column
+        )
+    ).scalars().all()
+
+    return (insert_assignments(db, target_column, target_id, members_column, members_ids), removed_members_ids)
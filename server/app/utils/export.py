@@ -0,0 +1,90 @@
+import csv
+from datetime import datetime
+from io import StringIO
+from typing import Any, Iterable, Iterator, List, Tuple
+import orjson
+from fastapi.responses import StreamingResponse
+from app.schemas import common_schema
+from app.utils.row_serializer import RowLayout, get_row_layout, serialize_row
+
+EXPORT_BATCH_SIZE = 1000
+
+MEDIA_TYPES = {
+    common_schema.ExportFormat.ndjson: "application/x-ndjson",
+    common_schema.ExportFormat.csv: "text/csv"
+}
+
+
+def get_csv_columns(layout: RowLayout, prefix: str = "") -> List[Tuple[str, int]]:
+    columns: List[Tuple[str, int]] = []
+
+    for (name, index, nested_layout) in layout:
+        if nested_layout is None:
+            columns.append((f"{prefix}{name}", index))
+        else:
+            columns += get_csv_columns(nested_layout, f"{prefix}{name}.")
+
+    return columns
+
+
+def format_csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+
+    if isinstance(value, datetime):
+        return value.isoformat()
+
+    if isinstance(value, (list, dict)):
+        return orjson.dumps(value).decode("utf-8")
+
+    return value
+
+
+def iterate_ndjson(rows: Iterable[Any], layout: RowLayout) -> Iterator[bytes]:
+    lines: List[bytes] = []
+
+    for row in rows:
+        lines.append(orjson.dumps(serialize_row(row, layout)))
+
+        if len(lines) >= EXPORT_BATCH_SIZE:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+
+def iterate_csv(rows: Iterable[Any], layout: RowLayout) -> Iterator[str]:
+    columns = get_csv_columns(layout)
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow([name for (name, index) in columns])
+
+    for (count, row) in enumerate(rows, 1):
+        writer.writerow([format_csv_value(row[index])
+                        for (name, index) in columns])
+
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
+
+
+def get_export_response(query, model, schema, export_format: common_schema.ExportFormat, filename: str) -> StreamingResponse:
+    (columns, joins, layout) = get_row_layout(model, schema)
+    rows = query.yield_per(EXPORT_BATCH_SIZE)
+
+    if export_format == common_schema.ExportFormat.csv:
+        content = iterate_csv(rows, layout)
+    else:
+        content = iterate_ndjson(rows, layout)
+
+    return StreamingResponse(
+        content,
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'}
+    )
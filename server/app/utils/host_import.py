@@ -0,0 +1,438 @@
+import csv
+import re
+import shlex
+from ipaddress import IPv4Address
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+import yaml
+from sqlalchemy import bindparam, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models import group_host_model, group_model, host_model, user_group_model, user_host_model
+from app.schemas import host_schema
+from app.utils.inventory_changes import mark_inventories_changed
+
+IMPORT_BATCH_SIZE = 1000
+
+MAX_HOST_RANGE_SIZE = 4096
+
+INI_HOST_RANGE = re.compile(r"^(.*)\[(\d+):(\d+)\](.*)$")
+
+UNGROUPED_GROUPS = ("all", "ungrouped")
+
+IMPORT_FORMATS_BY_EXTENSION = {
+    "ini": host_schema.HostImportFormat.ini,
+    "cfg": host_schema.HostImportFormat.ini,
+    "hosts": host_schema.HostImportFormat.ini,
+    "yml": host_schema.HostImportFormat.yaml,
+    "yaml": host_schema.HostImportFormat.yaml,
+    "csv": host_schema.HostImportFormat.csv
+}
+
+
+def get_import_format(filename: Optional[str]) -> host_schema.HostImportFormat:
+    extension = (filename or "").rpartition(".")[2].lower()
+
+    return IMPORT_FORMATS_BY_EXTENSION.get(extension, host_schema.HostImportFormat.ini)
+
+
+def get_import_record(row: int, hostname: Optional[str], ipv4: Optional[str], description: Optional[str], groups: List[str]) -> Dict[str, Any]:
+    record = dict(
+        row=row,
+        hostname=hostname,
+        ipv4=ipv4,
+        description=description or None,
+        groups=list(dict.fromkeys(group for group in groups if group)),
+        detail=None
+    )
+
+    if not hostname:
+        record["detail"] = "Missing hostname"
+        return record
+
+    try:
+        IPv4Address(ipv4 or "")
+    except ValueError:
+        record["detail"] = f"Invalid ipv4 {ipv4}" if ipv4 else "Missing ipv4"
+
+    return record
+
+
+def expand_host_range(name: str) -> List[str]:
+    host_range = INI_HOST_RANGE.match(name)
+
+    if not host_range:
+        return [name]
+
+    (prefix, start, end, suffix) = host_range.groups()
+
+    if not 0 <= int(end) - int(start) < MAX_HOST_RANGE_SIZE:
+        raise ValueError(
+            f"Host range {name} must expand to between 1 and {MAX_HOST_RANGE_SIZE} hosts")
+
+    return [f"{prefix}{str(number).zfill(len(start))}{suffix}"
+            for number in range(int(start), int(end) + 1)]
+
+
+def parse_ini_inventory(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    groups: List[str] = []
+    is_hosts_section = True
+
+    for (row, line) in enumerate(lines, 1):
+        line = line.strip()
+
+        if not line or line.startswith(("#", ";")):
+            continue
+
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1].strip()
+            is_hosts_section = ":" not in section
+            groups = [] if section in UNGROUPED_GROUPS else [section]
+            continue
+
+        if not is_hosts_section:
+            continue
+
+        try:
+            fields = shlex.split(line, comments=True)
+        except ValueError as error:
+            yield get_import_record(row, None, None, None, groups) | dict(detail=f"Invalid line: {error}")
+            continue
+
+        variables = dict(field.split("=", 1) for field in fields[1:] if "=" in field)
+
+        try:
+            names = expand_host_range(fields[0])
+        except ValueError as error:
+            yield get_import_record(row, fields[0], None, None, groups) | dict(detail=str(error))
+            continue
+
+        for name in names:
+            yield get_import_record(row, name, variables.get("ansible_host", name), None, groups)
+
+
+def parse_yaml_inventory(stream: TextIO) -> Iterator[Dict[str, Any]]:
+    try:
+        document = yaml.compose(stream, Loader=yaml.SafeLoader)
+    except yaml.YAMLError as error:
+        yield get_yaml_error_record(error)
+        return
+
+    if not isinstance(document, yaml.MappingNode):
+        yield get_import_record(1, None, None, None, []) | dict(detail="Invalid YAML inventory")
+        return
+
+    loader = yaml.SafeLoader("")
+
+    try:
+        loader.flatten_mapping(document)
+        for (group_name_node, group_node) in document.value:
+            yield from parse_yaml_group(loader, str(loader.construct_document(group_name_node)), group_node)
+    except yaml.YAMLError as error:
+        yield get_yaml_error_record(error)
+    finally:
+        loader.dispose()
+
+
+def parse_yaml_group(loader: yaml.SafeLoader, group_name: str, group_node: yaml.Node) -> Iterator[Dict[str, Any]]:
+    if not isinstance(group_node, yaml.MappingNode):
+        return
+
+    groups = [] if group_name in UNGROUPED_GROUPS else [group_name]
+    loader.flatten_mapping(group_node)
+
+    hosts_node = get_yaml_mapping_value(group_node, "hosts")
+    if isinstance(hosts_node, yaml.MappingNode):
+        loader.flatten_mapping(hosts_node)
+
+        for (name_node, variables_node) in hosts_node.value:
+            row = name_node.start_mark.line + 1
+            name = str(loader.construct_document(name_node))
+            variables = loader.construct_document(variables_node)
+            variables = variables if isinstance(variables, dict) else {}
+
+            try:
+                names = expand_host_range(name)
+            except ValueError as error:
+                yield get_import_record(row, name, None, None, groups) | dict(detail=str(error))
+                continue
+
+            for host_name in names:
+                yield get_import_record(row, host_name, str(variables.get("ansible_host", host_name)), variables.get("description"), groups)
+
+    children_node = get_yaml_mapping_value(group_node, "children")
+    if isinstance(children_node, yaml.MappingNode):
+        loader.flatten_mapping(children_node)
+
+        for (child_name_node, child_node) in children_node.value:
+            yield from parse_yaml_group(loader, str(loader.construct_document(child_name_node)), child_node)
+
+
+def get_yaml_mapping_value(mapping_node: yaml.MappingNode, key: str) -> Optional[yaml.Node]:
+    for (key_node, value_node) in mapping_node.value:
+        if isinstance(key_node, yaml.ScalarNode) and key_node.value == key:
+            return value_node
+
+    return None
+
+
+def get_yaml_error_record(error: yaml.YAMLError) -> Dict[str, Any]:
+    mark = getattr(error, "problem_mark", None)
+
+    return get_import_record(mark.line + 1 if mark else 1, None, None, None, []) | dict(detail=f"Invalid YAML: {error}")
+
+
+def parse_csv_inventory(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    reader = csv.DictReader(lines)
+
+    if not reader.fieldnames or not {"hostname", "ipv4"} <= set(reader.fieldnames):
+        yield get_import_record(1, None, None, None, []) | dict(detail="CSV header must contain hostname and ipv4 columns")
+        return
+
+    for line in reader:
+        yield get_import_record(
+            reader.line_num,
+            (line.get("hostname") or "").strip(),
+            (line.get("ipv4") or "").strip(),
+            (line.get("description") or "").strip(),
+            [group.strip() for group in (line.get("groups") or "").split(";")]
+        )
+
+
+def parse_inventory(stream: TextIO, import_format: host_schema.HostImportFormat) -> Iterator[Dict[str, Any]]:
+    if import_format == host_schema.HostImportFormat.yaml:
+        return parse_yaml_inventory(stream)
+
+    if import_format == host_schema.HostImportFormat.csv:
+        return parse_csv_inventory(stream)
+
+    return parse_ini_inventory(stream)
+
+
+def iterate_batches(records: Iterable[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+
+    for record in records:
+        batch.append(record)
+
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def import_hosts_batch(db: Session, records: List[Dict[str, Any]], organization_id: int, username: str, owners_ids: List[int], seen_hosts: Dict[str, str]) -> Tuple[List[Dict[str, Any]], List[Tuple[int, str]], int, int]:
+    results: List[Dict[str, Any]] = []
+    valid_records = [record for record in records if record["detail"] is None]
+
+    existing_hosts = db.query(
+        host_model.Host.id,
+        host_model.Host.hostname,
+        host_model.Host.ipv4,
+        host_model.Host.description
+    ).filter(
+        host_model.Host.organization_id == organization_id
+    ).filter(
+        or_(
+            host_model.Host.hostname.in_(
+                list({record["hostname"] for record in valid_records})),
+            host_model.Host.ipv4.in_(
+                list({record["ipv4"] for record in valid_records}))
+        )
+    ).order_by(
+        host_model.Host.id
+    ).all() if valid_records else []
+
+    hosts_by_hostname: Dict[str, Any] = {}
+    hostnames_by_ipv4: Dict[str, str] = {}
+    for host in existing_hosts:
+        hosts_by_hostname.setdefault(host.hostname, host)
+        hostnames_by_ipv4.setdefault(host.ipv4, host.hostname)
+
+    new_hosts: Dict[str, Dict[str, Any]] = {}
+    updated_hosts: List[Dict[str, Any]] = []
+    moved_hosts_ids: List[int] = []
+
+    for record in records:
+        result = dict(
+            row=record["row"],
+            hostname=record["hostname"],
+            ipv4=record["ipv4"],
+            groups=record["groups"],
+            status=host_schema.HostImportStatus.failed,
+            host_id=None,
+            detail=record["detail"]
+        )
+        results.append(result)
+
+        if record["detail"] is not None:
+            continue
+
+        (hostname, ipv4) = (record["hostname"], record["ipv4"])
+
+        if hostname in seen_hosts:
+            if seen_hosts[hostname] != ipv4:
+                result["detail"] = f"Host {hostname} is already imported with ipv4 {seen_hosts[hostname]}"
+            else:
+                result["status"] = host_schema.HostImportStatus.unchanged
+            continue
+
+        ipv4_hostname = hostnames_by_ipv4.get(ipv4)
+        if ipv4_hostname is not None and ipv4_hostname != hostname:
+            result["detail"] = f"ipv4 {ipv4} already belongs to host {ipv4_hostname}"
+            continue
+
+        seen_hosts[hostname] = ipv4
+        hostnames_by_ipv4[ipv4] = hostname
+        host = hosts_by_hostname.get(hostname)
+
+        if host is None:
+            new_hosts[hostname] = dict(
+                hostname=hostname,
+                ipv4=ipv4,
+                description=record["description"],
+                host_status=host_schema.HostStatus.alive,
+                created_by=username,
+                last_modified_by=username,
+                organization_id=organization_id
+            )
+            result["status"] = host_schema.HostImportStatus.created
+        elif host.ipv4 != ipv4 or (record["description"] is not None and record["description"] != host.description):
+            updated_hosts.append(dict(
+                host_id=host.id,
+                new_ipv4=ipv4,
+                new_description=record["description"] if record["description"] is not None else host.description
+            ))
+            if host.ipv4 != ipv4:
+                moved_hosts_ids.append(host.id)
+            result["status"] = host_schema.HostImportStatus.updated
+        else:
+            result["status"] = host_schema.HostImportStatus.unchanged
+
+    hosts_ids = {host.hostname: host.id for host in reversed(existing_hosts)}
+
+    if new_hosts:
+        new_hosts_rows = db.execute(
+            insert(
+                host_model.Host
+            ).values(
+                list(new_hosts.values())
+            ).returning(
+                host_model.Host.id,
+                host_model.Host.hostname
+            )
+        ).all()
+        hosts_ids.update({host.hostname: host.id for host in new_hosts_rows})
+
+        db.execute(
+            insert(
+                user_host_model.UserHost
+            ).values([
+                dict(
+                    user_id=user_id,
+                    host_id=host.id
+                ) for host in new_hosts_rows for user_id in owners_ids
+            ]).on_conflict_do_nothing()
+        )
+
+    if updated_hosts:
+        db.execute(
+            update(
+                host_model.Host
+            ).where(
+                host_model.Host.id == bindparam("host_id")
+            ).values(
+                ipv4=bindparam("new_ipv4"),
+                description=bindparam("new_description"),
+                last_modified_by=username
+            ),
+            updated_hosts
+        )
+
+    imported_results = [result for result in results
+                        if result["status"] != host_schema.HostImportStatus.failed]
+    for result in imported_results:
+        result["host_id"] = hosts_ids.get(result["hostname"])
+
+    (groups_created, memberships_groups_ids) = import_groups_hosts(
+        db, imported_results, organization_id, username, owners_ids)
+
+    if memberships_groups_ids or moved_hosts_ids:
+        mark_inventories_changed(
+            db, username, groups_ids=list(set(memberships_groups_ids)), hosts_ids=moved_hosts_ids)
+
+    fingerprint_hosts = [(result["host_id"], result["ipv4"]) for result in imported_results
+                         if result["status"] == host_schema.HostImportStatus.created or result["host_id"] in moved_hosts_ids]
+
+    return (results, fingerprint_hosts, groups_created, len(memberships_groups_ids))
+
+
+def import_groups_hosts(db: Session, results: List[Dict[str, Any]], organization_id: int, username: str, owners_ids: List[int]) -> Tuple[int, List[int]]:
+    groups_names = list(dict.fromkeys(
+        group_name for result in results for group_name in result["groups"]))
+    if not groups_names:
+        return (0, [])
+
+    groups_ids: Dict[str, int] = {}
+    for group in db.query(
+        group_model.Group.id,
+        group_model.Group.name
+    ).filter(
+        group_model.Group.organization_id == organization_id,
+        group_model.Group.name.in_(groups_names)
+    ).order_by(
+        group_model.Group.id
+    ).all():
+        groups_ids.setdefault(group.name, group.id)
+
+    new_groups_names = [group_name for group_name in groups_names if group_name not in groups_ids]
+
+    if new_groups_names:
+        new_groups_rows = db.execute(
+            insert(
+                group_model.Group
+            ).values([
+                dict(
+                    name=group_name,
+                    created_by=username,
+                    last_modified_by=username,
+                    organization_id=organization_id
+                ) for group_name in new_groups_names
+            ]).returning(
+                group_model.Group.id,
+                group_model.Group.name
+            )
+        ).all()
+        groups_ids.update({group.name: group.id for group in new_groups_rows})
+
+        db.execute(
+            insert(
+                user_group_model.UserGroup
+            ).values([
+                dict(
+                    user_id=user_id,
+                    group_id=group.id
+                ) for group in new_groups_rows for user_id in owners_ids
+            ]).on_conflict_do_nothing()
+        )
+
+    memberships = list(dict.fromkeys(
+        (groups_ids[group_name], result["host_id"])
+        for result in results for group_name in result["groups"]))
+
+    memberships_groups_ids = db.execute(
+        insert(
+            group_host_model.GroupHost
+        ).values([
+            dict(
+                group_id=group_id,
+                host_id=host_id
+            ) for (group_id, host_id) in memberships
+        ]).on_conflict_do_nothing(
+        ).returning(
+            group_host_model.GroupHost.group_id
+        )
+    ).scalars().all()
+
+    return (len(new_groups_names), memberships_groups_ids)
@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import delete, func, literal, select, union
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models import group_host_model, inventory_change_model, inventory_group_model, inventory_model
+
+
+def mark_inventories_changed(db: Session, username: str, inventories_ids: Optional[List[int]] = None, groups_ids: Optional[List[int]] = None, hosts_ids: Optional[List[int]] = None) -> None:
+    changed_inventories = []
+
+    if inventories_ids:
+        changed_inventories.append(select(
+            inventory_model.Inventory.id.label("inventory_id")
+        ).where(
+            inventory_model.Inventory.id.in_(inventories_ids)
+        ))
+    if groups_ids:
+        changed_inventories.append(select(
+            inventory_group_model.InventoryGroup.inventory_id
+        ).where(
+            inventory_group_model.InventoryGroup.group_id.in_(groups_ids)
+        ))
+    if hosts_ids:
+        changed_inventories.append(select(
+            inventory_group_model.InventoryGroup.inventory_id
+        ).join(
+            group_host_model.GroupHost, group_host_model.GroupHost.group_id == inventory_group_model.InventoryGroup.group_id
+        ).where(
+            group_host_model.GroupHost.host_id.in_(hosts_ids)
+        ))
+
+    if not changed_inventories:
+        return
+
+    changed_inventories_ids = union(*changed_inventories).subquery()
+
+    insert_changes = insert(
+        inventory_change_model.InventoryChange
+    ).from_select(
+        ["inventory_id", "changed_by"],
+        select(
+            changed_inventories_ids.c.inventory_id,
+            literal(username)
+        )
+    )
+
+    db.execute(
+        insert_changes.on_conflict_do_update(
+            index_elements=["inventory_id"],
+            set_=dict(
+                changed_by=insert_changes.excluded.changed_by,
+                changed_at=func.now()
+            )
+        )
+    )
+
+
+def get_inventory_change(db: Session, inventory_id: int) -> Optional[inventory_change_model.InventoryChange]:
+    return db.query(
+        inventory_change_model.InventoryChange
+    ).filter(
+        inventory_change_model.InventoryChange.inventory_id == inventory_id
+    ).first()
+
+
+def clear_inventory_change(db: Session, inventory_id: int, changed_at: datetime) -> None:
+    db.execute(
+        delete(
+            inventory_change_model.InventoryChange
+        ).where(
+            inventory_change_model.InventoryChange.inventory_id == inventory_id,
+            inventory_change_model.InventoryChange.changed_at == changed_at
+        )
+    )
@@ -0,0 +1,62 @@
+from hashlib import sha256
+from typing import Any, Dict, List, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.orm import Session
+from app.models import group_host_model, group_model, host_model, inventory_group_model, organization_model
+
+
+def get_inventory_groups_hosts(db: Session, inventory_id: int, tower_id: int) -> List[Tuple[str, List[str]]]:
+    groups_hosts_query = db.query(
+        group_model.Group.name,
+        func.array_agg(
+            aggregate_order_by(host_model.Host.ipv4, host_model.Host.id))
+    ).join(
+        inventory_group_model.InventoryGroup, inventory_group_model.InventoryGroup.group_id == group_model.Group.id
+    ).join(
+        group_host_model.GroupHost, group_host_model.GroupHost.group_id == group_model.Group.id
+    ).join(
+        host_model.Host, host_model.Host.id == group_host_model.GroupHost.host_id
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == host_model.Host.organization_id
+    ).filter(
+        inventory_group_model.InventoryGroup.inventory_id == inventory_id,
+        organization_model.Organization.tower_id == tower_id
+    )
+
+    return groups_hosts_query.group_by(
+        group_model.Group.id,
+        group_model.Group.name
+    ).order_by(
+        group_model.Group.name,
+        group_model.Group.id
+    ).all()
+
+
+def render_inventory_file(groups_hosts: List[Tuple[str, List[str]]]) -> str:
+    lines: List[str] = []
+
+    for (group_name, hosts_ipv4) in groups_hosts:
+        lines.append("")
+        lines.append(f"[{group_name}]")
+        lines.extend(hosts_ipv4)
+
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def build_dynamic_inventory(groups_hosts: List[Tuple[str, List[str]]]) -> Dict[str, Any]:
+    dynamic_inventory: Dict[str, Any] = dict(
+        all=dict(children=[group_name for (group_name, hosts_ipv4) in groups_hosts]),
+        _meta=dict(hostvars={})
+    )
+
+    for (group_name, hosts_ipv4) in groups_hosts:
+        dynamic_inventory[group_name] = dict(hosts=hosts_ipv4)
+        for host_ipv4 in hosts_ipv4:
+            dynamic_inventory["_meta"]["hostvars"][host_ipv4] = {}
+
+    return dynamic_inventory
+
+
+def get_content_hash(file_content: str) -> str:
+    return sha256(file_content.encode("utf-8")).hexdigest()
@@ -0,0 +1,145 @@
+import base64
+import binascii
+import json
+from typing import Any, List, Optional
+from fastapi import HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import and_, desc, or_
+from app.schemas import common_schema
+from app.utils.query_orm import get_count
+
+
+class PaginationParams:
+    def __init__(
+        self,
+        limit: Optional[int] = None,
+        skip: Optional[int] = 0,
+        cursor: Optional[str] = None,
+        sort: Optional[str] = None,
+        sort_dir: Optional[common_schema.SortDir] = None,
+        with_total_count: Optional[bool] = False
+    ):
+        self.limit = limit
+        self.skip = skip
+        self.cursor = cursor
+        self.sort = sort
+        self.sort_dir = sort_dir
+        self.with_total_count = with_total_count
+
+
+def encode_cursor(sort: Optional[str], sort_dir: Optional[str], sort_value: Any, id_value: Any) -> str:
+    payload = json.dumps(jsonable_encoder([sort, sort_dir, sort_value, id_value]))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(
+            cursor.encode("ascii")).decode("utf-8"))
+    except (binascii.Error, UnicodeError, ValueError) as error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    if not isinstance(payload, list) or len(payload) != 4:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+    return payload
+
+
+def get_sort_column(query, sort: Optional[str]):
+    if not sort:
+        return None
+
+    entity = query.column_descriptions[0]["entity"]
+    sort_column = entity.__table__.columns.get(sort)
+
+    if sort_column is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Cannot sort by {sort}")
+
+    return getattr(entity, sort_column.key)
+
+
+def get_keyset_filter(sort_column, id_column, is_desc: bool, sort_value: Any, id_value: Any):
+    after_id = id_column < id_value if is_desc else id_column > id_value
+
+    if sort_column is None:
+        return after_id
+
+    if is_desc:
+        if sort_value is None:
+            return or_(sort_column.isnot(None), and_(sort_column.is_(None), after_id))
+
+        return or_(sort_column < sort_value, and_(sort_column == sort_value, after_id))
+
+    if sort_value is None:
+        return and_(sort_column.is_(None), after_id)
+
+    return or_(sort_column > sort_value, and_(sort_column == sort_value, after_id), sort_column.is_(None))
+
+
+def add_missing_row_columns(query, columns: List[Any]):
+    if isinstance(query.column_descriptions[0]["expr"], type):
+        return query
+
+    selected_names = {description["name"]
+                      for description in query.column_descriptions}
+
+    for column in columns:
+        if column is not None and column.key not in selected_names:
+            query = query.add_columns(column.label(column.key))
+            selected_names.add(column.key)
+
+    return query
+
+
+def paginate(query, response: Response, id_column, pagination: PaginationParams) -> list:
+    sort_column = get_sort_column(query, pagination.sort)
+    if sort_column is not None and sort_column.key == id_column.key:
+        sort_column = None
+
+    query = add_missing_row_columns(query, [sort_column, id_column])
+
+    is_desc = pagination.sort_dir == common_schema.SortDir.desc
+    sort_dir = pagination.sort_dir.value if pagination.sort_dir else None
+
+    if pagination.with_total_count:
+        response.headers["X-Total-Count"] = str(get_count(query, id_column))
+
+    if pagination.cursor:
+        (cursor_sort, cursor_sort_dir, sort_value,
+         id_value) = decode_cursor(pagination.cursor)
+
+        if cursor_sort != pagination.sort or cursor_sort_dir != sort_dir:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail="Cursor does not match the requested sort")
+
+        query = query.filter(get_keyset_filter(
+            sort_column, id_column, is_desc, sort_value, id_value))
+
+    order_columns = [id_column] if sort_column is None else [
+        sort_column, id_column]
+    if is_desc:
+        order_columns = [desc(column) for column in order_columns]
+
+    query = query.order_by(*order_columns)
+
+    if pagination.skip:
+        query = query.offset(pagination.skip)
+
+    if pagination.limit:
+        query = query.limit(pagination.limit)
+
+    items = query.all()
+
+    if pagination.limit and len(items) == pagination.limit:
+        last_item = items[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(
+            pagination.sort,
+            sort_dir,
+            getattr(last_item, sort_column.key) if sort_column is not None else None,
+            getattr(last_item, id_column.key)
+        )
+
+    return items
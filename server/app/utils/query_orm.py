@@ -1,4 +1,7 @@
-from sqlalchemy import func
+from functools import lru_cache
+from pydantic import BaseModel
+from sqlalchemy import func, inspect
+from sqlalchemy.orm import joinedload, selectinload
 
 
 def get_count(query, column):
@@ -6,3 +9,47 @@ def get_count(query, column):
         [func.count(column)]).order_by(None)
     count = query.session.execute(count_q).scalar()
     return count
+
+
+def get_count_subquery(query, column):
+    count_q = query.statement.with_only_columns(
+        [func.count(column)]).order_by(None)
+    return count_q.scalar_subquery()
+
+
+@lru_cache(maxsize=None)
+def get_loader_options(model, schema, through=None):
+    if through is None:
+        return tuple(_get_relationship_loaders(model, schema, None))
+
+    loader = joinedload(getattr(model, through))
+    target = inspect(model).relationships[through].mapper.class_
+
+    return (loader, *_get_relationship_loaders(target, schema, loader))
+
+
+def _get_relationship_loaders(model, schema, parent_loader):
+    relationships = inspect(model).relationships
+    loaders = []
+
+    for name, field in schema.__fields__.items():
+        if not (isinstance(field.type_, type) and issubclass(field.type_, BaseModel)):
+            continue
+
+        relationship = relationships.get(name)
+        if relationship is None:
+            continue
+
+        strategy = selectinload if relationship.uselist else joinedload
+        attribute = getattr(model, name)
+
+        if parent_loader is None:
+            loader = strategy(attribute)
+        else:
+            loader = getattr(parent_loader, strategy.__name__)(attribute)
+
+        loaders.append(loader)
+        loaders += _get_relationship_loaders(
+            relationship.mapper.class_, field.type_, loader)
+
+    return loaders
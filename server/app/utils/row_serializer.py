@@ -0,0 +1,95 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, aliased
+
+RowLayout = Tuple[Tuple[str, int, Optional["RowLayout"]], ...]
+
+
+@lru_cache(maxsize=None)
+def get_row_layout(model, schema) -> Tuple[tuple, tuple, RowLayout]:
+    columns: List[Any] = []
+    joins: List[Tuple[Any, Any]] = []
+    layout = _get_row_layout(model, model, schema, "", columns, joins)
+
+    return (tuple(columns), tuple(joins), layout)
+
+
+def _get_row_layout(model, entity, schema, prefix: str, columns: List[Any], joins: List[Tuple[Any, Any]]) -> RowLayout:
+    mapper = inspect(model)
+    layout = []
+
+    for name, field in schema.__fields__.items():
+        relationship = mapper.relationships.get(name)
+
+        if relationship is not None and isinstance(field.type_, type) and issubclass(field.type_, BaseModel):
+            if relationship.uselist:
+                raise ValueError(
+                    f"Can't select {model.__name__}.{name} as row columns")
+
+            target_entity = aliased(relationship.mapper.class_)
+            joins.append(
+                (target_entity, getattr(entity, name).of_type(target_entity)))
+
+            key_index = len(columns)
+            columns.append(getattr(target_entity, relationship.mapper.primary_key[0].key).label(
+                f"{prefix}{name}__"))
+
+            layout.append((name, key_index, _get_row_layout(
+                relationship.mapper.class_, target_entity, field.type_, f"{prefix}{name}__", columns, joins)))
+            continue
+
+        if name not in mapper.column_attrs:
+            raise ValueError(
+                f"Can't select {model.__name__}.{name} as row columns")
+
+        layout.append((name, len(columns), None))
+        columns.append(getattr(entity, name).label(f"{prefix}{name}"))
+
+    return tuple(layout)
+
+
+def get_row_query(db: Session, model, schema):
+    (columns, joins, layout) = get_row_layout(model, schema)
+
+    row_query = db.query(
+        *columns
+    ).select_from(
+        model
+    )
+
+    for (target_entity, onclause) in joins:
+        row_query = row_query.outerjoin(target_entity, onclause)
+
+    return row_query
+
+
+def serialize_rows(rows: List[Any], model, schema) -> List[Dict[str, Any]]:
+    (columns, joins, layout) = get_row_layout(model, schema)
+
+    return [serialize_row(row, layout) for row in rows]
+
+
+def serialize_row(row: Any, layout: RowLayout) -> Dict[str, Any]:
+    item = {}
+
+    for (name, index, nested_layout) in layout:
+        if nested_layout is None:
+            item[name] = row[index]
+        elif row[index] is None:
+            item[name] = None
+        else:
+            item[name] = serialize_row(row, nested_layout)
+
+    return item
+
+
+def get_rows_response(rows: List[Any], model, schema, response: Response) -> ORJSONResponse:
+    return ORJSONResponse(
+        serialize_rows(rows, model, schema),
+        headers={name: value for (name, value) in response.headers.items()
+                 if name != "content-length"}
+    )
@@ -0,0 +1,7 @@
+def format_event(event: str, data: str) -> str:
+    data_lines = "".join(f"data: {line}\n" for line in data.split("\n"))
+    return f"event: {event}\n{data_lines}\n"
+
+
+def format_comment(comment: str) -> str:
+    return f": {comment}\n\n"
@@ -0,0 +1,60 @@
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    def __init__(self, ttl: float, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            (expires_at, value) = entry
+
+            if expires_at < monotonic():
+                del self._entries[key]
+                return None
+
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl <= 0:
+            return
+
+        with self._lock:
+            if len(self._entries) >= self.max_size:
+                self._evict_expired()
+
+            if len(self._entries) >= self.max_size:
+                self._entries.pop(next(iter(self._entries)))
+
+            self._entries[key] = (monotonic() + self.ttl, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+        with self._lock:
+            for key, (expires_at, value) in list(self._entries.items()):
+                if predicate(key, value):
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _evict_expired(self) -> None:
+        now = monotonic()
+
+        for key, (expires_at, value) in list(self._entries.items()):
+            if expires_at < now:
+                del self._entries[key]
@@ -0,0 +1,120 @@
+import argparse
+import json
+from statistics import median
+from time import perf_counter
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy import text
+from app.auth.oauth2 import load_principal
+from app.database.connection import SessionLocal
+from app.models import credential_model, group_host_model, group_model, host_model, inventory_group_model, inventory_model, job_model, organization_model, project_model, schedule_model, team_credential_model, team_group_model, team_host_model, team_inventory_model, team_model, team_organization_model, team_project_model, team_template_model, template_model, template_schedule_model, tower_model, job_output_chunk_model, user_credential_model, user_group_model, user_host_model, user_inventory_model, user_model, user_organization_model, user_project_model, user_team_model, user_template_model, project_schedule_model, inventory_schedule_model, inventory_change_model
+from app.routes.host_route import get_hosts
+from app.schemas import host_schema
+from app.utils.get_ids import get_ids_list
+from app.utils.pagination import PaginationParams, paginate
+from app.utils.query_orm import get_loader_options
+
+
+def seed_hosts(db, organization_id, username, hosts_count):
+    db.execute(
+        text(
+            "INSERT INTO hosts (description, hostname, ipv4, created_by, last_modified_by, organization_id) "
+            "SELECT NULL, 'bench-host-' || n, '10.' || (n / 65536) % 256 || '.' || (n / 256) % 256 || '.' || n % 256, "
+            ":username, :username, :organization_id FROM generate_series(1, :hosts_count) AS n"
+        ),
+        dict(username=username, organization_id=organization_id,
+             hosts_count=hosts_count)
+    )
+    db.execute(text("ANALYZE hosts"))
+
+
+def get_orm_hosts(db, principal, limit):
+    hosts_query = db.query(
+        host_model.Host
+    ).options(
+        *get_loader_options(host_model.Host, host_schema.HostResponse)
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == host_model.Host.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == principal["user"].tower.id,
+        host_model.Host.organization_id.in_(
+            get_ids_list(principal['organizations']))
+    )
+
+    return paginate(hosts_query, Response(), host_model.Host.id, PaginationParams(limit=limit))
+
+
+def render_with_orm(db, principal, limit):
+    hosts = get_orm_hosts(db, principal, limit)
+    return JSONResponse(jsonable_encoder([host_schema.HostResponse.from_orm(host) for host in hosts])).body
+
+
+def render_with_orm_orjson(db, principal, limit):
+    hosts = get_orm_hosts(db, principal, limit)
+    return ORJSONResponse(jsonable_encoder([host_schema.HostResponse.from_orm(host) for host in hosts])).body
+
+
+def render_with_rows(db, principal, limit):
+    return get_hosts(Response(), db, principal, "", "", PaginationParams(limit=limit)).body
+
+
+def measure(db, render, repeat, *args):
+    timings = []
+    body = b""
+
+    for _ in range(repeat):
+        db.expunge_all()
+        started = perf_counter()
+        body = render(db, *args)
+        timings.append(perf_counter() - started)
+
+    return (timings, body)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the ORM + pydantic and the row tuple + orjson paths of GET /api/hosts. "
+                    "Everything runs in one transaction that is rolled back.")
+    parser.add_argument("--user-id", type=int, required=True,
+                        help="user that belongs to the organization")
+    parser.add_argument("--organization-id", type=int, required=True)
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        principal = load_principal(db, args.user_id)
+        if not principal:
+            raise SystemExit(f"User {args.user_id} not found")
+
+        if args.organization_id not in get_ids_list(principal["organizations"]):
+            raise SystemExit(
+                f"User {args.user_id} does not belong to organization {args.organization_id}")
+
+        seed_hosts(db, args.organization_id,
+                   principal["user"].username, max(args.sizes))
+
+        for size in args.sizes:
+            (orm_timings, orm_body) = measure(
+                db, render_with_orm, args.repeat, principal, size)
+            (orjson_timings, orjson_body) = measure(
+                db, render_with_orm_orjson, args.repeat, principal, size)
+            (row_timings, row_body) = measure(
+                db, render_with_rows, args.repeat, principal, size)
+
+            print(f"hosts: {size}, repeat: {args.repeat}")
+            print(f"  orm + pydantic + json: best {min(orm_timings):.3f}s, median {median(orm_timings):.3f}s")
+            print(f"  orm + pydantic + orjson: best {min(orjson_timings):.3f}s, median {median(orjson_timings):.3f}s")
+            print(f"  rows + orjson: best {min(row_timings):.3f}s, median {median(row_timings):.3f}s")
+            print(f"  same content: {json.loads(orm_body) == json.loads(orjson_body) == json.loads(row_body)}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import argparse
+from statistics import median
+from time import perf_counter
+from jinja2 import Template
+from sqlalchemy import text
+from app.database.connection import SessionLocal
+from app.models import credential_model, group_host_model, group_model, host_model, inventory_group_model, inventory_model, job_model, organization_model, project_model, schedule_model, team_credential_model, team_group_model, team_host_model, team_inventory_model, team_model, team_organization_model, team_project_model, team_template_model, template_model, template_schedule_model, tower_model, job_output_chunk_model, user_credential_model, user_group_model, user_host_model, user_inventory_model, user_model, user_organization_model, user_project_model, user_team_model, user_template_model, project_schedule_model, inventory_schedule_model, inventory_change_model
+from app.utils.get_ids import get_groups_ids_list_from_response, get_hosts_by_group
+from app.utils.inventory_file import get_inventory_groups_hosts, render_inventory_file
+
+INVENTORY_TEMPLATE = Template(
+    "{% for groups_hosts in hosts_by_group %}\n"
+    "[{{ groups_hosts.group.name }}]\n"
+    "{% for host in groups_hosts.hosts -%}\n"
+    "{{ host.ipv4 }}\n"
+    "{% endfor %}\n"
+    "{%- endfor %}"
+)
+
+
+def seed_inventory(db, inventory_id, organization_id, username, hosts_count, groups_count):
+    db.execute(
+        text(
+            "INSERT INTO groups (name, description, created_by, last_modified_by, organization_id) "
+            "SELECT 'bench-group-' || n, NULL, :username, :username, :organization_id "
+            "FROM generate_series(1, :groups_count) AS n"
+        ),
+        dict(username=username, organization_id=organization_id,
+             groups_count=groups_count)
+    )
+    db.execute(
+        text(
+            "INSERT INTO hosts (description, hostname, ipv4, created_by, last_modified_by, organization_id) "
+            "SELECT NULL, 'bench-host-' || n, '10.' || (n / 65536) % 256 || '.' || (n / 256) % 256 || '.' || n % 256, "
+            ":username, :username, :organization_id FROM generate_series(1, :hosts_count) AS n"
+        ),
+        dict(username=username, organization_id=organization_id,
+             hosts_count=hosts_count)
+    )
+    db.execute(
+        text(
+            "INSERT INTO groups_hosts (group_id, host_id) "
+            "SELECT g.id, h.id FROM hosts h "
+            "JOIN groups g ON g.name = 'bench-group-' || (1 + substring(h.hostname from 12)::int % :groups_count) "
+            "AND g.organization_id = :organization_id "
+            "WHERE h.hostname LIKE 'bench-host-%' AND h.organization_id = :organization_id"
+        ),
+        dict(organization_id=organization_id, groups_count=groups_count)
+    )
+    db.execute(
+        text(
+            "INSERT INTO inventories_groups (inventory_id, group_id) "
+            "SELECT :inventory_id, id FROM groups "
+            "WHERE name LIKE 'bench-group-%' AND organization_id = :organization_id"
+        ),
+        dict(inventory_id=inventory_id, organization_id=organization_id)
+    )
+    db.execute(text("ANALYZE"))
+
+
+def render_with_orm(db, inventory_id, tower_id, organizations_ids):
+    inventories_groups = db.query(
+        inventory_group_model.InventoryGroup
+    ).join(
+        group_model.Group, group_model.Group.id == inventory_group_model.InventoryGroup.group_id
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == group_model.Group.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == tower_id,
+        group_model.Group.organization_id.in_(organizations_ids),
+        inventory_group_model.InventoryGroup.inventory_id == inventory_id
+    ).all()
+
+    groups_hosts = db.query(
+        group_host_model.GroupHost
+    ).join(
+        host_model.Host, host_model.Host.id == group_host_model.GroupHost.host_id
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == host_model.Host.organization_id
+    ).filter(
+        organization_model.Organization.tower_id == tower_id,
+        host_model.Host.organization_id.in_(organizations_ids),
+        group_host_model.GroupHost.group_id.in_(
+            get_groups_ids_list_from_response(inventories_groups))
+    ).all()
+
+    return INVENTORY_TEMPLATE.render(hosts_by_group=get_hosts_by_group(groups_hosts))
+
+
+def render_with_sql(db, inventory_id, tower_id, organizations_ids):
+    return render_inventory_file(get_inventory_groups_hosts(
+        db, inventory_id, tower_id, organizations_ids))
+
+
+def measure(db, render, repeat, *args):
+    timings = []
+    content = ""
+
+    for _ in range(repeat):
+        db.expunge_all()
+        started = perf_counter()
+        content = render(db, *args)
+        timings.append(perf_counter() - started)
+
+    return (timings, content)
+
+
+def get_sections(content):
+    sections = []
+
+    for section in content.split("\n\n"):
+        lines = section.strip().splitlines()
+        if lines:
+            sections.append((lines[0], sorted(lines[1:])))
+
+    return sorted(sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare the ORM and the SQL aggregated inventory assembly. "
+                    "Everything runs in one transaction that is rolled back.")
+    parser.add_argument("--inventory-id", type=int, required=True)
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--hosts", type=int, default=50000)
+    parser.add_argument("--groups", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        inventory = db.query(
+            inventory_model.Inventory
+        ).filter(
+            inventory_model.Inventory.id == args.inventory_id
+        ).first()
+        if not inventory:
+            raise SystemExit(f"Inventory {args.inventory_id} not found")
+
+        organization_id = inventory.organization_id
+        tower_id = inventory.organization.tower_id
+
+        seed_inventory(db, args.inventory_id, organization_id,
+                       args.username, args.hosts, args.groups)
+
+        (orm_timings, orm_content) = measure(
+            db, render_with_orm, args.repeat, args.inventory_id, tower_id, [organization_id])
+        (sql_timings, sql_content) = measure(
+            db, render_with_sql, args.repeat, args.inventory_id, tower_id, [organization_id])
+
+        print(f"hosts: {args.hosts}, groups: {args.groups}, repeat: {args.repeat}")
+        print(f"orm + get_hosts_by_group + jinja: best {min(orm_timings):.3f}s, median {median(orm_timings):.3f}s")
+        print(f"sql array_agg + render: best {min(sql_timings):.3f}s, median {median(sql_timings):.3f}s")
+        print(f"same content: {get_sections(orm_content) == get_sections(sql_content)}")
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
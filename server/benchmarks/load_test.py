@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+from statistics import median
+from time import perf_counter
+import httpx
+
+
+async def login(client, company, username, password):
+    response = await client.post(
+        "/api/login",
+        data=dict(username=username, password=password, client_id=company)
+    )
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def worker(client, paths, headers, requests_count, latencies, errors):
+    for index in range(requests_count):
+        path = paths[index % len(paths)]
+        started = perf_counter()
+
+        try:
+            response = await client.get(path, headers=headers)
+            if response.status_code >= 500:
+                errors.append(response.status_code)
+        except httpx.HTTPError as error:
+            errors.append(type(error).__name__)
+
+        latencies.append(perf_counter() - started)
+
+
+def percentile(values, ratio):
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+async def run(args):
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=httpx.Limits(max_connections=args.concurrency)) as client:
+        token = args.token or await login(client, args.company, args.username, args.password)
+        headers = {"Authorization": f"Bearer {token}"}
+
+        for concurrency in args.concurrency_steps:
+            latencies = []
+            errors = []
+            started = perf_counter()
+
+            await asyncio.gather(*[
+                worker(client, args.paths, headers,
+                       args.requests // concurrency, latencies, errors)
+                for _ in range(concurrency)
+            ])
+
+            elapsed = perf_counter() - started
+            latencies.sort()
+
+            print(f"concurrency {concurrency}: {len(latencies)} requests in {elapsed:.2f}s, "
+                  f"{len(latencies) / elapsed:.1f} req/s, "
+                  f"p50 {median(latencies) * 1000:.0f}ms, "
+                  f"p95 {percentile(latencies, 0.95) * 1000:.0f}ms, "
+                  f"p99 {percentile(latencies, 0.99) * 1000:.0f}ms, "
+                  f"errors {len(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure concurrent request throughput of a running server. "
+                    "Run it against the server before and after a change with the same arguments.")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--token")
+    parser.add_argument("--company")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--path", dest="paths", action="append",
+                        help="path to request, can be repeated (default /api/hosts)")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--concurrency-steps", type=int, nargs="+",
+                        default=[1, 8, 32, 64])
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    if not args.token and not (args.company and args.username and args.password):
+        parser.error("provide --token or --company, --username and --password")
+
+    args.paths = args.paths or ["/api/hosts"]
+    args.concurrency = max([args.concurrency, *args.concurrency_steps])
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import argparse
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from app.database.connection import Base, SessionLocal
+from app.models import credential_model, group_host_model, group_model, host_model, inventory_group_model, inventory_model, job_model, organization_model, project_model, schedule_model, team_credential_model, team_group_model, team_host_model, team_inventory_model, team_model, team_organization_model, team_project_model, team_template_model, template_model, template_schedule_model, tower_model, job_output_chunk_model, user_credential_model, user_group_model, user_host_model, user_inventory_model, user_model, user_organization_model, user_project_model, user_team_model, user_template_model, project_schedule_model, inventory_schedule_model, inventory_change_model
+
+
+def get_queries(db, tower_id, organization_id, user_id, username, search):
+    organization_filter = [
+        organization_model.Organization.tower_id == tower_id,
+        host_model.Host.organization_id.in_([organization_id])
+    ]
+
+    hosts_query = db.query(
+        host_model.Host
+    ).join(
+        organization_model.Organization, organization_model.Organization.id == host_model.Host.organization_id
+    ).filter(
+        *organization_filter
+    )
+
+    return {
+        "hosts by organization": hosts_query.order_by(
+            host_model.Host.id
+        ).limit(50),
+        "hosts search by hostname": hosts_query.filter(
+            host_model.Host.hostname.contains(search)
+        ).order_by(
+            host_model.Host.id
+        ).limit(50),
+        "hosts owned by user": db.query(
+            host_model.Host
+        ).join(
+            organization_model.Organization, organization_model.Organization.id == host_model.Host.organization_id
+        ).filter(
+            organization_model.Organization.tower_id == tower_id,
+            host_model.Host.created_by == username
+        ).order_by(
+            host_model.Host.id
+        ).limit(50),
+        "users of host": db.query(
+            user_host_model.UserHost
+        ).join(
+            user_model.User, user_model.User.id == user_host_model.UserHost.user_id
+        ).filter(
+            user_model.User.tower_id == tower_id,
+            user_host_model.UserHost.host_id == db.query(
+                host_model.Host.id
+            ).filter(
+                host_model.Host.organization_id == organization_id
+            ).limit(1).scalar_subquery()
+        ),
+        "groups of host": db.query(
+            group_host_model.GroupHost
+        ).filter(
+            group_host_model.GroupHost.host_id == db.query(
+                host_model.Host.id
+            ).filter(
+                host_model.Host.organization_id == organization_id
+            ).limit(1).scalar_subquery()
+        ).order_by(
+            group_host_model.GroupHost.group_host_id
+        ),
+        "jobs of user templates": db.query(
+            job_model.Job.id
+        ).join(
+            template_model.Template, template_model.Template.id == job_model.Job.template_id
+        ).filter(
+            job_model.Job.organization_id == organization_id,
+            job_model.Job.template_id.in_(
+                db.query(
+                    user_template_model.UserTemplate.template_id
+                ).filter(
+                    user_template_model.UserTemplate.user_id == user_id
+                ).scalar_subquery()
+            )
+        ).order_by(
+            job_model.Job.id
+        ).limit(50)
+    }
+
+
+def explain(db, query):
+    statement = query.statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True})
+    rows = db.execute(
+        text(f"EXPLAIN (ANALYZE, BUFFERS) {statement}")).fetchall()
+    return "\n".join(row[0] for row in rows)
+
+
+def seed_hosts(db, organization_id, user_id, username, count):
+    db.execute(
+        text(
+            "INSERT INTO hosts (description, hostname, ipv4, created_by, last_modified_by, organization_id) "
+            "SELECT NULL, 'bench-host-' || n, '10.' || (n / 65536) % 256 || '.' || (n / 256) % 256 || '.' || n % 256, "
+            ":username, :username, :organization_id FROM generate_series(1, :count) AS n"
+        ),
+        dict(username=username, organization_id=organization_id, count=count)
+    )
+    db.execute(
+        text(
+            "INSERT INTO users_hosts (user_id, host_id) "
+            "SELECT :user_id, id FROM hosts WHERE hostname LIKE 'bench-host-%' ON CONFLICT DO NOTHING"
+        ),
+        dict(user_id=user_id)
+    )
+    db.execute(text("ANALYZE"))
+
+
+def drop_indexes(db):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            db.execute(text(f'DROP INDEX IF EXISTS "{index.name}"'))
+    db.execute(text("ANALYZE"))
+
+
+def print_plans(title, plans):
+    print(f"===== {title} =====")
+    for name, plan in plans.items():
+        print(f"--- {name}")
+        print(plan)
+        print()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Show query plans of the main list queries with and without the secondary indexes. "
+                    "Everything runs in one transaction that is rolled back.")
+    parser.add_argument("--tower-id", type=int, required=True)
+    parser.add_argument("--organization-id", type=int, required=True)
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--search", default="web")
+    parser.add_argument("--seed-hosts", type=int, default=0,
+                        help="insert this many synthetic hosts before explaining")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        if args.seed_hosts:
+            seed_hosts(db, args.organization_id, args.user_id,
+                       args.username, args.seed_hosts)
+
+        queries = get_queries(db, args.tower_id, args.organization_id,
+                              args.user_id, args.username, args.search)
+
+        print_plans("with indexes", {
+                    name: explain(db, query) for name, query in queries.items()})
+
+        drop_indexes(db)
+
+        print_plans("without indexes", {
+                    name: explain(db, query) for name, query in queries.items()})
+    finally:
+        db.rollback()
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
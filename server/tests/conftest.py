@@ -0,0 +1,19 @@
+import os
+from pydantic import ValidationError
+
+DEFAULT_ENV_VARS = dict(
+    DATABASE_HOSTNAME="localhost",
+    DATABASE_PORT="5432",
+    DATABASE_PASSWORD="postgres",
+    DATABASE_NAME="postgres",
+    DATABASE_USERNAME="postgres",
+    SECRET_KEY="test",
+    ALGORITHM="HS256",
+    ACCESS_TOKEN_EXPIRE_MINUTES="30"
+)
+
+try:
+    import app.configs.env_vars
+except ValidationError:
+    for (name, value) in DEFAULT_ENV_VARS.items():
+        os.environ.setdefault(name, value)
@@ -0,0 +1,175 @@
+from datetime import datetime, timezone
+from typing import get_origin
+from uuid import uuid4
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from app.auth import oauth2
+from app.database.connection import engine, get_db
+from app.database.replica import get_read_db
+from app.main import app
+from app.models import credential_model, group_host_model, group_model, host_model, inventory_group_model, inventory_model, inventory_schedule_model, job_model, organization_model, project_model, project_schedule_model, schedule_model, team_credential_model, team_group_model, team_host_model, team_inventory_model, team_model, team_organization_model, team_project_model, team_template_model, template_model, template_schedule_model, tower_model, user_credential_model, user_group_model, user_host_model, user_inventory_model, user_model, user_organization_model, user_project_model, user_team_model, user_template_model
+
+ROWS_PER_BATCH = 3
+MAX_STATEMENTS = 3
+
+LIST_ROUTES = sorted(
+    route.path for route in app.routes
+    if isinstance(route, APIRoute) and "GET" in route.methods and "{" not in route.path and get_origin(route.response_model) is list
+)
+
+
+def seed_batch(db: Session, tower, admin, batch: int) -> None:
+    username = admin.username
+    audit = dict(created_by=username, last_modified_by=username)
+
+    organization = organization_model.Organization(
+        name=f"organization-{batch}", tower_id=tower.id, **audit)
+    team = team_model.Team(name=f"team-{batch}", tower_id=tower.id, **audit)
+    db.add_all([organization, team])
+    db.flush()
+
+    db.add_all([
+        user_organization_model.UserOrganization(
+            user_id=admin.id, organization_id=organization.id),
+        user_team_model.UserTeam(user_id=admin.id, team_id=team.id),
+        team_organization_model.TeamOrganization(
+            team_id=team.id, organization_id=organization.id)
+    ])
+
+    for row in range(ROWS_PER_BATCH):
+        name = f"{batch}-{row}"
+        owned = dict(organization_id=organization.id, **audit)
+
+        user = user_model.User(username=f"user-{name}", password="password",
+                               user_type="normal_user", tower_id=tower.id, **audit)
+        host = host_model.Host(
+            hostname=f"host-{name}", ipv4=f"10.0.{batch}.{row}", **owned)
+        group = group_model.Group(name=f"group-{name}", **owned)
+        inventory = inventory_model.Inventory(
+            name=f"inventory-{name}", inventory_file=f"inventory-{name}", **owned)
+        project = project_model.Project(
+            name=f"project-{name}", source_control_credential_type="git", tool="ansible", **owned)
+        credential = credential_model.Credential(
+            name=f"credential-{name}", username="root", password="password", port=22, credential_type="machine", **owned)
+        schedule = schedule_model.Schedule(name=f"schedule-{name}", schedule_type="template", start_date_time=datetime.now(
+            timezone.utc), repeat_frequency="day", every=1, **owned)
+        db.add_all([user, host, group, inventory,
+                   project, credential, schedule])
+        db.flush()
+
+        template = template_model.Template(name=f"template-{name}", playbook_name="site.yml", inventory_id=inventory.id,
+                                           project_id=project.id, credential_id=credential.id, **owned)
+        db.add(template)
+        db.flush()
+
+        db.add_all([
+            job_model.Job(started_at=datetime.now(timezone.utc), launched_by=username,
+                          template_id=template.id, organization_id=organization.id),
+            user_organization_model.UserOrganization(
+                user_id=user.id, organization_id=organization.id),
+            group_host_model.GroupHost(group_id=group.id, host_id=host.id),
+            inventory_group_model.InventoryGroup(
+                inventory_id=inventory.id, group_id=group.id),
+            template_schedule_model.TemplateSchedule(
+                cron_job_id=uuid4().hex, template_id=template.id, schedule_id=schedule.id),
+            project_schedule_model.ProjectSchedule(
+                cron_job_id=uuid4().hex, project_id=project.id, schedule_id=schedule.id),
+            inventory_schedule_model.InventorySchedule(
+                cron_job_id=uuid4().hex, inventory_id=inventory.id, schedule_id=schedule.id),
+            user_credential_model.UserCredential(
+                user_id=admin.id, credential_id=credential.id),
+            user_group_model.UserGroup(user_id=admin.id, group_id=group.id),
+            user_host_model.UserHost(user_id=admin.id, host_id=host.id),
+            user_inventory_model.UserInventory(
+                user_id=admin.id, inventory_id=inventory.id),
+            user_project_model.UserProject(
+                user_id=admin.id, project_id=project.id),
+            user_template_model.UserTemplate(
+                user_id=admin.id, template_id=template.id),
+            team_credential_model.TeamCredential(
+                team_id=team.id, credential_id=credential.id),
+            team_group_model.TeamGroup(team_id=team.id, group_id=group.id),
+            team_host_model.TeamHost(team_id=team.id, host_id=host.id),
+            team_inventory_model.TeamInventory(
+                team_id=team.id, inventory_id=inventory.id),
+            team_project_model.TeamProject(
+                team_id=team.id, project_id=project.id),
+            team_template_model.TeamTemplate(
+                team_id=team.id, template_id=template.id)
+        ])
+
+    db.flush()
+
+
+def count_statements(client: TestClient, db: Session, path: str):
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    db.expunge_all()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+
+    try:
+        response = client.get(path)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    return (response.status_code, len(statements))
+
+
+@pytest.fixture(scope="module")
+def statement_counts():
+    try:
+        connection = engine.connect()
+    except OperationalError:
+        pytest.skip("Can't connect to the database")
+
+    transaction = connection.begin()
+    db = Session(bind=connection, autoflush=False)
+    principal = {}
+
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_read_db] = lambda: db
+    app.dependency_overrides[oauth2.get_principal] = lambda: principal
+
+    try:
+        tower = tower_model.Tower(company=f"company-{uuid4().hex}", hostname="tower", ipv4="10.255.255.1",
+                                  username="root", password="password", port=22, created_by="test", last_modified_by="test")
+        db.add(tower)
+        db.flush()
+
+        admin = user_model.User(username=f"admin-{uuid4().hex}", password="password", user_type="admin",
+                                tower_id=tower.id, created_by="test", last_modified_by="test")
+        db.add(admin)
+        db.flush()
+
+        client = TestClient(app)
+        counts = {path: [] for path in LIST_ROUTES}
+
+        for batch in range(2):
+            seed_batch(db, tower, admin, batch)
+            principal.update(oauth2.load_principal(db, admin.id))
+
+            for path in LIST_ROUTES:
+                counts[path].append(count_statements(client, db, path))
+
+        yield counts
+    finally:
+        app.dependency_overrides.clear()
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.mark.parametrize("path", LIST_ROUTES)
+def test_list_route_statements(statement_counts, path):
+    ((first_status, first_count), (second_status, second_count)) = statement_counts[path]
+
+    assert first_status == second_status == 200
+    assert first_count <= MAX_STATEMENTS
+    assert second_count == first_count